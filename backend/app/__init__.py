@@ -1,6 +1,7 @@
 from flask_sqlalchemy import SQLAlchemy
+from .db_routing import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 # Import models after db is initialized
 from .models import user_model, listing_model
\ No newline at end of file
@@ -1,8 +1,8 @@
 from datetime import datetime, timezone
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-import socketio
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, aliased
+from sqlalchemy import func
 from app import db
 from app.models.user_model import User
 from app.models.listing_model import Transaction
@@ -10,7 +10,10 @@ from app.models.chat_model import ChatRoom, ChatMessage
 import uuid
 from app.models.listing_model import Listing, Transaction
 from functools import wraps
-from app.socket_events import socketio
+from app.services.outbox_service import publish, chat_room
+from app.services.principal_service import current_principal
+from app.db_routing import read_primary
+from app.conditional import conditional
 
 bp = Blueprint('chat', __name__, url_prefix='/api/chats')
 
@@ -84,8 +87,36 @@ def initiate_chat():
         db.session.rollback()
         return jsonify({"error": "Failed to initiate chat", "details": str(e)}), 500
     
+def _chats_version():
+    user_id = int(get_jwt_identity())
+    participant = (Transaction.buyer_id == user_id) | (Transaction.seller_id == user_id)
+    Seller, Buyer = aliased(User), aliased(User)
+    rooms = db.session.query(
+        func.count(ChatRoom.id), func.max(ChatRoom.id), func.max(Transaction.completed_at),
+        func.max(Listing.updated_at), func.max(Seller.updated_at), func.max(Buyer.updated_at)
+    ).join(
+        Transaction, Transaction.id == ChatRoom.transaction_id
+    ).join(
+        Listing, Listing.id == ChatRoom.listing_id
+    ).join(
+        Seller, Seller.id == Transaction.seller_id
+    ).join(
+        Buyer, Buyer.id == Transaction.buyer_id
+    ).filter(participant).one()
+    # New messages move max(id); reading them moves the unread count
+    messages = db.session.query(
+        func.max(ChatMessage.id),
+        func.count(ChatMessage.id).filter(ChatMessage.read_at == None, ChatMessage.sender_id != user_id)
+    ).join(
+        ChatRoom, ChatRoom.id == ChatMessage.room_id
+    ).join(
+        Transaction, Transaction.id == ChatRoom.transaction_id
+    ).filter(participant).one()
+    return (user_id,) + tuple(rooms) + tuple(messages)
+
 @bp.route('/', methods=['GET'])
 @jwt_required()
+@conditional(_chats_version)
 def get_user_chats():
     current_user_id = int(get_jwt_identity())
     
@@ -154,9 +185,12 @@ def get_user_chats():
     return jsonify({'chats': result}), 200
 
 @bp.route('/<int:transaction_id>', methods=['GET'])
+@read_primary
 @jwt_required()
 def get_or_create_chat(transaction_id):
-    current_user = User.query.get(int(get_jwt_identity()))
+    current_user = current_principal()
+    if not current_user:
+        return jsonify({"error": "User not found"}), 404
     
     # Verify transaction exists and user is participant
     transaction = Transaction.query.filter(
@@ -184,7 +218,9 @@ def get_or_create_chat(transaction_id):
 @jwt_required()
 @verify_chat_participant
 def get_messages(room_id):
-    current_user = User.query.get(int(get_jwt_identity()))
+    current_user = current_principal()
+    if not current_user:
+        return jsonify({"error": "User not found"}), 404
     
     room = ChatRoom.query.get(room_id)
     if not room:
@@ -220,7 +256,9 @@ def get_messages(room_id):
 @jwt_required()
 @verify_chat_participant
 def send_message(room_id):
-    current_user = User.query.get(int(get_jwt_identity()))
+    current_user = current_principal()
+    if not current_user:
+        return jsonify({"error": "User not found"}), 404
     data = request.get_json()
     
     if not data or 'content' not in data:
@@ -267,15 +305,14 @@ def mark_messages_as_read(room_id):
             ChatMessage.sender_id == other_user_id,
             ChatMessage.read_at == None
         ).update({'read_at': datetime.now(timezone.utc)})
-        
-        db.session.commit()
-        
+
         if updated > 0:
-            socketio.emit('messages_read', {
+            publish('messages_read', chat_room(room_id), {
                 'room_id': room_id,
                 'reader_id': current_user_id,
                 'count': updated
-            }, room=f'room_{room_id}')
+            })
+        db.session.commit()
         
         return jsonify({'success': True, 'marked_read': updated}), 200
         
@@ -0,0 +1,110 @@
+import time
+import signal
+import threading
+import click
+from flask.cli import AppGroup, ScriptInfo, with_appcontext
+from app.services.upload_gc import collect_orphaned_uploads, purge_expired_upload_sessions
+
+uploads_cli = AppGroup('uploads', help='Maintenance commands for uploaded files.')
+
+@click.command('db', add_help_option=False,
+               context_settings={'ignore_unknown_options': True, 'allow_extra_args': True})
+@click.pass_context
+def migrate_cli(ctx):
+    """Perform database migrations (Flask-Migrate)."""
+    # Flask-Migrate pulls in alembic (~170ms), so it is only imported when
+    # `flask db ...` actually runs; arguments go straight to its command group
+    from flask_migrate import Migrate
+    from flask_migrate.cli import db as migrate_group
+    from app import db
+
+    info = ctx.ensure_object(ScriptInfo)
+    app = info.load_app()
+    if 'migrate' not in app.extensions:
+        Migrate(app, db)
+    migrate_group.main(args=ctx.args, prog_name=ctx.command_path, obj=info)
+
+@click.command('seed')
+@click.option('--users', default=1000, show_default=True)
+@click.option('--listings', default=5000, show_default=True)
+@click.option('--transactions', default=2000, show_default=True, help='At most one per active listing.')
+@click.option('--chat-ratio', default=0.7, show_default=True, help='Share of transactions with a chat room.')
+@click.option('--seed', 'random_seed', default=42, show_default=True, help='Same seed and sizes, same dataset.')
+@click.option('--batch-size', default=5000, show_default=True, help='Rows per executemany.')
+@click.option('--password', default='seedpass123', show_default=True, help='Password of every seeded user.')
+@click.option('--reset', is_flag=True, help='Drop and recreate all tables first.')
+@with_appcontext
+def seed_cli(users, listings, transactions, chat_ratio, random_seed, batch_size, password, reset):
+    """Bulk-insert a synthetic dataset for benchmarks and local testing."""
+    from app import db
+    from app.services.seed_service import seed_database
+    from app.services.cache_service import entity_cache
+
+    if reset:
+        db.drop_all()
+        db.create_all()
+    started = time.perf_counter()
+    counts = seed_database(
+        seed=random_seed, users=users, listings=listings, transactions=transactions,
+        chat_ratio=chat_ratio, batch_size=batch_size, password=password,
+        progress=lambda table, rows: click.echo(f"  {table}: {rows} rows")
+    )
+    # Core inserts skip the mapper events that keep caches current
+    entity_cache.clear()
+    click.echo(f"Seeded {sum(counts.values())} rows in {time.perf_counter() - started:.1f}s (seed {random_seed}).")
+
+@uploads_cli.command('gc')
+@click.option('--grace-hours', default=24.0, show_default=True, help='Only touch files older than this.')
+@click.option('--max-files', type=int, default=None, help='Examine at most this many files, then checkpoint.')
+@click.option('--rate', type=float, default=200.0, show_default=True, help='Files examined per second.')
+@click.option('--quarantine', is_flag=True, help='Move orphans to UPLOAD_QUARANTINE_FOLDER instead of deleting.')
+@click.option('--dry-run', is_flag=True, help='Report what would be removed.')
+def uploads_gc(grace_hours, max_files, rate, quarantine, dry_run):
+    """Remove upload files no listing or avatar references."""
+    stats = collect_orphaned_uploads(
+        grace_period=grace_hours * 3600,
+        max_files=max_files,
+        files_per_second=rate or None,
+        quarantine=quarantine,
+        dry_run=dry_run
+    )
+    sessions = 0 if dry_run else purge_expired_upload_sessions()
+    click.echo(
+        f"Scanned {stats['scanned']} files, removed {stats['removed']} "
+        f"({stats['bytes_freed']} bytes), purged {sessions} expired upload sessions. "
+        + ("Walk complete." if stats['finished'] else "Will resume on next run.")
+    )
+
+jobs_cli = AppGroup('jobs', help='Background job queue.')
+
+@jobs_cli.command('worker')
+@click.option('--queue', 'queues', multiple=True, help='Only work these queues (repeatable). Default: all of JOB_QUEUES.')
+def jobs_worker(queues):
+    """Run job workers in this process until interrupted."""
+    from flask import current_app
+    from app.services.job_queue import job_queue
+
+    app = current_app._get_current_object()
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.set())
+    job_queue.start(app, queues=list(queues) or None)
+    try:
+        while not stopping.wait(1):
+            pass
+    except KeyboardInterrupt:
+        pass
+    click.echo("Stopping after running jobs finish...")
+    job_queue.stop()
+
+@jobs_cli.command('run')
+@click.option('--queue', 'queues', multiple=True, help='Only run these queues (repeatable).')
+@click.option('--periodic', is_flag=True, help='Enqueue due periodic tasks first.')
+def jobs_run(queues, periodic):
+    """Run every due job once in this thread, then exit (e.g. from cron)."""
+    from app.services.job_queue import job_queue
+
+    if periodic:
+        job_queue.schedule_periodic()
+    ran = job_queue.run_pending(list(queues) or None)
+    failed = sum(1 for job in ran if job.status != 'succeeded')
+    click.echo(f"Ran {len(ran)} jobs, {failed} not succeeded.")
@@ -0,0 +1,59 @@
+# app/compression.py
+import gzip
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/plain', 'text/html', 'text/css', 'application/javascript'}
+
+# Brotli 4 compresses JSON about as well as gzip 6 while using less CPU
+BROTLI_QUALITY = 4
+
+def choose_encoding(accept_encodings):
+    """'br', 'gzip' or None for the request's Accept-Encoding, preferring br on a tie."""
+    br = accept_encodings.quality('br') if brotli is not None else 0
+    gz = accept_encodings.quality('gzip')
+    if br and br >= gz:
+        return 'br'
+    return 'gzip' if gz else None
+
+def compress(body, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    # mtime=0 keeps the output identical for identical input
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+def init_app(app):
+    """Compress text responses above COMPRESS_MIN_SIZE bytes.
+
+    Register this before any other after_request hook: Flask runs them in
+    reverse, so compression sees the final body and headers (ETag included).
+    Files sent with send_file stream through untouched.
+    """
+    if not app.config['COMPRESS_ENABLED']:
+        return
+    min_size = app.config['COMPRESS_MIN_SIZE']
+    level = app.config['COMPRESS_LEVEL']
+
+    @app.after_request
+    def _compress(response):
+        if (response.direct_passthrough or response.is_streamed
+                or response.status_code < 200 or response.status_code in (204, 206, 304)
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None or (response.content_length or 0) < min_size:
+            return response
+
+        response.set_data(compress(response.get_data(), encoding, level))
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            # The bytes changed, so a strong validator no longer matches them
+            response.set_etag(etag, weak=True)
+        return response
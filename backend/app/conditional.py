@@ -0,0 +1,39 @@
+# app/conditional.py
+import hashlib
+from functools import wraps
+from flask import request, current_app, make_response
+
+def make_etag(*parts):
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+def conditional(version):
+    """Answer a GET with 304 Not Modified when version() hasn't changed.
+
+    version(*view_args) returns a cheap stamp of everything the response
+    depends on, e.g. (row count, max id, max updated_at) of the tables the
+    view reads; include the user id when the response is per-user. The
+    ETag is that stamp plus the full path (so filters and `fields=` count),
+    checked before the view runs, so an unchanged result is neither
+    queried nor serialized. Put it below @jwt_required() so version() can
+    see the caller.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(*args, **kwargs)
+            tag = make_etag(version(*args, **kwargs), request.full_path)
+            if request.if_none_match.contains_weak(tag):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            # Weak: gzip and brotli bodies of the same data share the tag
+            response.set_etag(tag, weak=True)
+            # Clients keep their copy but must revalidate it; never shared caches
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,84 @@
+# app/db_profile.py
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+def sqlite_pragmas(config):
+    """PRAGMAs run on every new SQLite connection, in order.
+
+    WAL lets readers proceed while one writer commits, synchronous=NORMAL is
+    durable across application crashes in WAL mode (only an OS crash can
+    lose the last commits), and busy_timeout makes a writer wait for the
+    lock instead of failing straight away with "database is locked".
+    """
+    return [
+        ('journal_mode', config['SQLITE_JOURNAL_MODE']),
+        ('synchronous', config['SQLITE_SYNCHRONOUS']),
+        ('busy_timeout', config['SQLITE_BUSY_TIMEOUT']),
+        ('mmap_size', config['SQLITE_MMAP_SIZE']),
+        ('cache_size', config['SQLITE_CACHE_SIZE']),
+        ('foreign_keys', 'ON' if config['SQLITE_FOREIGN_KEYS'] else 'OFF'),
+    ]
+
+def _eventlet_patched():
+    try:
+        from eventlet import patcher
+    except ImportError:
+        return False
+    return patcher.is_monkey_patched('thread')
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured database and concurrency mode."""
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    if config['DB_PROFILE'] != 'tuned':
+        return {}
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        # In-memory databases live in a single connection; leave SQLAlchemy's pool choice alone
+        return {}
+
+    mode = config['DB_POOL_MODE'] or ('eventlet' if _eventlet_patched() else 'threaded')
+    if mode == 'eventlet':
+        # Green threads all share the hub thread, and sqlite3 calls block it anyway, so
+        # extra connections only add lock contention. A small pool with a long wait queues
+        # greenlets instead of failing them.
+        options = {'pool_size': min(config['DB_POOL_SIZE'], 4), 'max_overflow': 0, 'pool_timeout': 60}
+    else:
+        options = {
+            'pool_size': config['DB_POOL_SIZE'],
+            'max_overflow': config['DB_MAX_OVERFLOW'],
+            'pool_timeout': config['DB_POOL_TIMEOUT'],
+        }
+    if url.get_backend_name() == 'sqlite':
+        # Connections are handed between request threads by the pool
+        options['connect_args'] = {'check_same_thread': False, 'timeout': config['SQLITE_BUSY_TIMEOUT'] / 1000}
+    else:
+        options['pool_pre_ping'] = True
+        options['pool_recycle'] = 1800
+    return options
+
+def configure_database(app):
+    """Fill in engine options; call before db.init_app(app)."""
+    options = engine_options(app.config)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {**options, **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})}
+
+def apply_sqlite_profile(engine, pragmas):
+    """Run pragmas on every new DBAPI connection of a SQLite engine."""
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+def init_app(app, db):
+    """Attach the SQLite profile to every engine; call after db.init_app(app)."""
+    if app.config['DB_PROFILE'] != 'tuned':
+        return
+    pragmas = sqlite_pragmas(app.config)
+    with app.app_context():
+        for engine in db.engines.values():
+            apply_sqlite_profile(engine, pragmas)
@@ -0,0 +1,103 @@
+# app/db_routing.py
+import time
+from flask import request, has_request_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+READ_BIND = 'replica'
+PRIMARY_COOKIE = 'read_primary'
+
+class RoutingSession(Session):
+    """Session that sends plain SELECTs of read-routed requests to the read engine.
+
+    Everything else goes to the primary: flushes, DML, raw connections, and
+    any read issued after this session has written something that isn't
+    committed yet, so a request always sees its own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and not self._flushing and clause is not None
+                and getattr(clause, 'is_select', False) and self._reads_from_replica()):
+            engine = self._db.engines.get(READ_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _reads_from_replica(self):
+        if not has_request_context() or getattr(request, '_db_route', None) != READ_BIND:
+            return False
+        return not self.info.get('db_wrote') and not (self.new or self.deleted or self.dirty)
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_written(session, flush_context):
+    session.info['db_wrote'] = True
+    if has_request_context():
+        request._db_wrote = True
+
+@event.listens_for(RoutingSession, 'after_commit')
+@event.listens_for(RoutingSession, 'after_soft_rollback')
+def _clear_written(session, *args):
+    session.info.pop('db_wrote', None)
+
+def read_replica(view):
+    """Route this view's reads to the read engine whatever the HTTP method."""
+    view._db_route = READ_BIND
+    return view
+
+def read_primary(view):
+    """Keep this view on the primary, e.g. a GET that creates rows or must never lag."""
+    view._db_route = 'primary'
+    return view
+
+def configure_read_bind(app):
+    """Add the read engine to SQLALCHEMY_BINDS; call before db.init_app(app).
+
+    DATABASE_READ_URL points at a replica. Without one, a file-backed SQLite
+    database gets a second engine on the same file: in WAL mode its
+    query_only connections read without waiting on the writer.
+    """
+    if not app.config['DB_READ_ROUTING']:
+        return
+    url = app.config['DATABASE_READ_URL']
+    if not url:
+        primary = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+        if primary.get_backend_name() != 'sqlite' or primary.database in (None, '', ':memory:'):
+            return
+        url = app.config['SQLALCHEMY_DATABASE_URI']
+    app.config['SQLALCHEMY_BINDS'] = {**app.config.get('SQLALCHEMY_BINDS', {}), READ_BIND: url}
+
+def init_app(app, db):
+    """Attach routing hooks; call after db.init_app(app)."""
+    with app.app_context():
+        engine = db.engines.get(READ_BIND)
+    if engine is None:
+        return
+
+    if engine.dialect.name == 'sqlite':
+        @event.listens_for(engine, 'connect')
+        def _query_only(dbapi_connection, connection_record):
+            # A write that slips through routing fails loudly instead of diverging
+            dbapi_connection.execute('PRAGMA query_only=ON')
+
+    window = app.config['DB_READ_YOUR_WRITES_WINDOW']
+
+    @app.before_request
+    def _choose_db_route():
+        view = app.view_functions.get(request.endpoint)
+        route = getattr(view, '_db_route', None)
+        if route is None:
+            route = READ_BIND if request.method in ('GET', 'HEAD') else 'primary'
+        # Read-your-writes: a client that just wrote, or asks for it explicitly, reads the primary
+        if route == READ_BIND and (PRIMARY_COOKIE in request.cookies
+                                   or request.headers.get('X-Read-Consistency') == 'primary'):
+            route = 'primary'
+        request._db_route = route
+
+    @app.after_request
+    def _remember_write(response):
+        if getattr(request, '_db_wrote', False) and response.status_code < 400 and window > 0:
+            response.set_cookie(PRIMARY_COOKIE, str(int(time.time())), max_age=window,
+                                httponly=True, samesite='Lax')
+            response.headers['X-Read-Consistency-Window'] = str(window)
+        return response
@@ -1,9 +1,11 @@
 # app/extensions.py
 from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
+from app.ratelimit import rate_limit_key, SQLiteStorage  # noqa: F401 - registers the sqlite:// scheme
 
+# Storage comes from RATELIMIT_STORAGE_URI (see create_app): memory:// for a
+# single local process, sqlite:///path to share counters between workers
 limiter = Limiter(
-    key_func=get_remote_address,
+    key_func=rate_limit_key,
     default_limits=["200 per minute", "50 per second"],
-    storage_uri="memory://"  # Using in-memory storage for simplicity
-)
\ No newline at end of file
+    strategy="sliding-window-counter"
+)
@@ -0,0 +1,52 @@
+# app/json_provider.py
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib provider is used instead
+    orjson = None
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson.
+
+    Serializes several times faster than the stdlib encoder and writes
+    datetimes as ISO 8601 itself, so serializers can hand them over as-is
+    (see native_datetimes). Keys are not sorted: no client depends on key
+    order, and sorting is a noticeable share of encoding a large list.
+    Types orjson doesn't know (Decimal, __html__ objects ...) go through
+    Flask's usual fallback.
+    """
+
+    native_datetimes = True
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        if kwargs.get('sort_keys'):
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+        # Straight to bytes, skipping the str round trip dumps() needs
+        body = orjson.dumps(obj, default=self.default, option=option)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+def init_app(app):
+    """Install the configured JSON provider ('orjson', 'default', or 'auto')."""
+    choice = app.config['JSON_PROVIDER']
+    if choice == 'orjson' and orjson is None:
+        raise RuntimeError("JSON_PROVIDER=orjson but orjson is not installed")
+    if choice in ('orjson', 'auto') and orjson is not None:
+        app.json = OrjsonProvider(app)
+
+def native_datetimes(app):
+    """True when the app's provider writes datetimes as ISO 8601 on its own."""
+    return getattr(app.json, 'native_datetimes', False)
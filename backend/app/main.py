@@ -1,17 +1,30 @@
-from flask import Flask, send_from_directory, jsonify
+from flask import Flask, jsonify
+from werkzeug.exceptions import HTTPException
 from flask_jwt_extended import JWTManager
 from app import db
-from flask_migrate import Migrate
 from app.routes import bp
 from app.chat_routes import bp as chat_bp
+from app.upload_routes import bp as upload_bp
+from app.server import bp as health_bp
 from app.socket_events import init_socketio
 import os
+import logging
 from dotenv import load_dotenv
 from app.extensions import limiter
-
-load_dotenv()
+from app import db_profile, db_routing, query_stats, metrics, json_provider, compression
+from app.commands import uploads_cli, migrate_cli, seed_cli, jobs_cli
+from app.services.password_service import password_hasher, PasswordHasherBusy
+from app.services.principal_service import principal_cache
+from app.services.cache_service import entity_cache
+from app.services.revocation_service import revocation_list
+from app.services.job_queue import job_queue
+from app.services.outbox_service import outbox
+from app import tasks  # registers the background tasks
+from app.services.upload_service import send_upload
 
 def create_app():
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
     app = Flask(__name__)
     
     # Configuration
@@ -19,6 +32,30 @@ def create_app():
         os.path.dirname(os.path.dirname(__file__)), 'database/nearbuy.db'
     ))
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['DB_PROFILE'] = os.getenv('DB_PROFILE', 'tuned')  # 'tuned' or 'default' (stock SQLAlchemy settings)
+    app.config['DB_POOL_MODE'] = os.getenv('DB_POOL_MODE')  # 'threaded', 'eventlet' or unset to detect
+    app.config['DB_POOL_SIZE'] = int(os.getenv('DB_POOL_SIZE', 10))
+    app.config['DB_MAX_OVERFLOW'] = int(os.getenv('DB_MAX_OVERFLOW', 20))
+    app.config['DB_POOL_TIMEOUT'] = float(os.getenv('DB_POOL_TIMEOUT', 30))
+    app.config['SQLITE_JOURNAL_MODE'] = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    app.config['SQLITE_SYNCHRONOUS'] = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    app.config['SQLITE_BUSY_TIMEOUT'] = int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000))  # ms
+    app.config['SQLITE_MMAP_SIZE'] = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    app.config['SQLITE_CACHE_SIZE'] = int(os.getenv('SQLITE_CACHE_SIZE', -64000))  # negative means KiB, so 64 MB
+    app.config['DB_READ_ROUTING'] = os.getenv('DB_READ_ROUTING', '1') == '1'
+    app.config['DATABASE_READ_URL'] = os.getenv('DATABASE_READ_URL')  # replica; defaults to the primary SQLite file
+    app.config['DB_READ_YOUR_WRITES_WINDOW'] = int(os.getenv('DB_READ_YOUR_WRITES_WINDOW', 5))  # seconds
+    app.config['QUERY_STATS_HEADERS'] = os.getenv('QUERY_STATS_HEADERS', '0') == '1'  # always on in debug
+    app.config['QUERY_REPEAT_WARN_THRESHOLD'] = int(os.getenv('QUERY_REPEAT_WARN_THRESHOLD', 5))  # 0 disables
+    app.config['QUERY_SLOW_THRESHOLD_MS'] = float(os.getenv('QUERY_SLOW_THRESHOLD_MS', 200))  # 0 disables
+    app.config['QUERY_SLOW_LOG_INTERVAL'] = float(os.getenv('QUERY_SLOW_LOG_INTERVAL', 60))  # seconds between reports per statement
+    app.config['METRICS_ENABLED'] = os.getenv('METRICS_ENABLED', '1') == '1'
+    app.config['METRICS_DIR'] = os.getenv('METRICS_DIR')  # shared by all workers; empty it when the server starts
+    app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN')  # if set, /metrics requires "Bearer <token>"
+    app.config['SOCKETIO_ASYNC_MODE'] = os.getenv('SOCKETIO_ASYNC_MODE', 'threading')  # gunicorn.conf.py sets eventlet/gevent
+    app.config['SOCKETIO_MESSAGE_QUEUE'] = os.getenv('SOCKETIO_MESSAGE_QUEUE')  # e.g. redis://localhost:6379/0, needed with several workers
+    app.config['SERVER_DRAIN_DELAY'] = float(os.getenv('SERVER_DRAIN_DELAY', 5))  # seconds between failing /readyz and dropping websockets
+    app.config['SQLITE_FOREIGN_KEYS'] = os.getenv('SQLITE_FOREIGN_KEYS', '0') == '1'  # enable once existing rows are known to be consistent
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', os.urandom(24))
     app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'super-secret-key-123')
     app.config["JWT_TOKEN_LOCATION"] = ["headers"]
@@ -27,26 +64,95 @@ def create_app():
     app.config["JWT_IDENTITY_CLAIM"] = "sub"
     app.config['UPLOAD_FOLDER'] = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'app', 'uploads')
     app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
+    app.config['IMAGE_WORKERS'] = int(os.getenv('IMAGE_WORKERS', 2))
+    app.config['IMAGE_VARIANT_QUALITY'] = int(os.getenv('IMAGE_VARIANT_QUALITY', 80))
+    app.config['IMAGE_VARIANTS_SYNC'] = os.getenv('IMAGE_VARIANTS_SYNC', '0') == '1'
+    app.config['UPLOAD_CACHE_MAX_AGE'] = int(os.getenv('UPLOAD_CACHE_MAX_AGE', 3600))
+    app.config['UPLOAD_SENDFILE_MODE'] = os.getenv('UPLOAD_SENDFILE_MODE')  # None, 'x-accel' or 'x-sendfile'
+    app.config['UPLOAD_ACCEL_PREFIX'] = os.getenv('UPLOAD_ACCEL_PREFIX', '/protected-uploads')
+    app.config['USE_X_SENDFILE'] = app.config['UPLOAD_SENDFILE_MODE'] == 'x-sendfile'
+    app.config['UPLOAD_SESSION_FOLDER'] = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'app', 'upload_sessions')
+    app.config['UPLOAD_SESSION_TTL'] = int(os.getenv('UPLOAD_SESSION_TTL', 24 * 3600))
+    app.config['CHUNKED_UPLOAD_MAX_SIZE'] = int(os.getenv('CHUNKED_UPLOAD_MAX_SIZE', 50 * 1024 * 1024))
+    app.config['UPLOAD_QUARANTINE_FOLDER'] = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'app', 'uploads_quarantine')
+    app.config['UPLOAD_GC_STATE_FILE'] = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'app', 'upload_gc_state.json')
+    app.config['PASSWORD_HASH_METHOD'] = os.getenv('PASSWORD_HASH_METHOD', 'scrypt')  # e.g. scrypt:32768:8:1 or pbkdf2:sha256:600000
+    app.config['PASSWORD_HASH_WORKERS'] = int(os.getenv('PASSWORD_HASH_WORKERS', min(4, os.cpu_count() or 1)))
+    app.config['PASSWORD_HASH_MAX_PENDING'] = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 64))
+    app.config['PASSWORD_HASH_QUEUE_TIMEOUT'] = float(os.getenv('PASSWORD_HASH_QUEUE_TIMEOUT', 5))
+    app.config['PRINCIPAL_CACHE_TTL'] = float(os.getenv('PRINCIPAL_CACHE_TTL', 30))
+    app.config['REVOCATION_SYNC_INTERVAL'] = float(os.getenv('REVOCATION_SYNC_INTERVAL', 5))
+    app.config['REVOCATION_REBUILD_INTERVAL'] = float(os.getenv('REVOCATION_REBUILD_INTERVAL', 600))
+    app.config['REVOCATION_BLOOM_BITS'] = int(os.getenv('REVOCATION_BLOOM_BITS', 1 << 20))  # ~1% false positives at 100k live revocations
+    app.config['REVOCATION_BLOOM_HASHES'] = int(os.getenv('REVOCATION_BLOOM_HASHES', 7))
+    app.config['JSON_PROVIDER'] = os.getenv('JSON_PROVIDER', 'auto')  # 'auto' (orjson if installed), 'orjson' or 'default'
+    app.config['COMPRESS_ENABLED'] = os.getenv('COMPRESS_ENABLED', '1') == '1'  # turn off when a proxy in front compresses
+    app.config['COMPRESS_MIN_SIZE'] = int(os.getenv('COMPRESS_MIN_SIZE', 1024))  # bytes; smaller bodies aren't worth the CPU
+    app.config['COMPRESS_LEVEL'] = int(os.getenv('COMPRESS_LEVEL', 6))  # gzip level
+    app.config['CACHE_URL'] = os.getenv('CACHE_URL', 'memory://')  # sqlite:////var/lib/nearbuy/cache.db to share between workers
+    app.config['CACHE_TTL'] = float(os.getenv('CACHE_TTL', 300))  # seconds; 0 disables the listing/profile cache
+    app.config['CACHE_MAX_ENTRIES'] = int(os.getenv('CACHE_MAX_ENTRIES', 2048))
+    app.config['JOB_WORKERS'] = os.getenv('JOB_WORKERS', 'thread')  # 'thread' (in the web process) or 'off' (run `flask jobs worker`)
+    app.config['JOB_QUEUES'] = os.getenv('JOB_QUEUES', f"default:2,images:{app.config['IMAGE_WORKERS']},maintenance:1")  # queue:max running jobs, across all workers
+    app.config['JOB_POLL_INTERVAL'] = float(os.getenv('JOB_POLL_INTERVAL', 2))  # seconds; local enqueues wake workers at once
+    app.config['JOB_LEASE_TIMEOUT'] = float(os.getenv('JOB_LEASE_TIMEOUT', 600))  # seconds before a running job is presumed orphaned
+    app.config['JOB_MAX_ATTEMPTS'] = int(os.getenv('JOB_MAX_ATTEMPTS', 5))
+    app.config['JOB_RETRY_BACKOFF'] = float(os.getenv('JOB_RETRY_BACKOFF', 10))  # seconds before the first retry, doubling after
+    app.config['JOB_RETENTION'] = int(os.getenv('JOB_RETENTION', 7 * 24 * 3600))  # seconds to keep finished jobs
+    app.config['OUTBOX_BATCH_SIZE'] = int(os.getenv('OUTBOX_BATCH_SIZE', 200))  # Socket.IO events claimed per dispatch
+    app.config['OUTBOX_POLL_INTERVAL'] = float(os.getenv('OUTBOX_POLL_INTERVAL', 1))  # seconds; local commits wake the dispatcher at once
+    app.config['OUTBOX_LEASE'] = float(os.getenv('OUTBOX_LEASE', 30))  # seconds before another dispatcher re-emits a claimed batch
+    app.config['RATELIMIT_STORAGE_URI'] = os.getenv('RATELIMIT_STORAGE_URI', 'memory://')  # e.g. sqlite:////var/lib/nearbuy/ratelimit.db
+
+    json_provider.init_app(app)
+    compression.init_app(app)  # first, so its after_request hook runs last
 
     # Initialize Socket.IO first
     socketio = init_socketio(app)
     
     # Then initialize other extensions
+    db_profile.configure_database(app)
+    db_routing.configure_read_bind(app)
     db.init_app(app)
+    db_profile.init_app(app, db)
+    db_routing.init_app(app, db)
+    query_stats.init_app(app, db)
+    metrics.init_app(app)
     jwt = JWTManager(app)
-    migrate = Migrate(app, db)
     limiter.init_app(app)
+    password_hasher.init_app(app)
+    principal_cache.init_app(app)
+    entity_cache.init_app(app)
+    revocation_list.init_app(app, jwt)
+    job_queue.init_app(app)
+    outbox.init_app(app, socketio)
 
     # Register blueprints
     app.register_blueprint(bp)
     app.register_blueprint(chat_bp)
+    app.register_blueprint(upload_bp)
+    app.register_blueprint(health_bp)
+    limiter.exempt(health_bp)
+    app.cli.add_command(uploads_cli)
+    app.cli.add_command(migrate_cli)  # Flask-Migrate is loaded when `flask db` runs
+    app.cli.add_command(seed_cli)
+    app.cli.add_command(jobs_cli)
     
-    @app.route('/uploads/<filename>')
+    @app.route('/uploads/<path:filename>')
     def serve_uploaded_file(filename):
-        return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+        return send_upload(filename)
+
+    @app.errorhandler(PasswordHasherBusy)
+    def handle_hasher_busy(e):
+        response = jsonify({"error": "Server busy, please retry"})
+        response.headers['Retry-After'] = '1'
+        return response, 503
 
     @app.errorhandler(Exception)
     def handle_exception(e):
+        # Let 404s, 405s etc. keep their status instead of becoming 500s
+        if isinstance(e, HTTPException):
+            return e
         app.logger.error(f"Unhandled Exception: {str(e)}", exc_info=True)
         return jsonify({
             "error": "Internal server error",
@@ -55,9 +161,25 @@ def create_app():
 
     return app, socketio
 
-app, socketio = create_app()
+_instance = None
+
+def __getattr__(name):
+    # `app` and `socketio` (e.g. FLASK_APP=app.main:app, wsgi.py) are built on
+    # first access, so importing create_app doesn't construct an app as well
+    global _instance
+    if name in ('app', 'socketio'):
+        if _instance is None:
+            _instance = create_app()
+        return _instance[0] if name == 'app' else _instance[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == '__main__':
+    app, socketio = create_app()
     with app.app_context():
         db.create_all()
+    # debug=True runs the app in a reloader child; start workers only in the serving process
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        if app.config['JOB_WORKERS'] == 'thread':
+            job_queue.start(app)
+        outbox.start(app)
     socketio.run(app, host='0.0.0.0', port=5000, debug=True, allow_unsafe_werkzeug=True)
\ No newline at end of file
@@ -0,0 +1,317 @@
+# app/metrics.py
+import os
+import re
+import glob
+import json
+import mmap
+import time
+import struct
+import threading
+from flask import request, Response, abort
+from app.extensions import limiter
+
+# Seconds; chosen around the API's expected range, from cache hits to slow uploads
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+_HEADER = struct.Struct('Q')
+_KEY_LEN = struct.Struct('i')
+_VALUE = struct.Struct('d')
+_INITIAL_SIZE = 64 * 1024
+_FILE_RE = re.compile(r'metrics_(\d+)\.db$')
+
+class MmapValues:
+    """Float values keyed by string in a memory-mapped file owned by one process.
+
+    Layout: an 8-byte "bytes used" header, then entries of
+    [int32 key length][key, padded to 8 bytes][float64 value]. Each process
+    writes only its own metrics_<pid>.db, so updates never contend across
+    processes and /metrics simply sums every file in the directory. An
+    entry is written before the header grows to include it, so readers
+    never see a half-written key. Without a directory the map is anonymous
+    and only this process's values are reported.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+        self._positions = {}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self.path = os.path.join(directory, f'metrics_{self.pid}.db')
+            self._file = open(self.path, 'a+b')
+            if os.fstat(self._file.fileno()).st_size < _INITIAL_SIZE:
+                self._file.truncate(_INITIAL_SIZE)
+            self._capacity = os.fstat(self._file.fileno()).st_size
+            self._map = mmap.mmap(self._file.fileno(), self._capacity)
+            for key, _, position in _read_entries(self._map):
+                self._positions[key] = position
+        else:
+            self.path = None
+            self._file = None
+            self._capacity = _INITIAL_SIZE
+            self._map = mmap.mmap(-1, self._capacity)
+        self._used = _HEADER.unpack_from(self._map, 0)[0] or _HEADER.size
+
+    def add(self, key, amount):
+        with self._lock:
+            position = self._positions.get(key)
+            if position is None:
+                position = self._append(key)
+            value = _VALUE.unpack_from(self._map, position)[0]
+            _VALUE.pack_into(self._map, position, value + amount)
+
+    def items(self):
+        return [(key, value) for key, value, _ in _read_entries(self._map)]
+
+    def _append(self, key):
+        encoded = key.encode()
+        padded = len(encoded) + (8 - (_KEY_LEN.size + len(encoded)) % 8) % 8
+        size = _KEY_LEN.size + padded + _VALUE.size
+        if self._used + size > self._capacity:
+            self._grow(self._used + size)
+        offset = self._used
+        _KEY_LEN.pack_into(self._map, offset, len(encoded))
+        self._map[offset + _KEY_LEN.size:offset + _KEY_LEN.size + len(encoded)] = encoded
+        position = offset + _KEY_LEN.size + padded
+        _VALUE.pack_into(self._map, position, 0.0)
+        self._used += size
+        _HEADER.pack_into(self._map, 0, self._used)
+        self._positions[key] = position
+        return position
+
+    def _grow(self, needed):
+        capacity = self._capacity
+        while capacity < needed:
+            capacity *= 2
+        if self._file is None:
+            grown = mmap.mmap(-1, capacity)
+            grown[:self._capacity] = self._map[:]
+        else:
+            self._map.close()
+            self._file.truncate(capacity)
+            grown = mmap.mmap(self._file.fileno(), capacity)
+        self._map = grown
+        self._capacity = capacity
+
+def _read_entries(buffer):
+    used = _HEADER.unpack_from(buffer, 0)[0]
+    offset = _HEADER.size
+    while offset < used:
+        length = _KEY_LEN.unpack_from(buffer, offset)[0]
+        key = bytes(buffer[offset + _KEY_LEN.size:offset + _KEY_LEN.size + length]).decode()
+        padded = length + (8 - (_KEY_LEN.size + length) % 8) % 8
+        position = offset + _KEY_LEN.size + padded
+        yield key, _VALUE.unpack_from(buffer, position)[0], position
+        offset = position + _VALUE.size
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = {}
+        self.directory = None
+        self._values = None
+        self._lock = threading.Lock()
+
+    def configure(self, directory):
+        with self._lock:
+            self.directory = directory
+            self._values = None
+
+    @property
+    def values(self):
+        # Re-open after a fork so a worker never writes into its parent's file
+        values = self._values
+        if values is None or values.pid != os.getpid():
+            with self._lock:
+                values = self._values
+                if values is None or values.pid != os.getpid():
+                    values = self._values = MmapValues(self.directory)
+        return values
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def collect(self):
+        """Sum samples across every process file: {key: value}, gauges from live processes only."""
+        totals = {}
+        if self.directory:
+            self.values  # make sure this process has a file too
+            sources = []
+            for path in glob.glob(os.path.join(self.directory, 'metrics_*.db')):
+                match = _FILE_RE.search(path)
+                with open(path, 'rb') as f:
+                    data = f.read()
+                if len(data) >= _HEADER.size:
+                    sources.append((int(match.group(1)), data))
+        else:
+            sources = [(os.getpid(), self.values._map[:])]
+
+        for pid, data in sources:
+            alive = None
+            for key, value, _ in _read_entries(data):
+                name = json.loads(key)[0]
+                metric = self.metrics.get(name)
+                if metric is None:
+                    continue
+                if metric.kind == 'gauge':
+                    if alive is None:
+                        alive = _pid_alive(pid)
+                    if not alive:
+                        continue
+                totals[key] = totals.get(key, 0.0) + value
+        return totals
+
+    def render(self):
+        samples = {}
+        for key, value in self.collect().items():
+            name, suffix, labels = json.loads(key)
+            samples.setdefault(name, []).append((suffix, labels, value))
+
+        lines = []
+        for name in sorted(samples):
+            metric = self.metrics[name]
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            lines.extend(metric.format(samples[name]))
+        return '\n'.join(lines) + '\n'
+
+registry = MetricsRegistry()
+
+class Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._keys = {}
+        registry.register(self)
+
+    def _key(self, suffix, labels):
+        cache_key = (suffix, tuple(labels.items()))
+        key = self._keys.get(cache_key)
+        if key is None:
+            key = self._keys[cache_key] = json.dumps([self.name, suffix, sorted(labels.items())])
+        return key
+
+    def format(self, samples):
+        return [f'{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}'
+                for suffix, labels, value in sorted(samples, key=lambda s: (s[1], s[0]))]
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        registry.values.add(self._key('', labels), amount)
+
+class Gauge(Metric):
+    """Summed over live processes, so only inc/dec make sense."""
+    kind = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        registry.values.add(self._key('', labels), amount)
+
+    def dec(self, amount=1, **labels):
+        registry.values.add(self._key('', labels), -amount)
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        values = registry.values
+        # Only the first matching bucket is stored; render makes them cumulative
+        for bound in self.buckets:
+            if value <= bound:
+                values.add(self._key(f'_bucket:{bound}', labels), 1)
+                break
+        values.add(self._key('_count', labels), 1)
+        values.add(self._key('_sum', labels), value)
+
+    def format(self, samples):
+        series = {}
+        for suffix, labels, value in samples:
+            series.setdefault(tuple(map(tuple, labels)), {})[suffix] = value
+
+        lines = []
+        for labels in sorted(series):
+            values = series[labels]
+            cumulative = 0.0
+            for bound in self.buckets:
+                cumulative += values.get(f'_bucket:{bound}', 0.0)
+                lines.append(f'{self.name}_bucket{_format_labels([*labels, ("le", repr(bound))])} '
+                             f'{_format_value(cumulative)}')
+            count = values.get('_count', 0.0)
+            lines.append(f'{self.name}_bucket{_format_labels([*labels, ("le", "+Inf")])} {_format_value(count)}')
+            lines.append(f'{self.name}_count{_format_labels(labels)} {_format_value(count)}')
+            lines.append(f'{self.name}_sum{_format_labels(labels)} {_format_value(values.get("_sum", 0.0))}')
+        return lines
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+               for k, v in labels)
+    return '{' + ','.join(escaped) + '}'
+
+def _format_value(value):
+    return str(int(value)) if value == int(value) else repr(value)
+
+http_requests_total = Counter('http_requests_total', 'HTTP requests handled, by route and status.')
+http_request_duration = Histogram('http_request_duration_seconds', 'HTTP request latency by route.')
+http_request_db_time = Histogram('http_request_db_seconds', 'Database time spent per HTTP request, by route.',
+                                 buckets=DB_BUCKETS)
+db_queries_total = Counter('db_queries_total', 'SQL statements executed while handling requests, by route.')
+socketio_connections = Gauge('socketio_connections', 'Open Socket.IO connections.')
+socketio_events_total = Counter('socketio_events_total', 'Socket.IO events received, by event.')
+socketio_emit_duration = Histogram('socketio_emit_duration_seconds', 'Time spent emitting Socket.IO events.',
+                                   buckets=DB_BUCKETS)
+upload_bytes_total = Counter('upload_bytes_total', 'Bytes received by upload endpoints, by kind.')
+
+def init_app(app):
+    """Time every request and serve /metrics."""
+    if not app.config['METRICS_ENABLED']:
+        return
+    registry.configure(app.config['METRICS_DIR'])
+
+    def _start_timer():
+        request._metrics_started = time.perf_counter()
+    # Ahead of the limiter's hook so rejected requests are timed and counted too
+    app.before_request_funcs.setdefault(None, []).insert(0, _start_timer)
+
+    @app.after_request
+    def _record_request(response):
+        started = getattr(request, '_metrics_started', None)
+        if started is None or request.endpoint == 'metrics':
+            return response
+        # The URL rule, not the path, so /api/listings/1 and /api/listings/2 share a series
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        http_request_duration.observe(time.perf_counter() - started, method=request.method, route=route)
+        http_requests_total.inc(method=request.method, route=route, status=str(response.status_code))
+        stats = getattr(request, '_query_stats', None)
+        if stats is not None:
+            http_request_db_time.observe(stats.duration, route=route)
+            db_queries_total.inc(stats.count, route=route)
+        return response
+
+    token = app.config['METRICS_TOKEN']
+
+    def metrics():
+        if token and request.headers.get('Authorization') != f'Bearer {token}':
+            abort(401)
+        return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+    app.add_url_rule('/metrics', 'metrics', limiter.exempt(metrics))
@@ -2,5 +2,9 @@ from .user_model import User
 from .listing_model import Listing, Transaction
 from .chat_model import ChatRoom, ChatMessage 
 from .transaction_status_history import TransactionStatusHistory
+from .upload_model import UploadObject, UploadSession
+from .token_model import RevokedToken
+from .job_model import Job
+from .outbox_model import OutboxEvent
 
-__all__ = ['User', 'Listing', 'Transaction', 'ChatRoom', 'ChatMessage', 'TransactionStatusHistory']
\ No newline at end of file
+__all__ = ['User', 'Listing', 'Transaction', 'ChatRoom', 'ChatMessage', 'TransactionStatusHistory', 'UploadObject', 'UploadSession', 'RevokedToken', 'Job', 'OutboxEvent']
\ No newline at end of file
@@ -0,0 +1,40 @@
+from app import db
+from datetime import datetime, timezone
+
+class Job(db.Model):
+    __tablename__ = 'jobs'
+    id = db.Column(db.Integer, primary_key=True)
+    queue = db.Column(db.String(50), nullable=False, default='default')
+    name = db.Column(db.String(100), nullable=False)  # Registered task, e.g. images.generate_variants
+    payload = db.Column(db.Text, nullable=False, default='{}')  # JSON keyword arguments for the task
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued/running/succeeded/failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))  # Not before; pushed back on retry
+    unique_key = db.Column(db.String(200), nullable=True, unique=True)  # At most one job per key, e.g. a periodic job's time slot
+    locked_by = db.Column(db.String(100), nullable=True)  # host:pid:thread of the worker running it
+    locked_at = db.Column(db.DateTime, nullable=True)  # Running jobs whose lease ran out are requeued
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        # The claim query: next due job of a queue
+        db.Index('ix_jobs_queue_status_run_at', 'queue', 'status', 'run_at'),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "queue": self.queue,
+            "name": self.name,
+            "payload": self.payload,
+            "status": self.status,
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "run_at": self.run_at.isoformat() if self.run_at else None,
+            "locked_by": self.locked_by,
+            "last_error": self.last_error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None
+        }
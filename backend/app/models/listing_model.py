@@ -1,4 +1,5 @@
 from app import db
+from app.services.image_service import variant_urls
 from datetime import datetime, timezone, timedelta
 
 class Listing(db.Model):
@@ -9,7 +10,7 @@ class Listing(db.Model):
     price = db.Column(db.Float, nullable=False)
     category = db.Column(db.String(50))
     image_url = db.Column(db.String(255)) 
-    seller_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    seller_id = db.Column(db.Integer, db.ForeignKey('users.id'), index=True)
     created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime(timezone=True), onupdate=lambda: datetime.now(timezone.utc))  # Track updates
     status = db.Column(db.String(20), default='active')  # active/removed/flagged/sold
@@ -27,6 +28,7 @@ class Listing(db.Model):
             "price": self.price,
             "category": self.category,
             "image_url": self.image_url,
+            "image_variants": variant_urls(self.image_url),
             "seller_id": self.seller_id,
             "status": self.status,
             "created_at": self.created_at.isoformat() if self.created_at else None,
@@ -37,8 +39,8 @@ class Transaction(db.Model):
     __tablename__ = 'transactions'
     id = db.Column(db.Integer, primary_key=True)
     qr_code = db.Column(db.String(100), unique=True)
-    buyer_id = db.Column(db.Integer, db.ForeignKey('users.id'))
-    seller_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    buyer_id = db.Column(db.Integer, db.ForeignKey('users.id'), index=True)
+    seller_id = db.Column(db.Integer, db.ForeignKey('users.id'), index=True)
     listing_id = db.Column(db.Integer, db.ForeignKey('listings.id'))
     created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)) #Should record when the transaction was initially created (QR generated)
     completed = db.Column(db.Boolean, default=False)
@@ -0,0 +1,12 @@
+from app import db
+from datetime import datetime, timezone
+
+class OutboxEvent(db.Model):
+    __tablename__ = 'outbox_events'
+    id = db.Column(db.Integer, primary_key=True)  # Delivery order
+    event = db.Column(db.String(50), nullable=False)  # Socket.IO event name, e.g. new_message
+    room = db.Column(db.String(100), nullable=False)  # Socket.IO room to emit to, e.g. room_12
+    payload = db.Column(db.Text, nullable=False)  # JSON event data
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    claimed_by = db.Column(db.String(100), nullable=True)  # Dispatcher emitting it; rows are deleted once emitted
+    claimed_at = db.Column(db.DateTime, nullable=True)  # Claims older than OUTBOX_LEASE are taken over
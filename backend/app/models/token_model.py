@@ -0,0 +1,10 @@
+from app import db
+from datetime import datetime, timezone
+
+class RevokedToken(db.Model):
+    __tablename__ = 'revoked_tokens'
+    id = db.Column(db.Integer, primary_key=True)  # Monotonic, lets workers sync only new rows
+    jti = db.Column(db.String(64), nullable=True, index=True)  # Single token (logout)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True, index=True)  # Every token of a user issued before revoked_at
+    revoked_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)  # When the revoked token(s) would have expired anyway
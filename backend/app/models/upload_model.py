@@ -0,0 +1,37 @@
+from app import db
+from datetime import datetime, timezone
+
+class UploadObject(db.Model):
+    __tablename__ = 'upload_objects'
+    sha256 = db.Column(db.String(64), primary_key=True)  # Hex digest of the file contents
+    extension = db.Column(db.String(10), nullable=False)
+    size = db.Column(db.Integer, nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)  # Listings/avatars pointing at this object
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    @property
+    def relative_path(self):
+        # Two levels of 256-way sharding keep directories small
+        return f"{self.sha256[:2]}/{self.sha256[2:4]}/{self.sha256}.{self.extension}"
+
+class UploadSession(db.Model):
+    __tablename__ = 'upload_sessions'
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex, handed to the client
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    extension = db.Column(db.String(10), nullable=False)
+    total_size = db.Column(db.Integer, nullable=False)
+    chunk_size = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), default='open')  # open/finalizing/complete
+    object_sha256 = db.Column(db.String(64), db.ForeignKey('upload_objects.sha256'), nullable=True)  # Set on finalize
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    upload_object = db.relationship('UploadObject')
+
+    @property
+    def total_chunks(self):
+        return max(1, -(-self.total_size // self.chunk_size))
+
+    def expected_chunk_size(self, index):
+        if index < self.total_chunks - 1:
+            return self.chunk_size
+        return self.total_size - self.chunk_size * (self.total_chunks - 1)
@@ -1,6 +1,7 @@
 from app import db
-from sqlalchemy import event
-from werkzeug.security import generate_password_hash
+from sqlalchemy import event, false, func
+from datetime import datetime, timezone
+from app.services.password_service import password_hasher
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -14,9 +15,10 @@ class User(db.Model):
     location = db.Column(db.String(100))  
     phone = db.Column(db.String(20), 
                      info={'check_constraint': 'length(phone) >= 8'})
-    is_deleted = db.Column(db.Boolean, default=False)  
+    is_deleted = db.Column(db.Boolean, nullable=False, default=False, server_default=false())
     deleted_at = db.Column(db.DateTime, nullable=True) 
     original_email = db.Column(db.String(80))  # Store original email before anonymization
+    updated_at = db.Column(db.DateTime(timezone=True), onupdate=lambda: datetime.now(timezone.utc))  # Version stamp for conditional GETs
     # As a SELLER (listings they created)
     listings = db.relationship(
         'Listing', 
@@ -43,8 +45,15 @@ class User(db.Model):
 
     sent_messages = db.relationship('ChatMessage', back_populates='sender', lazy=True)
 
+    __table_args__ = (
+        # Admin user list: live users by id, and prefix search on email and name
+        db.Index('ix_users_is_deleted_id', 'is_deleted', 'id'),
+        db.Index('ix_users_lower_email', 'is_deleted', func.lower(email)),
+        db.Index('ix_users_lower_name', 'is_deleted', func.lower(name)),
+    )
+
 @event.listens_for(User.password, 'set', retval=True)
 def hash_password(target, value, oldvalue, initiator):
     if value != oldvalue:
-        return generate_password_hash(value)
+        return password_hasher.hash(value)
     return value
\ No newline at end of file
@@ -0,0 +1,209 @@
+# app/query_stats.py
+import re
+import time
+import hashlib
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from flask import request, has_request_context
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Collectors opened by capture(), e.g. pytest query budgets
+_captures = []
+
+class QueryStats:
+    """Statements executed while handling one request (or inside capture())."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+
+    def repeated(self, threshold):
+        """(statement, times) pairs run at least threshold times: the N+1 suspects."""
+        return [(s, n) for s, n in self.statements.most_common() if n >= threshold]
+
+def current_stats():
+    if not has_request_context():
+        return None
+    stats = getattr(request, '_query_stats', None)
+    if stats is None:
+        stats = request._query_stats = QueryStats()
+    return stats
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+
+def normalize_sql(statement):
+    """Collapse whitespace, literals and IN lists so one query shape has one fingerprint."""
+    normalized = ' '.join(statement.split())
+    normalized = _STRING_RE.sub('?', normalized)
+    normalized = _NUMBER_RE.sub('?', normalized)
+    return _IN_LIST_RE.sub('(...)', normalized)
+
+def redact_parameters(parameters):
+    """Keep numbers and NULLs, which explain most plans; hide everything else."""
+    if isinstance(parameters, dict):
+        return {key: _redact(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_redact(value) for value in parameters]
+    return _redact(parameters)
+
+def _redact(value):
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f'<bytes:{len(value)}>'
+    return f'<{type(value).__name__}:{len(str(value))}>'
+
+class SlowQueryLog:
+    """Statements slower than threshold seconds, aggregated by fingerprint.
+
+    Each fingerprint is logged at most once per interval seconds (with the
+    number of occurrences suppressed since) and its EXPLAIN QUERY PLAN is
+    captured once, so a slow query that runs on every request neither
+    floods the log nor doubles its own cost. top() ranks fingerprints by
+    total time spent for this process.
+    """
+
+    def __init__(self, threshold=0.2, interval=60.0, max_fingerprints=500):
+        self.threshold = threshold
+        self.interval = interval
+        self.max_fingerprints = max_fingerprints
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def configure(self, threshold, interval):
+        self.threshold = threshold
+        self.interval = interval
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def record(self, conn, statement, parameters, duration, executemany):
+        normalized = normalize_sql(statement)
+        fingerprint = hashlib.sha1(normalized.encode()).hexdigest()[:12]
+        route = f'{request.method} {request.endpoint}' if has_request_context() else 'background'
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                if len(self._entries) >= self.max_fingerprints:
+                    # Forget the cheapest fingerprint rather than grow without bound
+                    cheapest = min(self._entries, key=lambda f: self._entries[f]['total'])
+                    del self._entries[cheapest]
+                entry = self._entries[fingerprint] = {
+                    'fingerprint': fingerprint, 'sql': normalized, 'count': 0, 'total': 0.0,
+                    'max': 0.0, 'routes': Counter(), 'plan': None, 'logged_at': None, 'suppressed': 0,
+                }
+            entry['count'] += 1
+            entry['total'] += duration
+            entry['max'] = max(entry['max'], duration)
+            entry['routes'][route] += 1
+            needs_plan = entry['plan'] is None and not executemany
+            due = entry['logged_at'] is None or now - entry['logged_at'] >= self.interval
+            if due:
+                entry['logged_at'] = now
+                suppressed, entry['suppressed'] = entry['suppressed'], 0
+            else:
+                entry['suppressed'] += 1
+
+        if needs_plan:
+            entry['plan'] = self._explain(conn, statement, parameters)
+        if due:
+            logger.warning(
+                f"Slow query {fingerprint} took {duration * 1000:.1f}ms in {route}"
+                + (f" ({suppressed} more since last report)" if suppressed else "")
+                + f": {normalized} params={redact_parameters(parameters)} plan={entry['plan']}"
+            )
+
+    def _explain(self, conn, statement, parameters):
+        if conn.dialect.name != 'sqlite' or not statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            return []
+        # A raw DBAPI cursor, so the plan query isn't itself counted or timed
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute(f'EXPLAIN QUERY PLAN {statement}', parameters or ())
+            return [row[-1] for row in cursor.fetchall()]
+        except Exception as e:
+            return [f'unavailable: {e}']
+        finally:
+            cursor.close()
+
+    def top(self, limit=20):
+        with self._lock:
+            entries = sorted(self._entries.values(), key=lambda e: e['total'], reverse=True)[:limit]
+            return [{
+                'fingerprint': e['fingerprint'],
+                'sql': e['sql'],
+                'count': e['count'],
+                'total_ms': round(e['total'] * 1000, 2),
+                'mean_ms': round(e['total'] / e['count'] * 1000, 2),
+                'max_ms': round(e['max'] * 1000, 2),
+                'routes': dict(e['routes'].most_common(5)),
+                'plan': e['plan'],
+            } for e in entries]
+
+slow_query_log = SlowQueryLog()
+
+@contextmanager
+def capture():
+    """Collect every statement run inside the block, in any request or none."""
+    stats = QueryStats()
+    _captures.append(stats)
+    try:
+        yield stats
+    finally:
+        _captures.remove(stats)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info['query_start'] = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info.pop('query_start', time.perf_counter())
+    stats = current_stats()
+    if stats is not None:
+        stats.record(statement, duration)
+    for collected in _captures:
+        collected.record(statement, duration)
+    if slow_query_log.threshold and duration >= slow_query_log.threshold:
+        slow_query_log.record(conn, statement, parameters, duration, executemany)
+
+def init_app(app, db):
+    """Count statements and DB time per request; call after db.init_app(app)."""
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    slow_query_log.configure(app.config['QUERY_SLOW_THRESHOLD_MS'] / 1000, app.config['QUERY_SLOW_LOG_INTERVAL'])
+    threshold = app.config['QUERY_REPEAT_WARN_THRESHOLD']
+
+    @app.after_request
+    def _report_query_stats(response):
+        stats = getattr(request, '_query_stats', None)
+        if stats is None:
+            return response
+        if app.debug or app.config['QUERY_STATS_HEADERS']:
+            response.headers['X-DB-Query-Count'] = str(stats.count)
+            response.headers['X-DB-Time-Ms'] = f"{stats.duration * 1000:.2f}"
+            response.headers.add('Server-Timing', f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries"')
+        if threshold:
+            for statement, times in stats.repeated(threshold):
+                logger.warning(
+                    f"Possible N+1 in {request.method} {request.path} ({request.endpoint}): "
+                    f"statement ran {times} times: {' '.join(statement.split())[:200]}"
+                )
+        return response
@@ -0,0 +1,170 @@
+# app/ratelimit.py
+import os
+import time
+import sqlite3
+import threading
+from flask import request
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from flask_limiter.util import get_remote_address
+from limits.storage import Storage, SlidingWindowCounterSupport
+from limits.storage.base import TimestampedSlidingWindow
+
+def rate_limit_key():
+    """Bucket authenticated callers by user, everyone else by client IP.
+
+    Keying by user stops every phone behind one carrier NAT from sharing a
+    single bucket. A missing, expired or revoked token falls back to the IP.
+    """
+    if request.headers.get('Authorization'):
+        try:
+            verify_jwt_in_request(optional=True)
+            identity = get_jwt_identity()
+            if identity is not None:
+                return f"user:{identity}"
+        except Exception:
+            pass
+    return f"ip:{get_remote_address()}"
+
+class SQLiteStorage(Storage, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    """Rate limit counters in a local SQLite file shared by every worker process.
+
+    ``sqlite:////var/lib/nearbuy/ratelimit.db``. The file runs in WAL mode
+    with memory-mapped reads, so a limiter check is one short write
+    transaction on a local file; SQLite's write lock makes the
+    check-and-increment atomic across processes.
+    """
+
+    STORAGE_SCHEME = ['sqlite']
+    # Delete expired counters once per this many writes from a process; every window writes a new key
+    PURGE_EVERY = 1000
+
+    def __init__(self, uri=None, wrap_exceptions=False, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        path = uri.split('://', 1)[1]
+        self.path = path[1:] if path.startswith('/') else path
+        self.busy_timeout = int(options.get('busy_timeout', 5000))
+        self._local = threading.local()
+        self._writes = 0
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS counters ('
+                'key TEXT PRIMARY KEY, value INTEGER NOT NULL, expires_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_counters_expires_at ON counters (expires_at)')
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            # isolation_level=None: we issue BEGIN IMMEDIATE ourselves where it matters
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout / 1000, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(f'PRAGMA busy_timeout={self.busy_timeout}')
+            conn.execute('PRAGMA mmap_size=67108864')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def incr(self, key, expiry, amount=1):
+        now = time.time()
+        row = self._connect().execute(
+            'INSERT INTO counters (key, value, expires_at) VALUES (?, ?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET '
+            'value = CASE WHEN expires_at <= ? THEN excluded.value ELSE value + excluded.value END, '
+            'expires_at = CASE WHEN expires_at <= ? THEN excluded.expires_at ELSE expires_at END '
+            'RETURNING value',
+            (key, amount, now + expiry, now, now)
+        ).fetchone()
+        self._count_write()
+        return row[0]
+
+    def decr(self, key, amount=1):
+        row = self._connect().execute(
+            'UPDATE counters SET value = max(value - ?, 0) WHERE key = ? RETURNING value', (amount, key)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get(self, key):
+        row = self._connect().execute(
+            'SELECT value FROM counters WHERE key = ? AND expires_at > ?', (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key):
+        row = self._connect().execute('SELECT expires_at FROM counters WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else time.time()
+
+    def check(self):
+        try:
+            self._connect().execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self):
+        return self._connect().execute('DELETE FROM counters').rowcount
+
+    def clear(self, key):
+        self._connect().execute('DELETE FROM counters WHERE key = ?', (key,))
+
+    def acquire_sliding_window_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+        conn = self._connect()
+        now = time.time()
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        # Read and increment in one write transaction so concurrent workers
+        # can't both squeeze in the last slot
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            previous_count, previous_ttl, current_count, _ = self._window_info(
+                conn, previous_key, current_key, expiry, now
+            )
+            if int(previous_count * previous_ttl / expiry + current_count) + amount > limit:
+                conn.execute('ROLLBACK')
+                return False
+            conn.execute(
+                'INSERT INTO counters (key, value, expires_at) VALUES (?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET value = value + excluded.value',
+                (current_key, amount, now + 2 * expiry)
+            )
+            conn.execute('COMMIT')
+            self._count_write()
+            return True
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def get_sliding_window(self, key, expiry):
+        now = time.time()
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        return self._window_info(self._connect(), previous_key, current_key, expiry, now)
+
+    def clear_sliding_window(self, key, expiry):
+        previous_key, current_key = self.sliding_window_keys(key, expiry, time.time())
+        self._connect().execute('DELETE FROM counters WHERE key IN (?, ?)', (previous_key, current_key))
+
+    def _window_info(self, conn, previous_key, current_key, expiry, now):
+        counts = dict(conn.execute(
+            'SELECT key, value FROM counters WHERE key IN (?, ?) AND expires_at > ?',
+            (previous_key, current_key, now)
+        ).fetchall())
+        previous_count = counts.get(previous_key, 0)
+        current_count = counts.get(current_key, 0)
+        previous_ttl = 0.0 if previous_count == 0 else (1 - (((now - expiry) / expiry) % 1)) * expiry
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl
+
+    def _count_write(self):
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            self.purge_expired()
+
+    def purge_expired(self):
+        return self._connect().execute('DELETE FROM counters WHERE expires_at <= ?', (time.time(),)).rowcount
@@ -1,25 +1,38 @@
 from flask import Blueprint, request, jsonify, current_app, app
-from flask_jwt_extended import jwt_required, get_jwt_identity, create_access_token, create_refresh_token
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt, decode_token, create_access_token, create_refresh_token
 from app.extensions import limiter
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.services.password_service import password_hasher, PasswordHasherBusy
 from uuid import uuid4 
 from app import db
 from app.models.user_model import User
 from app.models.listing_model import Listing, Transaction
+from app.models.job_model import Job
 from app.services.auth_service import authenticate_user  
+from app.services.principal_service import current_principal
+from app.services.cache_service import entity_cache
+from app.services.search_cache import cached_search, fold_case
+from app.services.revocation_service import revocation_list
+from app.services.job_queue import job_queue
 from functools import wraps
 from datetime import datetime, timedelta, timezone
 import logging
-from app.services.upload_service import save_uploaded_file
+from app.services.upload_service import save_uploaded_file, ALLOWED_EXTENSIONS
+from app.services.storage_service import store_bytes, release, object_url
+from app.services.image_service import schedule_variants, variant_urls
+from app.metrics import upload_bytes_total
+from app.query_stats import slow_query_log
+from app.serializers import listing_projection, history_projection, requested_fields, Counterparty
+from app.conditional import conditional
+from app.db_routing import read_primary
 from werkzeug.utils import secure_filename
 import base64
 import os
 import uuid
 import time 
 from sqlalchemy.orm import joinedload
+from sqlalchemy import func, case, or_, select, union_all, literal
 
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 bp = Blueprint('api', __name__, url_prefix='/api')
@@ -30,8 +43,7 @@ bp = Blueprint('api', __name__, url_prefix='/api')
 def admin_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        current_user = User.query.get(int(get_jwt_identity()))
-        print(f"Admin check for user {current_user.id}, is_admin={current_user.is_admin}") 
+        current_user = current_principal()
         if not current_user or not current_user.is_admin:
             return jsonify({"error": "Admin access required"}), 403
         return f(*args, **kwargs)
@@ -65,6 +77,8 @@ def register():
             "is_admin": new_user.is_admin
         }), 201
         
+    except PasswordHasherBusy:
+        raise
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": "Registration failed"}), 500
@@ -76,8 +90,8 @@ def login():
     if not data or 'email' not in data or 'password' not in data:
         return jsonify({"error": "Email and password required"}), 400
         
-    user = User.query.filter_by(email=data['email'].lower()).first()
-    if not user or not check_password_hash(user.password, data['password']):
+    user = authenticate_user(data['email'].lower(), data['password'])
+    if not user:
         return jsonify({"error": "Invalid credentials"}), 401
         
     return jsonify({
@@ -101,6 +115,7 @@ def get_current_user():
         "email": current_user.email,
         "name": current_user.name, 
         "avatar": current_user.avatar, 
+        "avatar_variants": variant_urls(current_user.avatar),
         "bio": current_user.bio,
         "location": current_user.location,
         "phone": current_user.phone,
@@ -123,6 +138,17 @@ def verify_token():
 @bp.route('/auth/logout', methods=['POST'])
 @jwt_required()
 def logout():
+    revocation_list.revoke_token(get_jwt())
+
+    # Let the client hand over its refresh token so it dies with the session
+    data = request.get_json(silent=True) or {}
+    if data.get('refresh_token'):
+        try:
+            revocation_list.revoke_token(decode_token(data['refresh_token']))
+        except Exception:
+            pass  # Already expired or not ours; nothing to revoke
+
+    db.session.commit()
     return jsonify({"message": "Logged out successfully"}), 200
 
 @bp.route('/auth/change-email', methods=['POST'])
@@ -131,7 +157,7 @@ def change_email():
     current_user = User.query.get(int(get_jwt_identity()))
     data = request.get_json()
     
-    if not check_password_hash(current_user.password, data['currentPassword']):
+    if not password_hasher.verify(current_user.password, data['currentPassword']):
         return jsonify({"error": "Invalid password"}), 401
         
     if User.query.filter_by(email=data['newEmail']).first():
@@ -155,7 +181,7 @@ def change_password():
     if not data or 'currentPassword' not in data or 'newPassword' not in data:
         return jsonify({"error": "Current and new password required"}), 400
         
-    if not check_password_hash(user.password, data['currentPassword']):
+    if not password_hasher.verify(user.password, data['currentPassword']):
         return jsonify({"error": "Invalid current password"}), 401
         
     if len(data['newPassword']) < 8:
@@ -189,37 +215,50 @@ def refresh():
 @bp.route('/users/<int:user_id>', methods=['GET'])
 @jwt_required()
 def get_user(user_id):
-    user = User.query.get(user_id)
-    if not user:
+    profile = entity_cache.get_or_load('user', user_id, lambda: _load_public_profile(user_id))
+    if profile is None:
         return jsonify({"error": "User not found"}), 404
-    
-    ratings = [t.rating for t in user.sales if t.rating is not None]
-    avg_rating = round(sum(ratings) / len(ratings), 1) if ratings else 0
+    return jsonify(profile), 200
+
+def _load_public_profile(user_id):
+    user = db.session.get(User, user_id)
+    if not user:
+        return None
+
+    # Aggregated in SQL rather than by loading every sale
+    avg_rating = db.session.query(func.avg(Transaction.rating)).filter(
+        Transaction.seller_id == user_id,
+        Transaction.rating != None
+    ).scalar()
 
     listings_count = Listing.query.filter_by(
         seller_id=user_id,
         status='active'
     ).count()
     
-    return jsonify({
+    return {
         "id": user.id,
         "email": user.email,
         "name": user.name,
         "avatar": user.avatar,
+        "avatar_variants": variant_urls(user.avatar),
         "bio": user.bio,
         "location": user.location,
         "phone": user.phone,
-        "rating": avg_rating,
+        "rating": round(avg_rating, 1) if avg_rating is not None else 0,
         "listings_count": listings_count,
         "is_admin": user.is_admin
-    }), 200
+    }
 
 @bp.route('/users/<int:user_id>', methods=['PUT', 'DELETE'])
 @jwt_required()
 def user_profile(user_id):
     current_user_id = int(get_jwt_identity())
+    current_user = current_principal()
+    if not current_user:
+        return jsonify({"error": "User not found"}), 404
     
-    if current_user_id != user_id and not User.query.get(current_user_id).is_admin:
+    if current_user_id != user_id and not current_user.is_admin:
         return jsonify({"error": "Unauthorized"}), 403
 
     user = User.query.get_or_404(user_id)
@@ -230,6 +269,7 @@ def user_profile(user_id):
             "email": user.email,
             "name": user.name,
             "avatar": user.avatar,
+            "avatar_variants": variant_urls(user.avatar),
             "bio": user.bio,
             "location": user.location,
             "phone": user.phone,
@@ -241,15 +281,20 @@ def user_profile(user_id):
     elif request.method == 'PUT':
         try:
             data = {}
+            new_avatar = None
             if request.content_type and 'multipart/form-data' in request.content_type:
                 data = request.form.to_dict()
                 avatar_file = request.files.get('avatar')
                 
                 if avatar_file:
-                    filename = secure_filename(f"{user_id}_avatar_{int(time.time())}.{avatar_file.filename.split('.')[-1]}")
-                    filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-                    avatar_file.save(filepath)
-                    user.avatar = f"/uploads/{filename}"
+                    ext = avatar_file.filename.rsplit('.', 1)[-1].lower()
+                    if ext not in ALLOWED_EXTENSIONS:
+                        return jsonify({"error": "Invalid image format"}), 400
+                    avatar_bytes = avatar_file.read()
+                    upload_bytes_total.inc(len(avatar_bytes), kind='avatar')
+                    new_avatar, created = store_bytes(avatar_bytes, ext)
+                    release(user.avatar)
+                    user.avatar = object_url(new_avatar)
             else:
                 data = request.get_json()
 
@@ -267,6 +312,8 @@ def user_profile(user_id):
             if 'phone' in data:
                 user.phone = data['phone']
 
+            if new_avatar is not None and created:
+                schedule_variants(new_avatar.relative_path)
             db.session.commit()
 
             return jsonify({
@@ -274,6 +321,7 @@ def user_profile(user_id):
                 "email": user.email,
                 "name": user.name,
                 "avatar": user.avatar,
+                "avatar_variants": variant_urls(user.avatar),
                 "bio": user.bio,
                 "location": user.location,
                 "phone": user.phone,
@@ -321,7 +369,7 @@ def get_seller_rating(seller_id):
 @jwt_required()
 def create_listing():
     try:
-        current_user = User.query.get(int(get_jwt_identity()))
+        current_user = current_principal()
         if not current_user:
             return jsonify({"error": "User not found"}), 404
             
@@ -364,14 +412,18 @@ def create_listing():
             "details": str(e)
         }), 500
 
+def _load_listing(listing_id):
+    listing = db.session.get(Listing, listing_id)
+    return listing.to_dict() if listing else None
+
 @bp.route('/listings/<int:listing_id>', methods=['GET'])
 def get_listing(listing_id):
     try:
-        listing = Listing.query.get(listing_id)
-        if not listing:
+        listing = entity_cache.get_or_load('listing', listing_id, lambda: _load_listing(listing_id))
+        if listing is None:
             return jsonify({"error": "Listing not found"}), 404
             
-        return jsonify(listing.to_dict()), 200
+        return jsonify(listing), 200
         
     except Exception as e:
         logger.error(f"Failed to fetch listing: {str(e)}", exc_info=True)
@@ -381,7 +433,9 @@ def get_listing(listing_id):
 @jwt_required()
 def update_listing(listing_id):
     try:
-        current_user = User.query.get(int(get_jwt_identity()))
+        current_user = current_principal()
+        if not current_user:
+            return jsonify({"error": "User not found"}), 404
         listing = Listing.query.get(listing_id)
         
         if not listing:
@@ -426,7 +480,9 @@ def update_listing(listing_id):
 @jwt_required()
 def delete_listing(listing_id):
     try:
-        current_user = User.query.get(int(get_jwt_identity()))
+        current_user = current_principal()
+        if not current_user:
+            return jsonify({"error": "User not found"}), 404
         listing = Listing.query.get(listing_id)
         
         if not listing:
@@ -436,6 +492,7 @@ def delete_listing(listing_id):
             return jsonify({"error": "Unauthorized to delete this listing"}), 403
             
         if current_user.is_admin:
+            release(listing.image_url)
             db.session.delete(listing)
         else:
             listing.status = 'removed'
@@ -448,8 +505,17 @@ def delete_listing(listing_id):
         logger.error(f"Failed to delete listing: {str(e)}", exc_info=True)
         return jsonify({"error": "Failed to delete listing"}), 500
 
+def _listings_version():
+    # Inserts move count/max(id)/max(created_at), edits move max(updated_at), deletes move count
+    return tuple(db.session.query(
+        func.count(Listing.id), func.max(Listing.id), func.max(Listing.created_at), func.max(Listing.updated_at)
+    ).one())
+
 @bp.route('/listings/search', methods=['GET'])
+@conditional(_listings_version)
 def search_listings():
+    fields = requested_fields(listing_projection)
+    plan = listing_projection.plan(fields)
     try:
         query = request.args.get('q', '').strip()
         category = request.args.get('category', '').strip()
@@ -457,46 +523,61 @@ def search_listings():
         max_price = request.args.get('max_price')
         status = request.args.get('status')
         seller_id = request.args.get('seller_id')
-        
-        listings_query = Listing.query
-        
-        if seller_id:
-            if status:
-                listings_query = listings_query.filter(Listing.status == status)
-        else:
-            listings_query = listings_query.filter(Listing.status == 'active')
-            
-        if seller_id:
-            listings_query = listings_query.filter(Listing.seller_id == int(seller_id))
-            
-        if query:
-            listings_query = listings_query.filter(
-                Listing.title.ilike(f'%{query}%') | 
-                Listing.description.ilike(f'%{query}%')
-            )
-            
-        if category:
-            listings_query = listings_query.filter(Listing.category.ilike(f'%{category}%'))
-            
-        if min_price:
-            try:
-                listings_query = listings_query.filter(Listing.price >= float(min_price))
-            except ValueError:
-                return jsonify({"error": "Invalid min_price"}), 400
-                
-        if max_price:
-            try:
-                listings_query = listings_query.filter(Listing.price <= float(max_price))
-            except ValueError:
-                return jsonify({"error": "Invalid max_price"}), 400
-                
-        listings = listings_query.order_by(Listing.created_at.desc()).all()
-        
-        return jsonify({
-            "count": len(listings),
-            "results": [listing.to_dict() for listing in listings]
-        }), 200
-        
+
+        try:
+            min_price = float(min_price) if min_price else None
+        except ValueError:
+            return jsonify({"error": "Invalid min_price"}), 400
+        try:
+            max_price = float(max_price) if max_price else None
+        except ValueError:
+            return jsonify({"error": "Invalid max_price"}), 400
+        seller_id = int(seller_id) if seller_id else None
+
+        # The parameter set that decides the result, so equivalent URLs share a cache entry
+        params = {
+            "q": fold_case(query),
+            "category": fold_case(category),
+            "min_price": min_price,
+            "max_price": max_price,
+            "status": (status or None) if seller_id else 'active',
+            "seller_id": seller_id,
+            "fields": sorted(fields) if fields else None,
+        }
+
+        def load():
+            listings_query = Listing.query
+
+            if params['status']:
+                listings_query = listings_query.filter(Listing.status == params['status'])
+
+            if seller_id:
+                listings_query = listings_query.filter(Listing.seller_id == seller_id)
+
+            if query:
+                listings_query = listings_query.filter(
+                    Listing.title.ilike(f'%{query}%') |
+                    Listing.description.ilike(f'%{query}%')
+                )
+
+            if category:
+                listings_query = listings_query.filter(Listing.category.ilike(f'%{category}%'))
+
+            if min_price is not None:
+                listings_query = listings_query.filter(Listing.price >= min_price)
+
+            if max_price is not None:
+                listings_query = listings_query.filter(Listing.price <= max_price)
+
+            # Plain rows of just the requested columns; no ORM objects to build
+            rows = listings_query.with_entities(*plan.columns).order_by(Listing.created_at.desc()).all()
+            return {
+                "count": len(rows),
+                "results": plan.many(rows)
+            }
+
+        return jsonify(cached_search(params, load)), 200
+
     except Exception as e:
         logger.error(f"Search failed: {str(e)}", exc_info=True)
         return jsonify({"error": "Search failed"}), 500
@@ -513,22 +594,28 @@ def upload_file():
             return jsonify({"error": "Invalid image format"}), 400
 
         header, encoded = data['image'].split(',', 1)
-        file_ext = header.split(';')[0].split('/')[-1]
-        
-        filename = data.get('filename') or f"{uuid.uuid4()}.{file_ext}"
-        filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        file_ext = header.split(';')[0].split('/')[-1].lower()
+        if file_ext not in ALLOWED_EXTENSIONS:
+            return jsonify({"error": "Invalid image format"}), 400
 
-        with open(filepath, 'wb') as f:
-            f.write(base64.b64decode(encoded))
+        # The client-supplied filename is ignored: objects are named by content
+        image_bytes = base64.b64decode(encoded)
+        upload_bytes_total.inc(len(image_bytes), kind='image')
+        obj, created = store_bytes(image_bytes, file_ext)
+        if created:
+            schedule_variants(obj.relative_path)
+        db.session.commit()
 
+        url = f"{request.host_url}uploads/{obj.relative_path}"
         return jsonify({
             "message": "File uploaded successfully",
-            "url": f"{request.host_url}uploads/{filename}".replace('http://', 'http://')
+            "url": url,
+            "variants": variant_urls(url),
+            "deduplicated": not created
         }), 200
 
     except Exception as e:
+        db.session.rollback()
         current_app.logger.error(f"Upload failed: {str(e)}")
         return jsonify({
             "error": "File upload failed",
@@ -666,56 +753,39 @@ def confirm_transaction():
         "listing_price": float(transaction.listing.price)
     }), 200
 
+def _history_version():
+    user_id = int(get_jwt_identity())
+    counterparty_id = case((Transaction.buyer_id == user_id, Transaction.seller_id), else_=Transaction.buyer_id)
+    return (user_id,) + tuple(db.session.query(
+        func.count(Transaction.id), func.max(Transaction.id), func.max(Transaction.completed_at),
+        func.max(Listing.updated_at), func.max(Counterparty.updated_at)
+    ).select_from(Transaction).join(
+        Listing, Listing.id == Transaction.listing_id
+    ).outerjoin(
+        Counterparty, Counterparty.id == counterparty_id
+    ).filter(or_(Transaction.buyer_id == user_id, Transaction.seller_id == user_id)).one())
+
 @bp.route('/transactions/history', methods=['GET'])
 @jwt_required()
+@conditional(_history_version)
 def transaction_history():
+    plan = history_projection.plan(requested_fields(history_projection))
     try:
-        current_user = User.query.get(int(get_jwt_identity()))
+        current_user = current_principal()
         if not current_user:
             return jsonify({"error": "User not found"}), 404
 
-        bought = Transaction.query.filter_by(
-            buyer_id=current_user.id
-        ).options(
-            joinedload(Transaction.listing),
-            joinedload(Transaction.seller)
-        ).all()
-        
-        sold = Transaction.query.filter_by(
-            seller_id=current_user.id
-        ).options(
-            joinedload(Transaction.listing),
-            joinedload(Transaction.buyer)
-        ).all()
-        
-        def format_transaction(t):
-            counterparty = None
-            if t.completed:
-                if t.buyer_id == current_user.id:
-                    counterparty = {
-                        "id": t.seller.id,
-                        "email": t.seller.email
-                    } if t.seller else None
-                else:
-                    counterparty = {
-                        "id": t.buyer.id,
-                        "email": t.buyer.email
-                    } if t.buyer else None
+        def history(own_column, other_column):
+            return db.session.query(*plan.columns).select_from(Transaction).join(
+                Listing, Listing.id == Transaction.listing_id
+            ).outerjoin(
+                Counterparty, Counterparty.id == other_column
+            ).filter(own_column == current_user.id).order_by(Transaction.id).all()
 
-            return {
-                "id": t.id,
-                "listing_id": t.listing.id,
-                "title": t.listing.title,
-                "price": float(t.listing.price),
-                "image_url": t.listing.image_url,
-                "completed": t.completed,
-                "completed_at": t.completed_at.isoformat() if t.completed_at else None,
-                "counterparty": counterparty
-            }
-        
+        # The counterparty is only revealed once the exchange is completed
         return jsonify({
-            "bought": [format_transaction(t) for t in bought],
-            "sold": [format_transaction(t) for t in sold]
+            "bought": plan.many(history(Transaction.buyer_id, Transaction.seller_id)),
+            "sold": plan.many(history(Transaction.seller_id, Transaction.buyer_id))
         }), 200
 
     except Exception as e:
@@ -728,7 +798,9 @@ def transaction_history():
 @bp.route('/transactions/<int:tx_id>/dispute', methods=['POST'])
 @jwt_required()
 def dispute_transaction(tx_id):
-    current_user = User.query.get(int(get_jwt_identity()))
+    current_user = current_principal()
+    if not current_user:
+        return jsonify({"error": "User not found"}), 404
     data = request.get_json()
     
     transaction = Transaction.query.filter_by(
@@ -786,22 +858,122 @@ def rate_transaction(tx_id):
 # ======================
 # 6. ADMIN ROUTES
 # ======================
+@bp.route('/admin/slow-queries', methods=['GET'])
+@jwt_required()
+@admin_required
+def admin_slow_queries():
+    # Aggregates are per worker process; each call shows the worker that served it
+    limit = request.args.get('limit', 20, type=int)
+    return jsonify({
+        "threshold_ms": slow_query_log.threshold * 1000,
+        "pid": os.getpid(),
+        "queries": slow_query_log.top(limit)
+    }), 200
+
+@bp.route('/admin/jobs', methods=['GET'])
+@read_primary  # job states change every second; a lagging replica would mislead
+@jwt_required()
+@admin_required
+def admin_jobs():
+    # Job counts per queue and status, plus the latest jobs matching the filters
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    jobs = Job.query
+    for column in ('status', 'queue', 'name'):
+        if request.args.get(column):
+            jobs = jobs.filter(getattr(Job, column) == request.args[column])
+    return jsonify({
+        "queues": job_queue.stats(),
+        "periodic": [{"name": name, "interval": interval} for name, interval in job_queue.periodic_tasks.items()],
+        "jobs": [job.to_dict() for job in jobs.order_by(Job.id.desc()).limit(limit)]
+    }), 200
+
+@bp.route('/admin/jobs/<int:job_id>/retry', methods=['POST'])
+@jwt_required()
+@admin_required
+def admin_retry_job(job_id):
+    job = db.session.get(Job, job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    if job.status != 'failed':
+        return jsonify({"error": "Only failed jobs can be retried"}), 400
+    job_queue.retry(job)
+    db.session.commit()
+    return jsonify(job.to_dict()), 200
+
+def _users_version():
+    version = db.session.query(func.count(User.id), func.max(User.id), func.max(User.updated_at)).one()
+    if not request.args.get('stats'):
+        return tuple(version)
+    # Stats also change with listings and transaction state, which users.updated_at doesn't see
+    transactions = db.session.query(
+        func.count(Transaction.id), func.max(Transaction.id), func.max(Transaction.completed_at),
+        func.max(Transaction.disputed_at), func.max(Transaction.resolved_at)
+    ).one()
+    return (*version, *_listings_version(), *transactions)
+
+def _prefix_match(column, prefix):
+    # A range on lower(column) rather than LIKE, so SQLite can seek the expression index
+    start = fold_case(prefix)
+    end = start[:-1] + chr(ord(start[-1]) + 1)
+    return (func.lower(column) >= start) & (func.lower(column) < end)
+
+def _user_stats(user_ids):
+    """{user_id: {listings, sales, disputes}} for user_ids, in one grouped query."""
+    parts = union_all(
+        select(Listing.seller_id.label('user_id'), literal(1).label('listings'),
+               literal(0).label('sales'), literal(0).label('disputes'))
+        .where(Listing.seller_id.in_(user_ids)),
+        select(Transaction.seller_id, literal(0), case((Transaction.status == 'completed', 1), else_=0),
+               case((Transaction.status == 'disputed', 1), else_=0))
+        .where(Transaction.seller_id.in_(user_ids)),
+        select(Transaction.buyer_id, literal(0), literal(0), case((Transaction.status == 'disputed', 1), else_=0))
+        .where(Transaction.buyer_id.in_(user_ids)),
+    ).subquery()
+    rows = db.session.execute(
+        select(parts.c.user_id, func.sum(parts.c.listings), func.sum(parts.c.sales), func.sum(parts.c.disputes))
+        .group_by(parts.c.user_id)
+    )
+    stats = {user_id: {"listings": 0, "sales": 0, "disputes": 0} for user_id in user_ids}
+    for user_id, listings, sales, disputes in rows:
+        stats[user_id] = {"listings": listings, "sales": sales, "disputes": disputes}
+    return stats
+
 @bp.route('/admin/users', methods=['GET'])
 @jwt_required()
 @admin_required
+@conditional(_users_version)
 def admin_get_users():
-    users = User.query.filter(
-        (User.is_deleted == 0) | (User.is_deleted == None)
-    ).all()
-    
+    # ?q= prefix of email or name, ?cursor= next_cursor of the previous page, ?stats=1 adds per-user counts
+    limit = max(1, min(request.args.get('limit', 50, type=int), 200))
+    cursor = request.args.get('cursor', 0, type=int)
+    search = request.args.get('q', '').strip()
+
+    users = User.query.filter(User.is_deleted == False, User.id > cursor)
+    if search:
+        # A UNION of two range seeks; with OR SQLite would walk every user in id order instead
+        matches = union_all(*(
+            select(User.id).where(User.is_deleted == False, _prefix_match(column, search), User.id > cursor)
+            for column in (User.email, User.name)
+        ))
+        users = users.filter(User.id.in_(matches))
+    # One extra row tells whether another page follows
+    users = users.with_entities(User.id, User.email, User.name, User.is_admin, User.avatar) \
+        .order_by(User.id).limit(limit + 1).all()
+    has_more = len(users) > limit
+    users = users[:limit]
+    stats = _user_stats([u.id for u in users]) if request.args.get('stats') and users else {}
+
     return jsonify({
         "users": [{
             "id": u.id,
             "email": u.email,
             "name": u.name or "Unnamed User",  # Handle NULL names
             "is_admin": bool(u.is_admin),
-            "avatar": u.avatar
-        } for u in users]
+            "avatar": u.avatar,
+            "avatar_variants": variant_urls(u.avatar),
+            **({"stats": stats[u.id]} if stats else {})
+        } for u in users],
+        "next_cursor": users[-1].id if has_more else None
     })
 
 @bp.route('/admin/listings/<int:listing_id>/remove', methods=['POST'])
@@ -866,7 +1038,7 @@ def resolve_dispute(tx_id):
 @admin_required
 def delete_user(user_id):
     try:
-        current_user = User.query.get(int(get_jwt_identity()))
+        current_user = current_principal()
         user = User.query.get(user_id)
         
         if not user:
@@ -884,11 +1056,13 @@ def delete_user(user_id):
         user.original_email = user.email
         user.email = f"deleted_{user.id}@nearbuy.invalid"
         user.name = "Deleted User"
+        release(user.avatar)
         user.avatar = None
         user.bio = None
         user.location = None
         user.phone = None
         user.password = "invalid_password_hash"
+        revocation_list.revoke_user(user.id)
         
         db.session.commit()
         return jsonify({"message": "User anonymized"}), 200
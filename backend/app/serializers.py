@@ -0,0 +1,138 @@
+# app/serializers.py
+from flask import request, current_app, jsonify
+from sqlalchemy import DateTime
+from sqlalchemy.orm import aliased
+from werkzeug.exceptions import BadRequest
+from app.json_provider import native_datetimes
+from app.models.user_model import User
+from app.models.listing_model import Listing, Transaction
+from app.services.image_service import variant_urls
+
+class Computed:
+    """A response field derived from selected columns, e.g. image_variants from image_url."""
+
+    def __init__(self, function, *columns):
+        self.function = function
+        self.columns = columns
+
+class Plan:
+    """The columns to select and the row -> dict function for one set of fields."""
+
+    def __init__(self, columns, serialize):
+        self.columns = columns
+        self.serialize = serialize
+
+    def many(self, rows):
+        serialize = self.serialize
+        return [serialize(row) for row in rows]
+
+class Projection:
+    """Serialize query rows straight to dicts, without building ORM objects.
+
+    columns maps each response field to a column expression and computed
+    maps derived fields to a Computed over those names; hidden columns are
+    selected only when a computed field needs them. A Plan is built once
+    per distinct field set (see requested_fields) and reused, so per-row
+    work is a zip into a dict plus the computed fields.
+    """
+
+    def __init__(self, columns, computed=None, hidden=()):
+        self.columns = dict(columns)
+        self.computed = dict(computed or {})
+        self.hidden = frozenset(hidden)
+        self.fields = tuple(f for f in self.columns if f not in self.hidden) + tuple(self.computed)
+        self._plans = {}
+
+    def plan(self, fields=None):
+        """Plan for fields (a frozenset, or None for every field)."""
+        key = (fields, native_datetimes(current_app))
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = self._plans[key] = self._compile(fields, key[1])
+        return plan
+
+    def _compile(self, fields, native):
+        wanted = [f for f in self.fields if fields is None or f in fields]
+        plain = [f for f in wanted if f in self.columns]
+        selected = list(plain)
+        for name in wanted:
+            if name in self.computed:
+                selected.extend(c for c in self.computed[name].columns if c not in selected)
+
+        names = tuple(plain)
+        # Only the stdlib provider needs datetimes turned into strings here
+        isoformat = () if native else tuple(
+            name for name in plain if isinstance(self.columns[name].type, DateTime))
+        computed = tuple(
+            (name, self.computed[name].function, tuple(selected.index(c) for c in self.computed[name].columns))
+            for name in wanted if name in self.computed
+        )
+
+        def serialize(row):
+            out = dict(zip(names, row))
+            for name in isoformat:
+                value = out[name]
+                if value is not None:
+                    out[name] = value.isoformat()
+            for name, function, positions in computed:
+                out[name] = function(*[row[i] for i in positions])
+            return out
+
+        return Plan([self.columns[name].label(name) for name in selected], serialize)
+
+def requested_fields(projection, param='fields'):
+    """The `?fields=a,b` sparse fieldset as a frozenset, or None for all fields."""
+    raw = request.args.get(param)
+    if not raw:
+        return None
+    fields = frozenset(f.strip() for f in raw.split(',') if f.strip())
+    unknown = fields.difference(projection.fields)
+    if unknown:
+        message = f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(projection.fields)}"
+        # With a JSON body of its own, like every other API error; HTTPExceptions otherwise render as HTML
+        response = jsonify({"error": message})
+        response.status_code = 400
+        raise BadRequest(message, response=response)
+    return fields or None
+
+# Same shape as Listing.to_dict()
+listing_projection = Projection(
+    columns={
+        'id': Listing.id,
+        'title': Listing.title,
+        'description': Listing.description,
+        'price': Listing.price,
+        'category': Listing.category,
+        'image_url': Listing.image_url,
+        'seller_id': Listing.seller_id,
+        'status': Listing.status,
+        'created_at': Listing.created_at,
+        'updated_at': Listing.updated_at,
+    },
+    computed={'image_variants': Computed(variant_urls, 'image_url')},
+)
+
+# The other party of a transaction; queries join it on buyer_id or seller_id
+Counterparty = aliased(User, name='counterparty')
+
+def _counterparty(completed, counterparty_id, email):
+    if not completed or counterparty_id is None:
+        return None
+    return {"id": counterparty_id, "email": email}
+
+# Rows of GET /api/transactions/history
+history_projection = Projection(
+    columns={
+        'id': Transaction.id,
+        'listing_id': Listing.id,
+        'title': Listing.title,
+        'price': Listing.price,
+        'image_url': Listing.image_url,
+        'completed': Transaction.completed,
+        'completed_at': Transaction.completed_at,
+        'counterparty_id': Counterparty.id,
+        'counterparty_email': Counterparty.email,
+    },
+    computed={'counterparty': Computed(_counterparty, 'completed', 'counterparty_id', 'counterparty_email')},
+    hidden=('counterparty_id', 'counterparty_email'),
+)
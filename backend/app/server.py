@@ -0,0 +1,80 @@
+# app/server.py
+import os
+import time
+import signal
+import logging
+import threading
+from flask import Blueprint, jsonify, current_app
+from sqlalchemy import text
+from app import db
+
+logger = logging.getLogger(__name__)
+
+bp = Blueprint('health', __name__)
+
+# Set once this worker has been asked to stop; readiness fails from then on
+draining = threading.Event()
+
+@bp.route('/healthz', methods=['GET'])
+def healthz():
+    """Liveness: the worker is up and answering."""
+    return jsonify({"status": "ok"}), 200
+
+@bp.route('/readyz', methods=['GET'])
+def readyz():
+    """Readiness: route traffic here only while the database answers and we aren't draining."""
+    if draining.is_set():
+        return jsonify({"status": "draining"}), 503
+    try:
+        db.session.execute(text('SELECT 1'))
+        db.session.rollback()
+    except Exception as e:
+        current_app.logger.error(f"Readiness check failed: {str(e)}")
+        return jsonify({"status": "unavailable", "database": "error"}), 503
+    return jsonify({"status": "ready"}), 200
+
+def disconnect_local_clients(socketio):
+    """Tell this worker's Socket.IO clients to reconnect elsewhere, then drop them."""
+    server = socketio.server
+    if server is None:
+        return 0
+    clients = [sid for sid, _ in server.manager.get_participants('/', None)]
+    for sid in clients:
+        server.emit('server_shutdown', {'reconnect': True}, to=sid, namespace='/')
+        server.disconnect(sid, namespace='/')
+    return len(clients)
+
+def install_drain_handler(app, socketio):
+    """Make SIGTERM drain this worker before the existing handler stops it.
+
+    Readiness flips to 503 at once so the load balancer stops sending new
+    work, websocket clients are told to reconnect after SERVER_DRAIN_DELAY
+    seconds, and then the previous handler (gunicorn's graceful stop, or
+    the default exit) finishes in-flight HTTP requests.
+    """
+    delay = app.config['SERVER_DRAIN_DELAY']
+    previous = signal.getsignal(signal.SIGTERM)
+
+    def finish(signum, frame):
+        # Give the load balancer time to see /readyz fail before clients move
+        time.sleep(delay)
+        dropped = disconnect_local_clients(socketio)
+        logger.info(f"Drained worker: disconnected {dropped} websocket clients")
+        if callable(previous):
+            # gunicorn's handler only flags the worker to stop after in-flight requests
+            previous(signum, frame)
+        else:
+            # Standalone server: stop it the way Ctrl+C would
+            os.kill(os.getpid(), signal.SIGINT)
+
+    def handle_sigterm(signum, frame):
+        if draining.is_set():
+            return
+        draining.set()
+        logger.info("SIGTERM received, draining")
+        threading.Thread(target=finish, args=(signum, frame), daemon=True).start()
+
+    if not callable(previous):
+        # Processes started in the background inherit an ignored SIGINT
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+    signal.signal(signal.SIGTERM, handle_sigterm)
@@ -1,11 +1,19 @@
 # backend/app/services/auth_service.py
-from werkzeug.security import check_password_hash
 from app.models.user_model import User
+from app.services.password_service import password_hasher
 from app import db
 
 def authenticate_user(email: str, password: str) -> User:
-    """Verify user credentials and return the User object if valid."""
+    """Verify user credentials and return the User object if valid.
+
+    If the stored hash was made with older PASSWORD_HASH_METHOD parameters it
+    is transparently replaced while we still have the plaintext.
+    """
     user = User.query.filter_by(email=email).first()
-    if user and check_password_hash(user.password, password):
-        return user
-    return None  # Authentication failed
\ No newline at end of file
+    if not user or not password_hasher.verify(user.password, password):
+        return None  # Authentication failed
+
+    if password_hasher.needs_rehash(user.password):
+        user.password = password  # Re-hashed by the User.password listener
+        db.session.commit()
+    return user
@@ -0,0 +1,233 @@
+# backend/app/services/cache_service.py
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime, date
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import object_session
+from app.db_routing import RoutingSession
+from app.metrics import Counter
+from app.models.user_model import User
+from app.models.listing_model import Listing, Transaction
+
+MISSING = object()
+
+def _json_default(value):
+    # Serializers may leave datetimes for the JSON provider; store them as it would
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+cache_requests_total = Counter('cache_requests_total', 'Read-through cache lookups, by entity and result.')
+
+class MemoryBackend:
+    """Per-process LRU of at most max_entries values, each expiring after its own TTL.
+
+    Values are shared with every caller, so treat them as read-only.
+    """
+
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def version(self, key):
+        return self._versions.get(key, 0)
+
+    def bump(self, key):
+        with self._lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+class SQLiteBackend:
+    """Values and versions in a local SQLite file shared by every worker process.
+
+    ``sqlite:////var/lib/nearbuy/cache.db``. A version bump in one worker is
+    seen by the next lookup in any other, so entries are never served stale
+    across processes. Reads don't write, so eviction past max_entries drops
+    the entries closest to expiry rather than the least recently used.
+    """
+
+    # Trim the table once per this many writes from a process
+    TRIM_EVERY = 100
+
+    def __init__(self, path, max_entries=2048, busy_timeout=5000):
+        self.path = path
+        self.max_entries = max_entries
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._writes = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS cache_entries ('
+                         'key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_cache_entries_expires_at ON cache_entries (expires_at)')
+            conn.execute('CREATE TABLE IF NOT EXISTS cache_versions ('
+                         'key TEXT PRIMARY KEY, version INTEGER NOT NULL)')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout / 1000, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(f'PRAGMA busy_timeout={self.busy_timeout}')
+            conn.execute('PRAGMA mmap_size=67108864')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        row = self._connect().execute(
+            'SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?', (key, time.time())
+        ).fetchone()
+        return MISSING if row is None else json.loads(row[0])
+
+    def set(self, key, value, ttl):
+        conn = self._connect()
+        conn.execute('INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)',
+                     (key, json.dumps(value, default=_json_default), time.time() + ttl))
+        self._writes += 1
+        if self._writes % self.TRIM_EVERY == 0:
+            self.trim()
+
+    def trim(self):
+        conn = self._connect()
+        conn.execute('DELETE FROM cache_entries WHERE expires_at <= ?', (time.time(),))
+        conn.execute('DELETE FROM cache_entries WHERE key IN ('
+                     'SELECT key FROM cache_entries ORDER BY expires_at DESC LIMIT -1 OFFSET ?)',
+                     (self.max_entries,))
+
+    def version(self, key):
+        row = self._connect().execute('SELECT version FROM cache_versions WHERE key = ?', (key,)).fetchone()
+        return 0 if row is None else row[0]
+
+    def bump(self, key):
+        self._connect().execute(
+            'INSERT INTO cache_versions (key, version) VALUES (?, 1) '
+            'ON CONFLICT(key) DO UPDATE SET version = version + 1', (key,)
+        )
+
+    def clear(self):
+        conn = self._connect()
+        conn.execute('DELETE FROM cache_entries')
+        conn.execute('DELETE FROM cache_versions')
+
+def backend_from_url(url, max_entries):
+    """memory:// (per process) or sqlite:///path (shared by all workers on the host)."""
+    if url.startswith('sqlite://'):
+        path = url.split('://', 1)[1]
+        return SQLiteBackend(path[1:] if path.startswith('/') else path, max_entries)
+    if url.startswith('memory://'):
+        return MemoryBackend(max_entries)
+    raise ValueError(f"Unsupported CACHE_URL: {url}")
+
+class VersionedCache:
+    """Read-through cache of JSON-ready dicts, keyed by entity, id and version.
+
+    Every entity id has a version counter in the backend; values are stored
+    under "<entity>:<id>:v<version>". Committing a change bumps the counter
+    (see the mapper events below), so the next read misses and reloads,
+    and the superseded entry simply ages out of the LRU. With the memory
+    backend another worker's change is noticed after at most ttl seconds;
+    a shared backend sees it at once.
+    """
+
+    def __init__(self):
+        self.ttl = 300
+        self.backend = MemoryBackend()
+
+    def init_app(self, app):
+        self.ttl = app.config['CACHE_TTL']
+        self.backend = backend_from_url(app.config['CACHE_URL'], app.config['CACHE_MAX_ENTRIES'])
+
+    def get_or_load(self, entity, entity_id, loader):
+        """The cached value, or loader()'s result (cached unless None)."""
+        if self.ttl <= 0:
+            return loader()
+        return self.read_through(entity, f'{entity}:{entity_id}:v{self.version(entity, entity_id)}', loader)
+
+    def read_through(self, entity, key, loader):
+        """Look key up, filling it from loader() on a miss; entity labels the metrics."""
+        value = self.backend.get(key)
+        if value is not MISSING:
+            cache_requests_total.inc(entity=entity, result='hit')
+            return value
+        cache_requests_total.inc(entity=entity, result='miss')
+        value = loader()
+        if value is not None:
+            self.backend.set(key, value, self.ttl)
+        return value
+
+    def version(self, entity, entity_id):
+        return self.backend.version(f'{entity}:{entity_id}')
+
+    def bump(self, entity, entity_id):
+        self.backend.bump(f'{entity}:{entity_id}')
+
+    def clear(self):
+        self.backend.clear()
+
+entity_cache = VersionedCache()
+
+# Versions are bumped only once the change is committed, so a reader can't
+# cache the old row under the new version while the write is still pending
+def stale_after_commit(target, *keys):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('cache_bumps', set()).update(keys)
+
+@event.listens_for(Listing, 'after_insert')
+@event.listens_for(Listing, 'after_update')
+@event.listens_for(Listing, 'before_delete')  # while seller_id can still be loaded
+def _listing_changed(mapper, connection, target):
+    # The seller's profile shows their active listing count
+    stale_after_commit(target, ('listing', target.id), ('user', target.seller_id))
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'before_delete')
+def _user_changed(mapper, connection, target):
+    stale_after_commit(target, ('user', target.id))
+
+@event.listens_for(Transaction, 'after_update')
+def _transaction_changed(mapper, connection, target):
+    # Ratings feed the seller's average on their profile
+    if inspect(target).attrs.rating.history.has_changes():
+        stale_after_commit(target, ('user', target.seller_id))
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _bump_committed(session):
+    for entity, entity_id in session.info.pop('cache_bumps', ()):
+        entity_cache.bump(entity, entity_id)
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _discard_bumps(session):
+    session.info.pop('cache_bumps', None)
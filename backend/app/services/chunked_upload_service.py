@@ -0,0 +1,50 @@
+# backend/app/services/chunked_upload_service.py
+import os
+import uuid
+import shutil
+from flask import current_app
+
+def session_dir(upload_session):
+    return os.path.join(current_app.config['UPLOAD_SESSION_FOLDER'], upload_session.id)
+
+def chunk_path(upload_session, index):
+    return os.path.join(session_dir(upload_session), f"{index:06d}.part")
+
+def received_chunks(upload_session):
+    """Indexes of the chunks stored so far, read from disk so it survives restarts."""
+    folder = session_dir(upload_session)
+    if not os.path.isdir(folder):
+        return []
+    received = []
+    for name in os.listdir(folder):
+        if name.endswith('.part'):
+            received.append(int(name[:-len('.part')]))
+    return sorted(received)
+
+def next_missing_chunk(upload_session, received=None):
+    received = set(received_chunks(upload_session) if received is None else received)
+    for index in range(upload_session.total_chunks):
+        if index not in received:
+            return index
+    return None
+
+def write_chunk(upload_session, index, data):
+    """Store one chunk atomically; re-sending a chunk simply replaces it."""
+    os.makedirs(session_dir(upload_session), exist_ok=True)
+    target = chunk_path(upload_session, index)
+    tmp_path = f"{target}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, target)
+
+def assemble_chunks(upload_session):
+    """Concatenate every chunk into a new file inside the session folder and return its path."""
+    assembled = os.path.join(session_dir(upload_session), f"assembled.{uuid.uuid4().hex}.tmp")
+    with open(assembled, 'wb') as out:
+        for index in range(upload_session.total_chunks):
+            with open(chunk_path(upload_session, index), 'rb') as part:
+                shutil.copyfileobj(part, out, 1024 * 1024)
+    return assembled
+
+def discard_chunks(upload_session):
+    shutil.rmtree(session_dir(upload_session), ignore_errors=True)
@@ -0,0 +1,87 @@
+# backend/app/services/image_service.py
+import os
+import logging
+from flask import current_app
+from app.services.job_queue import job_queue
+
+logger = logging.getLogger(__name__)
+
+# Longest edge in pixels for each derivative. The names end up in URLs,
+# so changing them orphans previously generated files.
+IMAGE_VARIANTS = {
+    'thumb': 320,
+    'medium': 960,
+}
+VARIANT_EXTENSION = 'webp'
+
+def variant_filename(filename, variant):
+    """Return the derivative filename for an uploaded file, e.g. abc.jpg -> abc_thumb.webp"""
+    stem = filename.rsplit('.', 1)[0]
+    return f"{stem}_{variant}.{VARIANT_EXTENSION}"
+
+def parse_variant_filename(filename):
+    """Return (stem, variant) if filename names a derivative, else None."""
+    if not filename.endswith(f".{VARIANT_EXTENSION}"):
+        return None
+    stem = filename[:-(len(VARIANT_EXTENSION) + 1)]
+    for variant in IMAGE_VARIANTS:
+        if stem.endswith(f"_{variant}"):
+            return stem[:-(len(variant) + 1)], variant
+    return None
+
+def variant_urls(url):
+    """Map every variant name to its URL, derived from the original upload URL."""
+    if not url or '/uploads/' not in url:
+        return None
+    base, filename = url.rsplit('/', 1)
+    if '.' not in filename:
+        return None
+    return {variant: f"{base}/{variant_filename(filename, variant)}" for variant in IMAGE_VARIANTS}
+
+def generate_variants(filepath, quality=80):
+    """Write every missing derivative of filepath next to it.
+
+    EXIF orientation is applied to the pixels and no metadata is carried over,
+    so derivatives are upright and free of camera/GPS tags.
+    """
+    folder, filename = os.path.split(filepath)
+    targets = {
+        variant: os.path.join(folder, variant_filename(filename, variant))
+        for variant in IMAGE_VARIANTS
+    }
+    targets = {v: p for v, p in targets.items() if not os.path.exists(p)}
+    if not targets:
+        return []
+
+    # Imported here so workers that never process an upload don't load PIL
+    from PIL import Image, ImageOps
+    written = []
+    with Image.open(filepath) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGBA' if 'A' in img.getbands() else 'RGB')
+
+        for variant, target in targets.items():
+            size = IMAGE_VARIANTS[variant]
+            derivative = img.copy()
+            derivative.thumbnail((size, size), Image.Resampling.LANCZOS)
+            tmp_path = f"{target}.tmp"
+            derivative.save(tmp_path, format='WEBP', quality=quality, method=4)
+            os.replace(tmp_path, target)
+            written.append(target)
+    return written
+
+def _generate_variants_safely(filepath, quality):
+    try:
+        return generate_variants(filepath, quality=quality)
+    except Exception as e:
+        logger.error(f"Variant generation failed for {filepath}: {str(e)}", exc_info=True)
+        return []
+
+def schedule_variants(relative_path):
+    """Queue derivative generation for an upload; call before the commit that stores it."""
+    config = current_app.config
+    if config.get('IMAGE_VARIANTS_SYNC'):
+        return _generate_variants_safely(os.path.join(config['UPLOAD_FOLDER'], relative_path),
+                                         config['IMAGE_VARIANT_QUALITY'])
+    return job_queue.enqueue('images.generate_variants', {'relative_path': relative_path})
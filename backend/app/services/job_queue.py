@@ -0,0 +1,363 @@
+# backend/app/services/job_queue.py
+import os
+import json
+import time
+import random
+import socket
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import event, func, select, update, delete
+from app import db
+from app.db_routing import RoutingSession
+from app.metrics import Counter, Histogram
+from app.models.job_model import Job
+
+logger = logging.getLogger(__name__)
+
+jobs_total = Counter('jobs_total', 'Background jobs finished, by queue, task and result.')
+job_duration = Histogram('job_duration_seconds', 'Time spent running background jobs, by queue and task.')
+
+# Retry delays double per attempt up to this, then stay there
+MAX_BACKOFF = 3600
+
+class Task:
+    def __init__(self, name, function, queue, max_attempts, backoff):
+        self.name = name
+        self.function = function
+        self.queue = queue
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+
+def parse_queues(spec):
+    """'default:2,images:2' -> {'default': 2, 'images': 2}; a queue without a count gets 1."""
+    queues = {}
+    for part in filter(None, (p.strip() for p in spec.split(','))):
+        name, _, count = part.partition(':')
+        queues[name.strip()] = int(count) if count else 1
+    return queues
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+class JobQueue:
+    """Durable background jobs in the jobs table, run by worker threads.
+
+    Tasks are registered by name with task() or periodic(). enqueue() only
+    adds a row to the caller's session, so a job exists exactly when the
+    request's other writes commit. Each queue has a concurrency limit that
+    holds across processes: a worker claims a job with a single UPDATE that
+    also checks how many of that queue's jobs are running, and SQLite runs
+    writes one at a time. A failing job is retried with exponential backoff
+    and jitter until max_attempts, then left as 'failed' for an admin to
+    inspect or retry. While a job runs, its worker renews the lease every
+    lease_timeout / 3 seconds; a worker that dies mid-job stops renewing,
+    and lease_timeout seconds later the job is requeued. A job's outcome is
+    only recorded, and its task's writes only committed, if the worker still
+    holds the lease.
+
+    Workers run as threads of the web process (JOB_WORKERS=thread) or in
+    dedicated `flask jobs worker` processes, any number of each.
+    """
+
+    def __init__(self):
+        self.tasks = {}
+        self.periodic_tasks = {}
+        self.concurrency = {'default': 1}
+        self.poll_interval = 2.0
+        self.lease_timeout = 600.0
+        self.max_attempts = 5
+        self.retry_backoff = 10.0
+        self.retention = 7 * 24 * 3600
+        self._threads = []
+        self._stop = threading.Event()
+        self._wakeup = threading.Condition()
+
+    def init_app(self, app):
+        self.concurrency = parse_queues(app.config['JOB_QUEUES'])
+        self.poll_interval = app.config['JOB_POLL_INTERVAL']
+        self.lease_timeout = app.config['JOB_LEASE_TIMEOUT']
+        self.max_attempts = app.config['JOB_MAX_ATTEMPTS']
+        self.retry_backoff = app.config['JOB_RETRY_BACKOFF']
+        self.retention = app.config['JOB_RETENTION']
+
+    def task(self, name, queue='default', max_attempts=None, backoff=None):
+        """Register the decorated function as task `name`; it is called with the job's payload as kwargs."""
+        def register(function):
+            self.tasks[name] = Task(name, function, queue, max_attempts, backoff)
+            return function
+        return register
+
+    def periodic(self, name, interval, queue='default', max_attempts=1):
+        """Register a task that is enqueued once every `interval` seconds, whichever worker gets there first."""
+        def register(function):
+            self.task(name, queue=queue, max_attempts=max_attempts)(function)
+            self.periodic_tasks[name] = interval
+            return function
+        return register
+
+    def enqueue(self, name, payload=None, delay=0, run_at=None, unique_key=None):
+        """Add a job for task `name` to the current session. The caller commits.
+
+        unique_key makes the job a no-op duplicate if one with the same key
+        already exists; the conflict is raised by that commit.
+        """
+        task = self.tasks.get(name)
+        if task is None:
+            raise ValueError(f"Unknown task: {name}")
+        job = Job(
+            queue=task.queue,
+            name=name,
+            payload=json.dumps(payload or {}),
+            max_attempts=task.max_attempts or self.max_attempts,
+            run_at=run_at or _utcnow() + timedelta(seconds=delay),
+            unique_key=unique_key,
+        )
+        db.session.add(job)
+        db.session.info['jobs_enqueued'] = True
+        return job
+
+    # ---- running jobs ------------------------------------------------------
+
+    def _claim(self, queue, worker_id):
+        now = _utcnow()
+        due = select(Job.id).where(Job.queue == queue, Job.status == 'queued', Job.run_at <= now) \
+            .order_by(Job.run_at, Job.id).limit(1).scalar_subquery()
+        running = select(func.count(Job.id)).where(Job.queue == queue, Job.status == 'running').scalar_subquery()
+        job_id = db.session.execute(
+            update(Job)
+            .where(Job.id == due, Job.status == 'queued', running < self.concurrency.get(queue, 1))
+            .values(status='running', attempts=Job.attempts + 1, locked_by=worker_id, locked_at=now)
+            .returning(Job.id)
+        ).scalar()
+        db.session.commit()
+        return db.session.get(Job, job_id) if job_id else None
+
+    def _has_due(self, queue):
+        # A plain read first, so idle workers don't take SQLite's write lock every poll
+        return db.session.execute(
+            select(Job.id).where(Job.queue == queue, Job.status == 'queued', Job.run_at <= _utcnow()).limit(1)
+        ).first() is not None
+
+    def run_next(self, queue, worker_id=None):
+        """Claim and run the next due job of queue in this thread; returns it, or None if there was none."""
+        if not self._has_due(queue):
+            db.session.rollback()
+            return None
+        worker_id = worker_id or _worker_id()
+        job = self._claim(queue, worker_id)
+        if job is None:
+            return None
+
+        name = job.name
+        task = self.tasks.get(name)
+        started = time.perf_counter()
+        done = threading.Event()
+        threading.Thread(target=self._heartbeat, args=(current_app._get_current_object(), job.id, worker_id, done),
+                         name=f'jobs-heartbeat-{job.id}', daemon=True).start()
+        try:
+            if task is None:
+                raise LookupError(f"No task registered as {name!r}")
+            task.function(**json.loads(job.payload))
+        except Exception as e:
+            db.session.rollback()
+            result = self._record_failure(job, task, e, worker_id)
+        else:
+            # Finishing the job commits with whatever the task left in the session
+            result = 'succeeded' if self._finish(job, worker_id, status='succeeded', finished_at=_utcnow()) \
+                else 'lost'
+        finally:
+            done.set()
+        job_duration.observe(time.perf_counter() - started, queue=queue, task=name)
+        jobs_total.inc(queue=queue, task=name, result=result)
+        return job
+
+    def _heartbeat(self, app, job_id, worker_id, done):
+        # Its own connection: the task may be in the middle of a transaction on the session
+        while not done.wait(self.lease_timeout / 3):
+            try:
+                with app.app_context(), db.engine.begin() as connection:
+                    connection.execute(
+                        update(Job.__table__)
+                        .where(Job.id == job_id, Job.status == 'running', Job.locked_by == worker_id)
+                        .values(locked_at=_utcnow())
+                    )
+            except Exception as e:
+                logger.warning(f"Renewing the lease of job {job_id} failed: {str(e)}")
+
+    def _finish(self, job, worker_id, **values):
+        """Record the job's outcome, unless another worker took its lease over meanwhile."""
+        held = db.session.execute(
+            update(Job)
+            .where(Job.id == job.id, Job.status == 'running', Job.locked_by == worker_id)
+            .values(locked_by=None, **values)
+        ).rowcount
+        if not held:
+            db.session.rollback()
+            logger.warning(f"Job {job.id} ({job.name}) lost its lease while running; discarded its result")
+            return False
+        db.session.commit()
+        return True
+
+    def _record_failure(self, job, task, error, worker_id):
+        last_error = f"{type(error).__name__}: {error}"
+        if job.attempts >= job.max_attempts:
+            status, values = 'failed', {'finished_at': _utcnow()}
+        else:
+            status, values = 'queued', {'run_at': _utcnow() + timedelta(seconds=self.backoff(job.attempts, task))}
+        if not self._finish(job, worker_id, status=status, last_error=last_error, **values):
+            return 'lost'
+        if status == 'failed':
+            logger.error(f"Job {job.id} ({job.name}) failed after {job.attempts} attempts: {last_error}")
+        else:
+            logger.warning(f"Job {job.id} ({job.name}) attempt {job.attempts} failed, retrying: {last_error}")
+        return status
+
+    def backoff(self, attempts, task=None):
+        """Seconds before retry number `attempts`: doubling from the base delay, +/- 50% jitter."""
+        base = (task.backoff if task and task.backoff is not None else self.retry_backoff)
+        return min(MAX_BACKOFF, base * 2 ** (attempts - 1)) * random.uniform(0.5, 1.5)
+
+    def run_pending(self, queues=None):
+        """Run every due job of queues (all by default) in this thread, e.g. from a test or cron."""
+        ran = []
+        for queue in queues or list(self.concurrency):
+            while (job := self.run_next(queue)) is not None:
+                ran.append(job)
+        return ran
+
+    # ---- scheduling and housekeeping --------------------------------------
+
+    def schedule_periodic(self, now=None):
+        """Enqueue each periodic task's job for the current interval unless a worker already has."""
+        now = now or _utcnow()
+        scheduled = []
+        for name, interval in self.periodic_tasks.items():
+            slot = int(now.timestamp() // interval)
+            key = f"periodic:{name}:{slot}"
+            if db.session.query(Job.id).filter(Job.unique_key == key).first():
+                continue
+            self.enqueue(name, run_at=datetime.fromtimestamp(slot * interval, timezone.utc), unique_key=key)
+            try:
+                db.session.commit()
+                scheduled.append(name)
+            except Exception:
+                # Another process inserted the same slot first
+                db.session.rollback()
+        return scheduled
+
+    def requeue_expired(self):
+        """Requeue running jobs whose lease ran out (their worker died), or fail them if out of attempts."""
+        cutoff = _utcnow() - timedelta(seconds=self.lease_timeout)
+        expired = (Job.status == 'running') & (Job.locked_at < cutoff)
+        failed = db.session.execute(
+            update(Job).where(expired, Job.attempts >= Job.max_attempts)
+            .values(status='failed', locked_by=None, finished_at=_utcnow(), last_error='Lease expired')
+        ).rowcount
+        requeued = db.session.execute(
+            update(Job).where(expired).values(status='queued', locked_by=None, last_error='Lease expired')
+        ).rowcount
+        db.session.commit()
+        return requeued + failed
+
+    def prune(self):
+        """Delete finished jobs older than the retention period."""
+        cutoff = _utcnow() - timedelta(seconds=self.retention)
+        removed = db.session.execute(
+            delete(Job).where(Job.status.in_(('succeeded', 'failed')), Job.finished_at < cutoff)
+        ).rowcount
+        db.session.commit()
+        return removed
+
+    def retry(self, job):
+        """Put a failed job back in its queue with a fresh set of attempts. The caller commits."""
+        job.status = 'queued'
+        job.attempts = 0
+        job.run_at = _utcnow()
+        job.finished_at = None
+        db.session.info['jobs_enqueued'] = True
+
+    def stats(self):
+        """{queue: {status: count}} for every queue with jobs or configured workers."""
+        counts = {queue: {} for queue in self.concurrency}
+        rows = db.session.query(Job.queue, Job.status, func.count(Job.id)).group_by(Job.queue, Job.status)
+        for queue, status, count in rows:
+            counts.setdefault(queue, {})[status] = count
+        return counts
+
+    # ---- worker threads ----------------------------------------------------
+
+    def notify(self):
+        """Wake idle workers in this process, e.g. after a commit that enqueued jobs."""
+        with self._wakeup:
+            self._wakeup.notify_all()
+
+    def _sleep(self):
+        with self._wakeup:
+            self._wakeup.wait(self.poll_interval)
+
+    def _work(self, app, queue):
+        worker_id = _worker_id()
+        while not self._stop.is_set():
+            job = None
+            with app.app_context():
+                try:
+                    job = self.run_next(queue, worker_id)
+                except Exception as e:
+                    logger.error(f"Job worker for {queue} failed: {str(e)}", exc_info=True)
+                    db.session.rollback()
+            if job is None:
+                self._sleep()
+
+    def _schedule(self, app):
+        next_housekeeping = 0.0
+        while not self._stop.is_set():
+            with app.app_context():
+                try:
+                    if self.schedule_periodic():
+                        self.notify()
+                    if time.monotonic() >= next_housekeeping:
+                        self.requeue_expired()
+                        next_housekeeping = time.monotonic() + min(60.0, self.lease_timeout / 2)
+                except Exception as e:
+                    logger.error(f"Job scheduler failed: {str(e)}", exc_info=True)
+                    db.session.rollback()
+            self._stop.wait(self.poll_interval)
+
+    def start(self, app, queues=None):
+        """Start concurrency[queue] worker threads per queue, plus the scheduler; returns the threads."""
+        self._stop.clear()
+        threads = [threading.Thread(target=self._schedule, args=(app,), name='jobs-scheduler', daemon=True)]
+        for queue in queues or list(self.concurrency):
+            threads += [
+                threading.Thread(target=self._work, args=(app, queue), name=f'jobs-{queue}-{i}', daemon=True)
+                for i in range(self.concurrency.get(queue, 1))
+            ]
+        for thread in threads:
+            thread.start()
+        self._threads += threads
+        logger.info(f"Started job workers: {', '.join(t.name for t in threads)}")
+        return threads
+
+    def stop(self, timeout=None):
+        """Ask workers to stop after their current job and wait for them."""
+        self._stop.set()
+        self.notify()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+def _worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"
+
+job_queue = JobQueue()
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _wake_workers(session):
+    if session.info.pop('jobs_enqueued', False):
+        job_queue.notify()
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _discard_enqueued(session):
+    session.info.pop('jobs_enqueued', None)
@@ -0,0 +1,176 @@
+# backend/app/services/outbox_service.py
+import os
+import json
+import time
+import socket
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from flask import current_app, has_request_context
+from sqlalchemy import event, inspect, insert, select, update, delete, or_
+from sqlalchemy.orm import object_session
+from app import db
+from app.db_routing import RoutingSession
+from app.metrics import Histogram, socketio_emit_duration
+from app.models.chat_model import ChatRoom, ChatMessage
+from app.models.listing_model import Transaction
+from app.models.outbox_model import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+outbox_delivery_lag = Histogram('outbox_delivery_lag_seconds', 'Time from commit to Socket.IO emit, by event.')
+
+def chat_room(room_id):
+    return f'room_{room_id}'
+
+def publish(event_name, room, payload, connection=None, session=None):
+    """Write a Socket.IO event to the outbox in the current transaction.
+
+    It is emitted once the transaction commits and never if it rolls back.
+    Mapper events pass their flush connection and the target's session;
+    everything else writes through db.session.
+    """
+    session = session or db.session
+    connection = connection or session.connection()
+    connection.execute(insert(OutboxEvent.__table__).values(
+        event=event_name, room=room, payload=json.dumps(payload), created_at=datetime.now(timezone.utc)
+    ))
+    session.info['outbox_published'] = True
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+class OutboxDispatcher:
+    """Emits committed outbox rows to their Socket.IO rooms, oldest first.
+
+    A commit that published events wakes this process's dispatcher, which
+    runs as a Socket.IO background task, so requests never wait on fan-out.
+    It also polls every poll_interval for rows committed by other processes
+    or left behind by a dispatcher that died. Rows are claimed in batches
+    with one UPDATE, emitted, then deleted, so every event is emitted at
+    least once; a claim older than lease seconds is taken over. With
+    several workers, SOCKETIO_MESSAGE_QUEUE carries each emit to the
+    clients connected elsewhere.
+    """
+
+    def __init__(self):
+        self.batch_size = 200
+        self.poll_interval = 1.0
+        self.lease = 30.0
+        self.socketio = None
+        self._app = None
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._running = False
+
+    def init_app(self, app, socketio):
+        self.batch_size = app.config['OUTBOX_BATCH_SIZE']
+        self.poll_interval = app.config['OUTBOX_POLL_INTERVAL']
+        self.lease = app.config['OUTBOX_LEASE']
+        self.socketio = socketio
+        self._app = app
+
+    def start(self, app=None):
+        """Start the background dispatcher if it isn't running in this process yet."""
+        with self._lock:
+            if app is not None:
+                self._app = app
+            if self._running:
+                return
+            self._running = True
+        self.socketio.start_background_task(self._run)
+
+    def wake(self):
+        self._wakeup.set()
+
+    def _run(self):
+        logger.info("Outbox dispatcher started")
+        while True:
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+            with self._app.app_context():
+                try:
+                    while self.dispatch() == self.batch_size:
+                        pass
+                except Exception as e:
+                    logger.error(f"Outbox dispatch failed: {str(e)}", exc_info=True)
+                    db.session.rollback()
+
+    def dispatch(self):
+        """Emit one batch of committed events; returns how many were emitted."""
+        now = _utcnow()
+        claimable = or_(OutboxEvent.claimed_at == None, OutboxEvent.claimed_at < now - timedelta(seconds=self.lease))
+        # A plain read first, so idle dispatchers don't take SQLite's write lock every poll
+        if db.session.execute(select(OutboxEvent.id).where(claimable).limit(1)).first() is None:
+            db.session.rollback()
+            return 0
+
+        batch = select(OutboxEvent.id).where(claimable).order_by(OutboxEvent.id).limit(self.batch_size)
+        rows = db.session.execute(
+            update(OutboxEvent)
+            .where(OutboxEvent.id.in_(batch.scalar_subquery()), claimable)
+            .values(claimed_by=_dispatcher_id(), claimed_at=now)
+            .returning(OutboxEvent.id, OutboxEvent.event, OutboxEvent.room, OutboxEvent.payload,
+                       OutboxEvent.created_at)
+        ).all()
+        db.session.commit()
+
+        for row in sorted(rows, key=lambda r: r.id):
+            started = time.perf_counter()
+            self.socketio.emit(row.event, json.loads(row.payload), to=row.room)
+            socketio_emit_duration.observe(time.perf_counter() - started, event=row.event)
+            if row.created_at:
+                lag = (_utcnow().replace(tzinfo=None) - row.created_at.replace(tzinfo=None)).total_seconds()
+                outbox_delivery_lag.observe(max(lag, 0.0), event=row.event)
+
+        if rows:
+            db.session.execute(delete(OutboxEvent).where(OutboxEvent.id.in_([row.id for row in rows])))
+            db.session.commit()
+        return len(rows)
+
+def _dispatcher_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+outbox = OutboxDispatcher()
+
+@event.listens_for(ChatMessage, 'after_insert')
+def _message_created(mapper, connection, target):
+    # Covers messages sent over REST and over the socket alike
+    publish('new_message', chat_room(target.room_id), {
+        'id': target.id,
+        'content': target.content,
+        'sender_id': target.sender_id,
+        'timestamp': (target.sent_at or _utcnow()).isoformat(),
+        'room_id': target.room_id
+    }, connection=connection, session=object_session(target))
+
+@event.listens_for(Transaction, 'after_update')
+def _transaction_changed(mapper, connection, target):
+    state = inspect(target)
+    if not (state.attrs.status.history.has_changes() or state.attrs.completed.history.has_changes()):
+        return
+    # Read back on the flush's connection: unchanged attributes may be expired
+    status, completed = connection.execute(
+        select(Transaction.status, Transaction.completed).where(Transaction.id == target.id)
+    ).one()
+    room_ids = connection.execute(select(ChatRoom.id).where(ChatRoom.transaction_id == target.id)).scalars().all()
+    for room_id in room_ids:
+        publish('transaction_updated', chat_room(room_id), {
+            'transaction_id': target.id,
+            'status': status,
+            'completed': bool(completed),
+            'room_id': room_id
+        }, connection=connection, session=object_session(target))
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _wake_dispatcher(session):
+    if session.info.pop('outbox_published', False):
+        # Requests and socket handlers start this process's dispatcher on
+        # first use; CLI processes leave their rows to the web workers
+        if has_request_context():
+            outbox.start(current_app._get_current_object())
+        outbox.wake()
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _discard_published(session):
+    session.info.pop('outbox_published', None)
@@ -0,0 +1,103 @@
+# backend/app/services/password_service.py
+import threading
+from werkzeug.security import generate_password_hash, check_password_hash
+
+class PasswordHasherBusy(Exception):
+    """Raised when no hashing slot frees up within the queue timeout."""
+
+class PasswordHasher:
+    """Bounds how many password hashes run at once.
+
+    The semaphore is the limiter: at most ``workers`` hashes run at a time
+    and at most ``max_pending`` callers may wait for a slot. A caller that
+    doesn't get one within ``queue_timeout`` seconds gets PasswordHasherBusy,
+    so the route can answer 503 rather than pile up behind a login burst.
+    Once it has a slot the hash starts at once, so queue_timeout covers the
+    whole wait. The hash runs on the caller's thread. Under eventlet or
+    gevent it runs on the hub's pool of OS threads instead, so it doesn't
+    stall every other request of the worker. ``workers=0`` hashes inline
+    without a limit.
+    """
+
+    def __init__(self, method='scrypt', workers=0, max_pending=0, queue_timeout=None):
+        self.configure(method, workers, max_pending, queue_timeout)
+
+    def init_app(self, app):
+        self.configure(
+            method=app.config['PASSWORD_HASH_METHOD'],
+            workers=app.config['PASSWORD_HASH_WORKERS'],
+            max_pending=app.config['PASSWORD_HASH_MAX_PENDING'],
+            queue_timeout=app.config['PASSWORD_HASH_QUEUE_TIMEOUT']
+        )
+
+    def configure(self, method, workers, max_pending, queue_timeout):
+        self.method = method
+        self.workers = workers
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self._prefix = None
+        self._slots = threading.BoundedSemaphore(workers) if workers > 0 else None
+        self._waiting = 0
+        self._waiting_lock = threading.Lock()
+        self._offload = _green_offload()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, method=self.method)
+
+    def verify(self, pwhash, password):
+        if not pwhash:
+            return False
+        return self._run(check_password_hash, pwhash, password)
+
+    @property
+    def prefix(self):
+        # Hashes embed their parameters ("scrypt:32768:8:1$salt$hash"), so the
+        # prefix of a fresh hash tells us what stored hashes should look like
+        if self._prefix is None:
+            self._prefix = generate_password_hash('', method=self.method).split('$', 1)[0]
+        return self._prefix
+
+    def needs_rehash(self, pwhash):
+        return pwhash.split('$', 1)[0] != self.prefix
+
+    def _run(self, fn, *args, **kwargs):
+        if self._slots is None:
+            return fn(*args, **kwargs)
+        if not self._slots.acquire(blocking=False):
+            with self._waiting_lock:
+                if self._waiting >= self.max_pending:
+                    raise PasswordHasherBusy()
+                self._waiting += 1
+            try:
+                acquired = self._slots.acquire(timeout=self.queue_timeout)
+            finally:
+                with self._waiting_lock:
+                    self._waiting -= 1
+            if not acquired:
+                raise PasswordHasherBusy()
+        try:
+            if self._offload is not None:
+                return self._offload(fn, *args, **kwargs)
+            return fn(*args, **kwargs)
+        finally:
+            self._slots.release()
+
+def _green_offload():
+    """A function running fn on a real OS thread when threads are green, else None."""
+    try:
+        from eventlet import patcher
+        if patcher.is_monkey_patched('thread'):
+            from eventlet import tpool
+            return tpool.execute
+    except ImportError:
+        pass
+    try:
+        from gevent import monkey
+        if monkey.is_module_patched('threading'):
+            from gevent import get_hub
+            return lambda fn, *args, **kwargs: get_hub().threadpool.apply(fn, args, kwargs)
+    except ImportError:
+        pass
+    return None
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,98 @@
+# backend/app/services/principal_service.py
+import time
+import threading
+from collections import namedtuple
+from flask import request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+from app import db
+from app.db_routing import RoutingSession
+from app.models.user_model import User
+
+# The handful of user facts authorization checks need, without a full User row
+Principal = namedtuple('Principal', ['id', 'is_admin', 'is_deleted'])
+
+class PrincipalCache:
+    """Process-wide user_id -> Principal map whose entries expire after ttl seconds.
+
+    Local writes invalidate once they commit, through the session events
+    below; the TTL bounds how long another worker's change can go unnoticed.
+    """
+
+    def __init__(self, ttl=30.0):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl = app.config['PRINCIPAL_CACHE_TTL']
+        self.clear()
+
+    def get(self, user_id):
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        principal, expires_at = entry
+        if expires_at < time.monotonic():
+            self.invalidate(user_id)
+            return None
+        return principal
+
+    def put(self, principal):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[principal.id] = (principal, time.monotonic() + self.ttl)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+principal_cache = PrincipalCache()
+
+def load_principal(user_id):
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        row = db.session.query(User.id, User.is_admin, User.is_deleted).filter(User.id == user_id).first()
+        if row is None:
+            return None
+        principal = Principal(row.id, bool(row.is_admin), bool(row.is_deleted))
+        principal_cache.put(principal)
+    return principal
+
+def current_principal():
+    """Return the Principal for the JWT's subject, or None if the user is gone or deleted.
+
+    Resolved at most once per request and usually without touching the
+    database. Must be called inside a jwt_required() view.
+    """
+    # Stored on the request rather than g: g lives as long as the app
+    # context, which can span several requests (e.g. in tests)
+    if not hasattr(request, '_principal'):
+        principal = load_principal(int(get_jwt_identity()))
+        # A soft-deleted user's unexpired token must not pass any check
+        request._principal = None if principal is None or principal.is_deleted else principal
+    return request._principal
+
+# Invalidated only once the change commits: dropping the entry at flush time
+# would let a concurrent reader cache the old row again for the whole TTL
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _user_changed(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('principal_invalidations', set()).add(target.id)
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _invalidate_committed(session):
+    for user_id in session.info.pop('principal_invalidations', ()):
+        principal_cache.invalidate(user_id)
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _discard_invalidations(session):
+    session.info.pop('principal_invalidations', None)
@@ -1,7 +1,7 @@
-import qrcode
 from io import BytesIO
 
 def generate_qr_code(transaction_id):
+    import qrcode  # pulls in PIL; only needed when a code is actually drawn
     qr = qrcode.QRCode(version=1, box_size=10, border=5)
     qr.add_data(f"nearbuy:{transaction_id}")
     qr.make(fit=True)
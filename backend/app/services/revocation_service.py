@@ -0,0 +1,160 @@
+# backend/app/services/revocation_service.py
+import os
+import time
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, delete
+from app import db
+from app.models.token_model import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings using double hashing of one blake2b digest."""
+
+    def __init__(self, size_bits, hashes):
+        self.size = size_bits
+        self.hashes = hashes
+        self.bits = bytearray((size_bits + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+class RevocationList:
+    """JTI and per-user token revocation backed by the revoked_tokens table.
+
+    Every worker keeps a Bloom filter of live revocations, so the common case
+    (token not revoked) is a few hash probes in memory. Only a filter hit is
+    confirmed against the table. A background thread per process pulls rows
+    added by other workers every REVOCATION_SYNC_INTERVAL seconds and
+    rebuilds the filter from unexpired rows every REVOCATION_REBUILD_INTERVAL,
+    purging expired rows. It uses its own connection, so neither runs on a
+    request thread or touches a request's session.
+    """
+
+    def __init__(self):
+        self.sync_interval = 5.0
+        self.rebuild_interval = 600.0
+        self.size_bits = 1 << 20
+        self.hashes = 7
+        self.max_token_lifetime = timedelta(days=1)
+        self._lock = threading.Lock()
+        self._app = None
+        self._thread_pid = None
+        self._reset()
+
+    def _reset(self):
+        self._filter = BloomFilter(self.size_bits, self.hashes)
+        self._watermark = 0
+        self._next_rebuild = 0.0
+        self._loaded = False
+
+    def init_app(self, app, jwt):
+        self.sync_interval = app.config['REVOCATION_SYNC_INTERVAL']
+        self.rebuild_interval = app.config['REVOCATION_REBUILD_INTERVAL']
+        self.size_bits = app.config['REVOCATION_BLOOM_BITS']
+        self.hashes = app.config['REVOCATION_BLOOM_HASHES']
+        self.max_token_lifetime = timedelta(seconds=max(
+            app.config['JWT_ACCESS_TOKEN_EXPIRES'], app.config['JWT_REFRESH_TOKEN_EXPIRES']
+        ))
+        self._reset()
+        self._app = app
+
+        @jwt.token_in_blocklist_loader
+        def _check_if_token_revoked(jwt_header, jwt_payload):
+            return self.is_revoked(jwt_payload)
+
+    def revoke_token(self, jwt_payload):
+        """Revoke one decoded token until it would have expired. The caller commits."""
+        expires_at = datetime.fromtimestamp(jwt_payload['exp'], tz=timezone.utc)
+        db.session.add(RevokedToken(jti=jwt_payload['jti'], expires_at=expires_at))
+        self._filter.add(f"jti:{jwt_payload['jti']}")
+
+    def revoke_user(self, user_id):
+        """Revoke every token issued to user_id so far. The caller commits."""
+        now = datetime.now(timezone.utc)
+        db.session.add(RevokedToken(user_id=user_id, revoked_at=now, expires_at=now + self.max_token_lifetime))
+        self._filter.add(f"sub:{user_id}")
+
+    def is_revoked(self, jwt_payload):
+        if not self._loaded and self._app is not None:
+            self.start()
+        jti = jwt_payload.get('jti')
+        if jti and f"jti:{jti}" in self._filter:
+            if db.session.query(RevokedToken.id).filter(RevokedToken.jti == jti).first():
+                return True
+
+        subject = jwt_payload.get('sub')
+        if subject is not None and f"sub:{subject}" in self._filter:
+            issued_at = datetime.fromtimestamp(jwt_payload.get('iat', 0), tz=timezone.utc)
+            if db.session.query(RevokedToken.id).filter(
+                RevokedToken.user_id == int(subject),
+                RevokedToken.revoked_at >= issued_at.replace(tzinfo=None, microsecond=0)
+            ).first():
+                return True
+        return False
+
+    def start(self, app=None):
+        """Load the filter, then keep it in sync from a background thread.
+
+        gunicorn's post_worker_init calls this; is_revoked() starts it on
+        first use in processes that skip that hook, e.g. `flask run`. Callers
+        arriving during the first load wait for it, so no request is checked
+        against an empty filter.
+        """
+        with self._lock:
+            self._app = app or self._app
+            if not self._loaded:
+                self.sync()
+                self._loaded = True
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+        threading.Thread(target=self._run, name='revocation-sync', daemon=True).start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.sync_interval)
+            try:
+                self.sync()
+            except Exception as e:
+                logger.error(f"Revocation list sync failed: {str(e)}", exc_info=True)
+
+    def sync(self, app=None):
+        """Pull revocations added since the last sync, or rebuild the filter when that is due."""
+        now = time.monotonic()
+        with (app or self._app).app_context(), db.engine.begin() as connection:
+            if now >= self._next_rebuild:
+                connection.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.now(timezone.utc)))
+                bloom = BloomFilter(self.size_bits, self.hashes)
+                self._load_since(connection, 0, bloom)
+                self._filter = bloom
+                self._next_rebuild = now + self.rebuild_interval
+            else:
+                self._load_since(connection, self._watermark, self._filter)
+
+    def _load_since(self, connection, watermark, bloom):
+        rows = connection.execute(
+            select(RevokedToken.id, RevokedToken.jti, RevokedToken.user_id).where(
+                RevokedToken.id > watermark,
+                RevokedToken.expires_at > datetime.now(timezone.utc)
+            ).order_by(RevokedToken.id)
+        )
+        for row_id, jti, user_id in rows:
+            bloom.add(f"jti:{jti}" if jti else f"sub:{user_id}")
+            watermark = row_id
+        self._watermark = max(self._watermark, watermark)
+
+revocation_list = RevocationList()
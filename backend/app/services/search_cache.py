@@ -0,0 +1,77 @@
+# backend/app/services/search_cache.py
+import json
+import hashlib
+from sqlalchemy import event, func, inspect, select
+from app import db
+from app.models.listing_model import Listing
+from app.services.cache_service import entity_cache, stale_after_commit
+
+# Generation counters, kept as versions of the 'search' entity in entity_cache:
+#   search:all            every listing write; keys searches without a category filter
+#   search:category:<c>   writes to listings in category c (case-folded)
+#   search:categories     the set of categories changed (insert, delete, recategorize)
+ALL = 'all'
+CATEGORIES = 'categories'
+
+def fold_case(text):
+    """text with its ASCII letters lowercased, the way SQLite's lower() and ilike fold it."""
+    return ''.join(c.lower() if 'A' <= c <= 'Z' else c for c in text)
+
+def _category_key(category):
+    return f'category:{fold_case(category)}'
+
+def known_categories():
+    """Distinct case-folded listing categories, reloaded when the set may have changed."""
+    def load():
+        rows = db.session.query(func.lower(Listing.category)).filter(Listing.category != None).distinct()
+        return sorted(row[0] for row in rows)
+    generation = entity_cache.version('search', CATEGORIES)
+    return entity_cache.read_through('search', f'search:categories:v{generation}', load)
+
+def cached_search(params, loader):
+    """Search results for the normalized params dict, from cache when nothing relevant changed.
+
+    A search filtered by category depends only on the generations of the
+    categories its (substring) filter can match, so selling a bike doesn't
+    evict cached book searches. Anything else, including filters with LIKE
+    wildcards that can't be matched here, depends on the global generation.
+    """
+    if entity_cache.ttl <= 0:
+        return loader()
+    category = params.get('category')
+    if category and '%' not in category and '_' not in category:
+        needle = fold_case(category)
+        names = [_category_key(c) for c in known_categories() if needle in c]
+    else:
+        names = [ALL]
+    generations = [(name, entity_cache.version('search', name)) for name in names]
+    digest = hashlib.sha1(json.dumps([params, generations], sort_keys=True).encode()).hexdigest()
+    return entity_cache.read_through('search', f'search:{digest}', loader)
+
+def _current_category(connection, target):
+    state = inspect(target)
+    if 'category' in state.dict:
+        return state.dict['category']
+    # Expired since the last commit; read it on the flush's own connection
+    return connection.execute(select(Listing.category).where(Listing.id == target.id)).scalar()
+
+@event.listens_for(Listing, 'after_insert')
+@event.listens_for(Listing, 'before_delete')
+def _listing_added_or_removed(mapper, connection, target):
+    keys = [('search', ALL), ('search', CATEGORIES)]
+    category = _current_category(connection, target)
+    if category:
+        keys.append(('search', _category_key(category)))
+    stale_after_commit(target, *keys)
+
+@event.listens_for(Listing, 'after_update')
+def _listing_updated(mapper, connection, target):
+    # Covers edits, admin removals and confirmations marking the listing sold
+    keys = [('search', ALL)]
+    history = inspect(target).attrs.category.history
+    if history.has_changes():
+        keys.append(('search', CATEGORIES))
+    for category in {*history.deleted, _current_category(connection, target)}:
+        if category:
+            keys.append(('search', _category_key(category)))
+    stale_after_commit(target, *keys)
@@ -0,0 +1,246 @@
+# backend/app/services/seed_service.py
+import math
+import random
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import insert, func
+from app import db
+from app.models.user_model import User
+from app.models.listing_model import Listing, Transaction
+from app.models.chat_model import ChatRoom, ChatMessage
+from app.models.transaction_status_history import TransactionStatusHistory
+from app.services.password_service import password_hasher
+
+# The app's categories (mobile CreateListingScreen) with their share of
+# listings, median price and spread (lognormal sigma), and item nouns
+CATEGORIES = {
+    'Electronics': (0.24, 120.0, 0.9, ['Phone', 'Laptop', 'Monitor', 'Headphones', 'Tablet', 'Camera',
+                                       'Speaker', 'Keyboard', 'Game Console', 'Smartwatch']),
+    'Furniture': (0.18, 80.0, 0.8, ['Desk', 'Chair', 'Bookshelf', 'Sofa', 'Bed Frame', 'Dresser',
+                                    'Coffee Table', 'Lamp', 'Wardrobe', 'Mirror']),
+    'Clothing': (0.20, 20.0, 0.7, ['Jacket', 'Sneakers', 'Hoodie', 'Jeans', 'Dress', 'Boots',
+                                   'Coat', 'Backpack', 'Sweater', 'Shirt']),
+    'Books': (0.16, 12.0, 0.6, ['Textbook', 'Novel', 'Cookbook', 'Study Guide', 'Comic Set',
+                                'Dictionary', 'Lab Manual', 'Poetry Collection']),
+    'Vehicles': (0.06, 900.0, 1.1, ['Bike', 'Scooter', 'E-Bike', 'Skateboard', 'Car', 'Motorbike']),
+    'Other': (0.16, 25.0, 0.9, ['Kettle', 'Guitar', 'Plant', 'Board Game', 'Tent', 'Microwave',
+                                'Yoga Mat', 'Toolbox', 'Fan', 'Rice Cooker']),
+}
+ADJECTIVES = ['Used', 'Like New', 'Vintage', 'Compact', 'Barely Used', 'Refurbished', 'Classic',
+              'Lightweight', 'Sturdy', 'Spare', 'Student', 'Large', 'Small', 'Black', 'White']
+SENTENCES = [
+    'Works perfectly, selling because I am moving out.',
+    'Minor scratches, otherwise in great condition.',
+    'Pick up near campus, evenings only.',
+    'Comes with the original box and charger.',
+    'Smoke-free and pet-free home.',
+    'Price is slightly negotiable for quick pickup.',
+    'Bought last semester and barely used it.',
+    'Cash or bank transfer on pickup.',
+    'Happy to send more photos on request.',
+    'Some wear from normal use, see photos.',
+]
+FIRST_NAMES = ['Aisha', 'Ben', 'Chloe', 'Daniel', 'Elif', 'Farid', 'Grace', 'Hiro', 'Ines', 'Jack',
+               'Kavya', 'Liam', 'Mei', 'Noah', 'Olivia', 'Priya', 'Quinn', 'Rosa', 'Sam', 'Tom']
+LAST_NAMES = ['Ahmed', 'Brown', 'Chen', 'Davies', 'Evans', 'Fischer', 'Garcia', 'Huang', 'Ito',
+              'Jones', 'Khan', 'Lee', 'Martin', 'Nguyen', 'Okafor', 'Patel', 'Rossi', 'Smith']
+LOCATIONS = ['Campus North', 'Campus South', 'City Centre', 'Riverside', 'Old Town', 'Station Quarter']
+MESSAGES = [
+    'Hi, is this still available?', 'Yes it is!', 'Could you do a bit less?', 'Sure, that works.',
+    'When can I pick it up?', 'Tomorrow after 5 works for me.', 'Great, see you then.',
+    'Does it come with anything else?', 'Just what is in the photos.', 'I am outside now.',
+    'On my way down.', 'Thanks, all good!',
+]
+# Share of transactions per final status; disputed/refunded ones were completed first
+STATUSES = [('completed', 0.55), ('pending', 0.25), ('disputed', 0.10), ('refunded', 0.10)]
+RATINGS = [5, 4, 3, 2, 1]
+RATING_WEIGHTS = [0.50, 0.28, 0.12, 0.05, 0.05]
+
+class DatasetGenerator:
+    """Rows for a synthetic marketplace, identical for the same seed and sizes.
+
+    Sellers and chattiness are heavy-tailed (a few power sellers, a few
+    very long chats) like real marketplaces. Timestamps count back from
+    `until`, not from now, so a dataset can be regenerated exactly. IDs are
+    assigned here, starting after the tables' current maximums, so rows can
+    be bulk-inserted without reading keys back.
+    """
+
+    def __init__(self, seed=42, users=1000, listings=5000, transactions=2000, chat_ratio=0.7,
+                 max_messages=200, until=datetime(2025, 6, 1, tzinfo=timezone.utc), password_hash=''):
+        self.rng = random.Random(seed)
+        self.users = users
+        self.listings = listings
+        self.transactions = min(transactions, listings)
+        self.chat_ratio = chat_ratio
+        self.max_messages = max_messages
+        self.until = until
+        self.password_hash = password_hash
+        self.start_ids = {}
+
+    def _moment(self, days_back=365):
+        return self.until - timedelta(seconds=self.rng.uniform(0, days_back * 86400))
+
+    def user_rows(self):
+        first_id = self.start_ids.get('users', 1)
+        rows = []
+        for i in range(self.users):
+            user_id = first_id + i
+            rows.append({
+                'id': user_id,
+                'email': f'user{user_id}@seed.nearbuy.test',
+                'password': self.password_hash,
+                'is_admin': i == 0,
+                'name': f'{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}',
+                'bio': self.rng.choice(SENTENCES) if self.rng.random() < 0.4 else None,
+                'location': self.rng.choice(LOCATIONS),
+                'phone': f'07{self.rng.randrange(10 ** 8, 10 ** 9)}' if self.rng.random() < 0.5 else None,
+                'is_deleted': False,
+            })
+        self.user_ids = [row['id'] for row in rows]
+        # Pareto weights: a small share of users posts most listings
+        self.seller_weights = [self.rng.paretovariate(1.16) for _ in rows]
+        return rows
+
+    def listing_rows(self):
+        first_id = self.start_ids.get('listings', 1)
+        names = list(CATEGORIES)
+        weights = [CATEGORIES[name][0] for name in names]
+        sellers = self.rng.choices(self.user_ids, weights=self.seller_weights, k=self.listings)
+        rows = []
+        for i in range(self.listings):
+            category = self.rng.choices(names, weights=weights)[0]
+            _, median, sigma, nouns = CATEGORIES[category]
+            created_at = self._moment()
+            rows.append({
+                'id': first_id + i,
+                'title': f'{self.rng.choice(ADJECTIVES)} {self.rng.choice(nouns)}',
+                'description': ' '.join(self.rng.sample(SENTENCES, self.rng.randint(1, 4))),
+                'price': round(max(1.0, self.rng.lognormvariate(math.log(median), sigma)), 2),
+                'category': category,
+                'image_url': None,
+                'seller_id': sellers[i],
+                'created_at': created_at,
+                'updated_at': created_at + timedelta(days=self.rng.uniform(0, 5)) if self.rng.random() < 0.3 else None,
+                'status': self.rng.choices(['active', 'removed', 'flagged'], weights=[0.95, 0.04, 0.01])[0],
+            })
+        self._listings = rows
+        return rows
+
+    def transaction_rows(self):
+        """Transactions and their status history rows; marks the listings they sold."""
+        first_id = self.start_ids.get('transactions', 1)
+        history_id = self.start_ids.get('transaction_status_history', 1)
+        active = [row for row in self._listings if row['status'] == 'active']
+        listings = self.rng.sample(active, min(self.transactions, len(active)))
+        statuses, weights = zip(*STATUSES)
+        rows, history = [], []
+        for i, listing in enumerate(listings):
+            buyer_id = self.rng.choice(self.user_ids)
+            while buyer_id == listing['seller_id'] and len(self.user_ids) > 1:
+                buyer_id = self.rng.choice(self.user_ids)
+            status = self.rng.choices(statuses, weights=weights)[0]
+            created_at = listing['created_at'] + timedelta(hours=self.rng.uniform(1, 24 * 14))
+            row = {
+                'id': first_id + i,
+                'qr_code': f'nearbuy:seed{first_id + i:012d}',
+                'buyer_id': buyer_id,
+                'seller_id': listing['seller_id'],
+                'listing_id': listing['id'],
+                'created_at': created_at,
+                'completed': status != 'pending',
+                'completed_at': None,
+                'rating': None,
+                'feedback': None,
+                'status': status,
+                'dispute_reason': None,
+                'disputed_at': None,
+                'resolved_at': None,
+            }
+            transitions = []
+            if status != 'pending':
+                row['completed_at'] = created_at + timedelta(minutes=self.rng.uniform(5, 50))
+                transitions.append(('pending', 'completed', row['completed_at'], buyer_id))
+                listing['status'] = 'sold'
+                if self.rng.random() < 0.7:
+                    row['rating'] = self.rng.choices(RATINGS, weights=RATING_WEIGHTS)[0]
+                    if self.rng.random() < 0.4:
+                        row['feedback'] = self.rng.choice(SENTENCES)
+            if status in ('disputed', 'refunded'):
+                row['disputed_at'] = row['completed_at'] + timedelta(hours=self.rng.uniform(1, 60))
+                row['dispute_reason'] = 'Item not as described'
+                transitions.append(('completed', 'disputed', row['disputed_at'], buyer_id))
+            if status == 'refunded':
+                row['resolved_at'] = row['disputed_at'] + timedelta(days=self.rng.uniform(0.5, 7))
+                transitions.append(('disputed', 'refunded', row['resolved_at'], self.user_ids[0]))
+            for from_status, to_status, changed_at, changed_by in transitions:
+                history.append({'id': history_id, 'transaction_id': row['id'], 'from_status': from_status,
+                                'to_status': to_status, 'changed_at': changed_at, 'changed_by': changed_by,
+                                'notes': None})
+                history_id += 1
+            rows.append(row)
+        self._transactions = rows
+        return rows, history
+
+    def chat_rows(self):
+        """Chat rooms for a share of transactions, with heavy-tailed message counts."""
+        room_id = self.start_ids.get('chat_rooms', 1)
+        message_id = self.start_ids.get('chat_messages', 1)
+        rooms, messages = [], []
+        for transaction in self._transactions:
+            if self.rng.random() >= self.chat_ratio:
+                continue
+            rooms.append({'id': room_id, 'transaction_id': transaction['id'],
+                          'listing_id': transaction['listing_id'], 'created_at': transaction['created_at']})
+            count = min(self.max_messages, int(self.rng.paretovariate(1.3) * 3))
+            sent_at = transaction['created_at']
+            unread_tail = self.rng.choice([0, 0, 0, 1, 2])
+            for n in range(count):
+                sent_at += timedelta(seconds=self.rng.expovariate(1 / 600))
+                sender = transaction['buyer_id'] if n % 2 == 0 else transaction['seller_id']
+                messages.append({
+                    'id': message_id, 'room_id': room_id, 'sender_id': sender,
+                    'content': self.rng.choice(MESSAGES), 'sent_at': sent_at,
+                    'read_at': None if n >= count - unread_tail else sent_at + timedelta(minutes=self.rng.uniform(1, 90)),
+                })
+                message_id += 1
+            room_id += 1
+        return rooms, messages
+
+def next_ids(session):
+    """First free id of each table the generator fills."""
+    tables = {'users': User, 'listings': Listing, 'transactions': Transaction,
+              'transaction_status_history': TransactionStatusHistory,
+              'chat_rooms': ChatRoom, 'chat_messages': ChatMessage}
+    return {name: (session.query(func.max(model.id)).scalar() or 0) + 1 for name, model in tables.items()}
+
+def insert_batched(connection, model, rows, batch_size):
+    # One executemany per batch: far fewer round trips than ORM unit-of-work inserts
+    statement = insert(model.__table__)
+    for start in range(0, len(rows), batch_size):
+        connection.execute(statement, rows[start:start + batch_size])
+
+def seed_database(seed=42, users=1000, listings=5000, transactions=2000, chat_ratio=0.7,
+                  batch_size=5000, password='seedpass123', progress=None):
+    """Generate a dataset and bulk-insert it in one transaction; returns row counts per table.
+
+    Every seeded user can log in with `password` (hashed once, shared).
+    Runs inside an app context.
+    """
+    generator = DatasetGenerator(seed=seed, users=users, listings=listings, transactions=transactions,
+                                 chat_ratio=chat_ratio, password_hash=password_hasher.hash(password))
+    generator.start_ids = next_ids(db.session)
+    db.session.rollback()
+
+    user_rows = generator.user_rows()
+    listing_rows = generator.listing_rows()
+    transaction_rows, history_rows = generator.transaction_rows()
+    room_rows, message_rows = generator.chat_rows()
+
+    tables = [(User, user_rows), (Listing, listing_rows), (Transaction, transaction_rows),
+              (TransactionStatusHistory, history_rows), (ChatRoom, room_rows), (ChatMessage, message_rows)]
+    with db.engine.begin() as connection:
+        for model, rows in tables:
+            insert_batched(connection, model, rows, batch_size)
+            if progress:
+                progress(model.__tablename__, len(rows))
+    return {model.__tablename__: len(rows) for model, rows in tables}
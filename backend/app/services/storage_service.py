@@ -0,0 +1,93 @@
+# backend/app/services/storage_service.py
+import os
+import re
+import uuid
+import shutil
+import hashlib
+from flask import current_app
+from sqlalchemy.dialects.sqlite import insert
+from app import db
+from app.models.upload_model import UploadObject
+
+# Matches /uploads/ab/cd/<sha256>.<ext> anywhere in a stored URL
+CONTENT_ADDRESSED_RE = re.compile(r'/uploads/([0-9a-f]{2})/([0-9a-f]{2})/([0-9a-f]{64})\.(\w+)$')
+
+def sha256_from_url(url):
+    if not url:
+        return None
+    match = CONTENT_ADDRESSED_RE.search(url.split('?', 1)[0])
+    return match.group(3) if match else None
+
+def store_bytes(data, extension):
+    """Store data under its sha256 and return (UploadObject, created).
+
+    Identical content is written to disk once; later stores only bump the
+    object's reference count. The caller owns the surrounding transaction.
+    """
+    def write(tmp_path):
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+
+    return _store(hashlib.sha256(data).hexdigest(), extension, len(data), write)
+
+def store_file(path, extension):
+    """Like store_bytes, but takes ownership of an already written file.
+
+    The file is hashed in a streaming pass and renamed into place, or deleted
+    if the object already exists.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+
+    def write(tmp_path):
+        shutil.move(path, tmp_path)
+
+    obj, created = _store(digest.hexdigest(), extension, os.path.getsize(path), write)
+    if os.path.exists(path):
+        os.remove(path)
+    return obj, created
+
+def release(url):
+    """Drop one reference to the object behind url, if it is content-addressed."""
+    digest = sha256_from_url(url)
+    if not digest:
+        return
+    db.session.query(UploadObject).filter(
+        UploadObject.sha256 == digest,
+        UploadObject.ref_count > 0
+    ).update({'ref_count': UploadObject.ref_count - 1}, synchronize_session=False)
+
+def object_url(obj):
+    return f"/uploads/{obj.relative_path}"
+
+def _relative_parts(digest, extension):
+    return digest[:2], digest[2:4], f"{digest}.{extension}"
+
+def _store(digest, extension, size, write):
+    obj = db.session.get(UploadObject, digest)
+    extension = obj.extension if obj is not None else extension.lower()
+    filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], *_relative_parts(digest, extension))
+    if obj is not None and os.path.exists(filepath):
+        obj.ref_count = UploadObject.ref_count + 1
+        # Restart the GC grace period, which goes by mtime, for the revived file
+        os.utime(filepath)
+        return obj, False
+
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    if not os.path.exists(filepath):
+        # Write to a unique temp file then rename, so concurrent stores of the
+        # same content never expose a partially written object
+        tmp_path = f"{filepath}.{uuid.uuid4().hex}.tmp"
+        write(tmp_path)
+        os.replace(tmp_path, filepath)
+
+    # A concurrent first store of the same content may have inserted the row
+    # since the get above; the upsert makes that a reference, not an IntegrityError
+    db.session.execute(
+        insert(UploadObject)
+        .values(sha256=digest, extension=extension, size=size, ref_count=1)
+        .on_conflict_do_update(index_elements=['sha256'], set_={'ref_count': UploadObject.ref_count + 1})
+    )
+    return db.session.get(UploadObject, digest, populate_existing=True), True
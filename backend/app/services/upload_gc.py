@@ -0,0 +1,188 @@
+# backend/app/services/upload_gc.py
+import os
+import json
+import time
+import shutil
+import logging
+from flask import current_app
+from app import db
+from app.models.user_model import User
+from app.models.listing_model import Listing
+from app.models.upload_model import UploadObject, UploadSession
+from app.services.image_service import parse_variant_filename
+from app.services.storage_service import sha256_from_url
+
+logger = logging.getLogger(__name__)
+
+def upload_relative_path(url):
+    """Turn a stored image URL (absolute or /uploads/...) into a path under UPLOAD_FOLDER."""
+    if not url or '/uploads/' not in url:
+        return None
+    return url.split('?', 1)[0].split('/uploads/', 1)[1]
+
+def referenced_upload_paths(batch_size=1000):
+    """Build the set of upload paths still referenced by listings and avatars.
+
+    Rows are streamed in batches so the whole table is never loaded at once.
+    """
+    referenced = set()
+    for column in (Listing.image_url, User.avatar):
+        rows = db.session.query(column).filter(column.isnot(None)).execution_options(yield_per=batch_size)
+        for (url,) in rows:
+            path = upload_relative_path(url)
+            if path:
+                referenced.add(path)
+    return referenced
+
+def iter_upload_files(root, after=None):
+    """Yield paths relative to root in sorted order, skipping everything <= after.
+
+    Sorted order is what makes a checkpoint meaningful: a later run can pick
+    up exactly where an interrupted one stopped.
+    """
+    def walk(folder, prefix):
+        try:
+            # Directories sort as "name/" so walk order matches string order of the paths
+            entries = sorted(os.scandir(folder), key=lambda e: e.name + ('/' if e.is_dir() else ''))
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            relative = f"{prefix}{entry.name}"
+            if entry.is_dir(follow_symlinks=False):
+                # Prune whole directories that were finished before the checkpoint
+                if after and after > relative + '/' and not after.startswith(relative + '/'):
+                    continue
+                yield from walk(entry.path, relative + '/')
+            elif entry.is_file(follow_symlinks=False):
+                if after and relative <= after:
+                    continue
+                yield relative
+
+    yield from walk(root, '')
+
+def _is_referenced(relative, referenced, referenced_stems):
+    if relative in referenced:
+        return True
+    # A derivative lives as long as its original, whatever that one's extension
+    parsed = parse_variant_filename(relative)
+    return parsed is not None and parsed[0] in referenced_stems
+
+def _referenced_now(relative):
+    """Re-check one file against the database just before it is removed.
+
+    The walk is paced, so the snapshot it started with can be long out of
+    date: a listing or avatar may point at the file by now, or a dedup hit
+    may have revived its object.
+    """
+    parsed = parse_variant_filename(relative)
+    stem = parsed[0] if parsed else relative.rsplit('.', 1)[0]
+    digest = os.path.basename(stem)
+    if len(digest) == 64 and db.session.query(UploadObject.sha256).filter(
+        UploadObject.sha256 == digest, UploadObject.ref_count > 0
+    ).first():
+        return True
+    for column in (Listing.image_url, User.avatar):
+        if db.session.query(column).filter(column.contains(f"/uploads/{stem}.", autoescape=True)).first():
+            return True
+    return False
+
+def _load_state(state_file):
+    try:
+        with open(state_file) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def _save_state(state_file, state):
+    tmp_path = f"{state_file}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, state_file)
+
+def collect_orphaned_uploads(grace_period=24 * 3600, max_files=None, files_per_second=None,
+                             quarantine=False, dry_run=False, batch_size=1000):
+    """Delete (or quarantine) upload files nothing references any more.
+
+    Only files older than grace_period seconds are touched, so an image that
+    was just uploaded for a listing still being created survives. At most
+    max_files are examined per call and examination is paced to
+    files_per_second; progress is checkpointed to UPLOAD_GC_STATE_FILE so the
+    next call resumes where this one stopped.
+    """
+    config = current_app.config
+    root = config['UPLOAD_FOLDER']
+    state_file = config['UPLOAD_GC_STATE_FILE']
+    quarantine_root = config['UPLOAD_QUARANTINE_FOLDER']
+
+    state = _load_state(state_file)
+    resumed_from = state.get('checkpoint')
+    referenced = referenced_upload_paths(batch_size)
+    referenced_stems = {path.rsplit('.', 1)[0] for path in referenced}
+    cutoff = time.time() - grace_period
+
+    stats = {'scanned': 0, 'removed': 0, 'bytes_freed': 0, 'resumed_from': resumed_from, 'finished': False}
+    interval = 1.0 / files_per_second if files_per_second else 0
+    last_path = resumed_from
+    started = time.monotonic()
+
+    for relative in iter_upload_files(root, after=resumed_from):
+        if max_files is not None and stats['scanned'] >= max_files:
+            break
+        if interval:
+            # Pace the walk so GC never saturates the disk production is using
+            delay = started + stats['scanned'] * interval - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        if stats['scanned'] and stats['scanned'] % batch_size == 0 and not dry_run:
+            _save_state(state_file, {'checkpoint': last_path})
+        stats['scanned'] += 1
+        last_path = relative
+
+        path = os.path.join(root, relative)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        if st.st_mtime > cutoff or _is_referenced(relative, referenced, referenced_stems):
+            continue
+        referenced_now = _referenced_now(relative)
+        db.session.rollback()  # don't hold a read transaction across the pacing sleep
+        if referenced_now:
+            continue
+
+        stats['removed'] += 1
+        stats['bytes_freed'] += st.st_size
+        if dry_run:
+            continue
+        if quarantine:
+            target = os.path.join(quarantine_root, relative)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.move(path, target)
+        else:
+            os.remove(path)
+
+        digest = sha256_from_url(f"/uploads/{relative}")
+        if digest:
+            UploadSession.query.filter_by(object_sha256=digest).delete()
+            UploadObject.query.filter(UploadObject.sha256 == digest, UploadObject.ref_count <= 0).delete()
+            db.session.commit()
+    else:
+        stats['finished'] = True
+
+    if not dry_run:
+        _save_state(state_file, {} if stats['finished'] else {'checkpoint': last_path})
+    logger.info(f"Upload GC: {stats}")
+    return stats
+
+def purge_expired_upload_sessions():
+    """Remove chunk folders of resumable uploads older than UPLOAD_SESSION_TTL."""
+    folder = current_app.config['UPLOAD_SESSION_FOLDER']
+    cutoff = time.time() - current_app.config['UPLOAD_SESSION_TTL']
+    removed = 0
+    if not os.path.isdir(folder):
+        return removed
+    for entry in os.scandir(folder):
+        if entry.is_dir(follow_symlinks=False) and entry.stat().st_mtime < cutoff:
+            shutil.rmtree(entry.path, ignore_errors=True)
+            removed += 1
+    return removed
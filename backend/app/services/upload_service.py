@@ -1,13 +1,21 @@
 import os
+import re
 import uuid
+import mimetypes
 from datetime import datetime
 from werkzeug.utils import secure_filename
-from flask import current_app
+from werkzeug.security import safe_join
+from flask import current_app, send_from_directory, abort, Response
 from app import db
+from app.services.image_service import schedule_variants, parse_variant_filename
+from app.services.storage_service import store_bytes, object_url
 import time
 
 UPLOAD_FOLDER = 'uploads'
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+# Content-addressed objects and their derivatives never change once written
+IMMUTABLE_PATH_RE = re.compile(r'^[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}(_[a-z]+)?\.\w+$')
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
 
 def allowed_file(filename):
     return '.' in filename and \
@@ -16,14 +24,57 @@ def allowed_file(filename):
 def save_uploaded_file(file):
     if not file or not allowed_file(file.filename):
         return None
-    
-    # Create uploads directory if it doesn't exist
-    os.makedirs(current_app.config['UPLOAD_FOLDER'], exist_ok=True)
-    
-    # Generate filename
+
     ext = file.filename.rsplit('.', 1)[1].lower()
-    filename = f"listing_{int(time.time()*1000)}.{ext}"
-    filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-    file.save(filepath)
-    print(f"File saved to: {os.path.abspath(filepath)}")  # Debug logging
-    return f"/uploads/{filename}"  # Return consistent URL path
\ No newline at end of file
+    obj, created = store_bytes(file.read(), ext)
+    if created:
+        schedule_variants(obj.relative_path)
+    db.session.commit()
+    return object_url(obj)
+
+def resolve_upload_filename(folder, filename):
+    """Return the file to serve for filename.
+
+    Derivatives are generated in the background, so until one exists the
+    request falls back to the original upload it was derived from.
+    """
+    if os.path.exists(os.path.join(folder, filename)):
+        return filename
+    parsed = parse_variant_filename(filename)
+    if not parsed:
+        return filename
+    stem, _ = parsed
+    for ext in ALLOWED_EXTENSIONS:
+        original = f"{stem}.{ext}"
+        if os.path.exists(os.path.join(folder, original)):
+            return original
+    return filename
+
+def send_upload(filename):
+    """Serve an uploaded file with cache validators and byte-range support.
+
+    With UPLOAD_SENDFILE_MODE set to 'x-accel' only headers are returned and
+    the front proxy streams the bytes from UPLOAD_ACCEL_PREFIX; 'x-sendfile'
+    relies on Flask's USE_X_SENDFILE for Apache/lighttpd.
+    """
+    config = current_app.config
+    folder = config['UPLOAD_FOLDER']
+    resolved = resolve_upload_filename(folder, filename)
+    # A derivative answered by its original must stay revalidatable
+    immutable = resolved == filename and IMMUTABLE_PATH_RE.match(filename) is not None
+    max_age = IMMUTABLE_MAX_AGE if immutable else config['UPLOAD_CACHE_MAX_AGE']
+
+    if config['UPLOAD_SENDFILE_MODE'] == 'x-accel':
+        path = safe_join(folder, resolved)
+        if path is None or not os.path.isfile(path):
+            abort(404)
+        response = Response(mimetype=mimetypes.guess_type(resolved)[0] or 'application/octet-stream')
+        response.headers['X-Accel-Redirect'] = f"{config['UPLOAD_ACCEL_PREFIX'].rstrip('/')}/{resolved}"
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+    else:
+        response = send_from_directory(folder, resolved, max_age=max_age, conditional=True, etag=True)
+
+    if immutable:
+        response.cache_control.immutable = True
+    return response
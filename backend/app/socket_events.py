@@ -1,15 +1,19 @@
 from flask_socketio import SocketIO, emit, join_room
 from app import db
 from app.models.chat_model import ChatMessage
-from datetime import datetime, timezone
 from typing import Any, Dict
+from app.metrics import socketio_connections, socketio_events_total
 
 # Create uninitialized SocketIO instance
 socketio = SocketIO(cors_allowed_origins="*", async_mode='threading')
 
 def init_socketio(app):
     """Initialize SocketIO with the Flask app and register handlers."""
-    socketio.init_app(app)
+    socketio.init_app(
+        app,
+        async_mode=app.config['SOCKETIO_ASYNC_MODE'],
+        message_queue=app.config['SOCKETIO_MESSAGE_QUEUE']
+    )
     _register_handlers()
     return socketio
 
@@ -17,20 +21,24 @@ def _register_handlers() -> None:
 
     @socketio.on('connect')
     def _handle_connect() -> None:
+        socketio_connections.inc()
         print('Client connected')
 
     @socketio.on('disconnect')
     def _handle_disconnect() -> None:
+        socketio_connections.dec()
         print('Client disconnected')
 
     @socketio.on('join')
     def _handle_join(data: Dict[str, Any]) -> None:
+        socketio_events_total.inc(event='join')
         if (room_id := data.get('room_id')):
             join_room(f'room_{room_id}')
             print(f"Client joined room {room_id}")
 
     @socketio.on('send_message')
     def _handle_message(data: Dict[str, Any]) -> None:
+        socketio_events_total.inc(event='send_message')
         try:
             new_msg = ChatMessage(
                 room_id=data['room_id'],
@@ -38,16 +46,10 @@ def _register_handlers() -> None:
                 content=data['content']
             )
             db.session.add(new_msg)
+            # Committing writes the new_message event to the outbox; the dispatcher emits it
             db.session.commit()
-            
-            emit('new_message', {
-                'id': new_msg.id,
-                'content': data['content'],
-                'sender_id': data['user_id'],
-                'timestamp': datetime.now(timezone.utc).isoformat(),
-                'room_id': data['room_id']
-            }, room=f'room_{data["room_id"]}')
         except Exception as e:
+            db.session.rollback()
             print(f"Error handling message: {str(e)}")
             emit('error', {'message': str(e)})
 
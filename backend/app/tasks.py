@@ -0,0 +1,34 @@
+# app/tasks.py
+"""Background tasks run by the job queue (app/services/job_queue.py).
+
+Enqueue with job_queue.enqueue('<name>', {...kwargs}) before the commit
+that should make the job happen; periodic tasks enqueue themselves.
+"""
+import os
+from flask import current_app
+from app.services.job_queue import job_queue
+from app.services.image_service import generate_variants
+from app.services.upload_gc import collect_orphaned_uploads, purge_expired_upload_sessions
+
+# Each hourly GC pass examines at most this many files, then resumes from its checkpoint next hour
+UPLOAD_GC_FILES_PER_RUN = 5000
+
+@job_queue.task('images.generate_variants', queue='images', max_attempts=3)
+def generate_image_variants(relative_path):
+    filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], relative_path)
+    if os.path.exists(filepath):  # the original may have been collected since
+        generate_variants(filepath, quality=current_app.config['IMAGE_VARIANT_QUALITY'])
+
+# Not periodic: deleting files stays an operator's call (`flask uploads gc`, or enqueue this)
+@job_queue.task('uploads.gc', queue='maintenance', max_attempts=1)
+def collect_uploads():
+    # Quarantined rather than deleted, so a run against the wrong database can be undone
+    collect_orphaned_uploads(max_files=UPLOAD_GC_FILES_PER_RUN, files_per_second=200, quarantine=True)
+
+@job_queue.periodic('uploads.purge_sessions', interval=3600, queue='maintenance')
+def purge_upload_sessions():
+    purge_expired_upload_sessions()
+
+@job_queue.periodic('jobs.prune', interval=3600, queue='maintenance')
+def prune_jobs():
+    job_queue.prune()
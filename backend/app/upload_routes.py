@@ -0,0 +1,176 @@
+import os
+import uuid
+import base64
+import binascii
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import update
+from app import db
+from app.models.upload_model import UploadSession
+from app.services.upload_service import ALLOWED_EXTENSIONS
+from app.services.storage_service import store_file
+from app.services.image_service import schedule_variants, variant_urls
+from app.metrics import upload_bytes_total
+from app.services.chunked_upload_service import (
+    received_chunks, next_missing_chunk, write_chunk, assemble_chunks, discard_chunks
+)
+
+bp = Blueprint('uploads', __name__, url_prefix='/api/uploads')
+
+DEFAULT_CHUNK_SIZE = 256 * 1024
+MIN_CHUNK_SIZE = 16 * 1024
+MAX_CHUNK_SIZE = 4 * 1024 * 1024
+
+def load_upload_session(f):
+    """Resolve session_id to the caller's open UploadSession, or fail."""
+    @wraps(f)
+    @jwt_required()
+    def decorated_function(session_id, *args, **kwargs):
+        upload_session = db.session.get(UploadSession, session_id)
+        if not upload_session or upload_session.user_id != int(get_jwt_identity()):
+            return jsonify({"error": "Upload session not found"}), 404
+
+        expires_at = upload_session.created_at.replace(tzinfo=timezone.utc) + \
+            timedelta(seconds=current_app.config['UPLOAD_SESSION_TTL'])
+        if upload_session.status == 'open' and datetime.now(timezone.utc) > expires_at:
+            discard_chunks(upload_session)
+            return jsonify({"error": "Upload session expired", "code": "expired"}), 410
+
+        return f(upload_session, *args, **kwargs)
+    return decorated_function
+
+def session_payload(upload_session, received=None):
+    received = received_chunks(upload_session) if received is None else received
+    return {
+        "session_id": upload_session.id,
+        "status": upload_session.status,
+        "total_size": upload_session.total_size,
+        "chunk_size": upload_session.chunk_size,
+        "total_chunks": upload_session.total_chunks,
+        "received_chunks": received,
+        "next_chunk": next_missing_chunk(upload_session, received)
+    }
+
+def completed_payload(upload_session):
+    url = f"{request.host_url}uploads/{upload_session.upload_object.relative_path}"
+    return {
+        "session_id": upload_session.id,
+        "status": upload_session.status,
+        "url": url,
+        "variants": variant_urls(url)
+    }
+
+@bp.route('/sessions', methods=['POST'])
+@jwt_required()
+def open_upload_session():
+    data = request.get_json()
+    if not data or 'total_size' not in data or 'extension' not in data:
+        return jsonify({"error": "total_size and extension required"}), 400
+
+    extension = str(data['extension']).lower().lstrip('.')
+    if extension not in ALLOWED_EXTENSIONS:
+        return jsonify({"error": "Invalid image format"}), 400
+
+    try:
+        total_size = int(data['total_size'])
+        chunk_size = int(data.get('chunk_size', DEFAULT_CHUNK_SIZE))
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid size"}), 400
+
+    if total_size <= 0 or total_size > current_app.config['CHUNKED_UPLOAD_MAX_SIZE']:
+        return jsonify({"error": "File too large"}), 413
+    if not MIN_CHUNK_SIZE <= chunk_size <= MAX_CHUNK_SIZE:
+        return jsonify({"error": f"chunk_size must be between {MIN_CHUNK_SIZE} and {MAX_CHUNK_SIZE}"}), 400
+
+    upload_session = UploadSession(
+        id=uuid.uuid4().hex,
+        user_id=int(get_jwt_identity()),
+        extension=extension,
+        total_size=total_size,
+        chunk_size=chunk_size
+    )
+    db.session.add(upload_session)
+    db.session.commit()
+
+    return jsonify(session_payload(upload_session, received=[])), 201
+
+@bp.route('/sessions/<session_id>', methods=['GET'])
+@load_upload_session
+def get_upload_session(upload_session):
+    if upload_session.status == 'complete':
+        return jsonify(completed_payload(upload_session)), 200
+    return jsonify(session_payload(upload_session)), 200
+
+@bp.route('/sessions/<session_id>/chunks/<int:index>', methods=['PUT'])
+@load_upload_session
+def put_chunk(upload_session, index):
+    if upload_session.status != 'open':
+        return jsonify({"error": "Upload session already finalized"}), 409
+    if index < 0 or index >= upload_session.total_chunks:
+        return jsonify({"error": "Chunk index out of range"}), 400
+
+    # React Native can't easily send raw bytes, so base64 in JSON is accepted too
+    if request.mimetype == 'application/json':
+        try:
+            chunk = base64.b64decode((request.get_json() or {}).get('data', ''), validate=True)
+        except (binascii.Error, ValueError):
+            return jsonify({"error": "Invalid chunk encoding"}), 400
+    else:
+        chunk = request.get_data(cache=False)
+
+    expected = upload_session.expected_chunk_size(index)
+    if len(chunk) != expected:
+        return jsonify({
+            "error": "Unexpected chunk size",
+            "expected": expected,
+            "received": len(chunk)
+        }), 400
+
+    upload_bytes_total.inc(len(chunk), kind='chunk')
+    write_chunk(upload_session, index, chunk)
+    return jsonify(session_payload(upload_session)), 200
+
+@bp.route('/sessions/<session_id>/finalize', methods=['POST'])
+@load_upload_session
+def finalize_upload_session(upload_session):
+    # Finalizing twice (e.g. the first response was lost) returns the same object
+    if upload_session.status == 'complete':
+        return jsonify(completed_payload(upload_session)), 200
+
+    received = received_chunks(upload_session)
+    if next_missing_chunk(upload_session, received) is not None:
+        return jsonify({"error": "Upload incomplete", **session_payload(upload_session, received)}), 409
+
+    # Claim the session, so a finalize retried while the first is still running doesn't store it twice
+    claimed = db.session.execute(
+        update(UploadSession)
+        .where(UploadSession.id == upload_session.id, UploadSession.status == 'open')
+        .values(status='finalizing')
+    ).rowcount
+    db.session.commit()
+    if not claimed:
+        db.session.refresh(upload_session)
+        if upload_session.status == 'complete':
+            return jsonify(completed_payload(upload_session)), 200
+        return jsonify({"error": "Upload is already being finalized"}), 409
+
+    try:
+        obj, created = store_file(assemble_chunks(upload_session), upload_session.extension)
+        upload_session.status = 'complete'
+        upload_session.upload_object = obj
+        if created:
+            schedule_variants(obj.relative_path)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Finalizing upload {upload_session.id} failed: {str(e)}")
+        # Give the claim back so the client can finalize again
+        upload_session.status = 'open'
+        db.session.commit()
+        return jsonify({"error": "File upload failed", "details": str(e)}), 500
+
+    discard_chunks(upload_session)
+
+    return jsonify(completed_payload(upload_session)), 200
@@ -0,0 +1,282 @@
+"""Latency, throughput, query count and memory of the hot API paths on a seeded dataset.
+
+    python -m benchmarks.bench_endpoints --save benchmarks/baseline.json
+    python -m benchmarks.bench_endpoints --compare benchmarks/baseline.json
+
+Seeds a fresh SQLite file with `flask seed`'s generator (--users/--listings/
+--transactions, same --seed gives the same rows), then for every scenario:
+
+  * counts the SQL statements one request runs (fewest of three requests,
+    so one-off cache warm-up doesn't add noise),
+  * records the peak Python memory allocated by one request (tracemalloc),
+  * times --requests requests from --concurrency threads and reports
+    p50/p95/p99 latency and requests per second.
+
+Scenarios call the app through the test client, so nothing here measures the
+network or the WSGI server. The read-through caches are off unless --cache is
+given: a regression in the query behind a cached path must still show up.
+
+--compare exits with status 1 when a scenario runs more queries than the
+baseline, or its p50/p95 latency, throughput or peak memory is worse by more
+than --tolerance (a fraction). Compare only results from the same machine
+and the same dataset options; the summary says when they differ.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import platform
+import tempfile
+import threading
+import tracemalloc
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.bench_login import percentile
+
+# Options that change what is measured; comparing across them is meaningless
+DATASET_OPTIONS = ('users', 'listings', 'transactions', 'seed', 'cache', 'concurrency')
+
+def build_app(db_path, args):
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ['CACHE_TTL'] = os.environ.get('CACHE_TTL', '300') if args.cache else '0'
+    # Query counts are reported per scenario; per-request warnings and EXPLAINs would only add noise
+    os.environ['QUERY_SLOW_THRESHOLD_MS'] = '0'
+    os.environ['QUERY_REPEAT_WARN_THRESHOLD'] = '0'
+    from app.main import create_app
+    from app import db
+    from app.extensions import limiter
+    from app.services.seed_service import seed_database
+
+    app, _ = create_app()
+    limiter.enabled = False
+    with app.app_context():
+        db.create_all()
+        seed_database(seed=args.seed, users=args.users, listings=args.listings,
+                      transactions=args.transactions)
+    return app
+
+def pick_subjects(app):
+    """The busiest users and room in the dataset, so every scenario has real work to do."""
+    from sqlalchemy import func, union_all, select
+    from app import db
+    from app.models.chat_model import ChatRoom, ChatMessage
+    from app.models.listing_model import Transaction
+    from app.models.user_model import User
+
+    with app.app_context():
+        parties = union_all(
+            select(Transaction.buyer_id.label('user_id')).join(ChatRoom, ChatRoom.transaction_id == Transaction.id),
+            select(Transaction.seller_id.label('user_id')).join(ChatRoom, ChatRoom.transaction_id == Transaction.id),
+        ).subquery()
+        chatty = db.session.query(parties.c.user_id).filter(parties.c.user_id != None) \
+            .group_by(parties.c.user_id).order_by(func.count().desc(), parties.c.user_id).limit(1).scalar()
+        room_id, buyer_id, seller_id = db.session.query(ChatRoom.id, Transaction.buyer_id, Transaction.seller_id) \
+            .join(Transaction, ChatRoom.transaction_id == Transaction.id) \
+            .outerjoin(ChatMessage, ChatMessage.room_id == ChatRoom.id) \
+            .group_by(ChatRoom.id).order_by(func.count(ChatMessage.id).desc(), ChatRoom.id).first()
+        seller = db.session.query(Transaction.seller_id).group_by(Transaction.seller_id) \
+            .order_by(func.count().desc(), Transaction.seller_id).limit(1).scalar()
+        admin = db.session.query(User.id).filter(User.is_admin == True).order_by(User.id).limit(1).scalar()
+        buyer = db.session.query(User.id).filter(User.id != seller, User.is_admin == False) \
+            .order_by(User.id).limit(1).scalar()
+    return {'chatty': chatty, 'room': room_id, 'room_member': buyer_id or seller_id,
+            'seller': seller, 'admin': admin, 'buyer': buyer}
+
+def tokens_for(app, user_ids):
+    from flask_jwt_extended import create_access_token
+    with app.app_context():
+        return {user_id: create_access_token(identity=str(user_id)) for user_id in set(user_ids)}
+
+def pending_qr_codes(app, seller_id, count):
+    """Fresh active listings with an unconfirmed QR each; confirming one sells its listing."""
+    from sqlalchemy import insert
+    from app import db
+    from app.models.listing_model import Listing, Transaction
+    from app.services.seed_service import next_ids
+
+    now = datetime.now(timezone.utc)
+    with app.app_context():
+        first_id = next_ids(db.session)['listings']
+        db.session.rollback()
+        codes = [f'nearbuy:{uuid.uuid4().hex}' for _ in range(count)]
+        with db.engine.begin() as connection:
+            connection.execute(insert(Listing.__table__), [
+                {'id': first_id + i, 'title': 'Benchmark Desk', 'description': 'Confirm me', 'price': 40.0,
+                 'category': 'Furniture', 'status': 'active', 'seller_id': seller_id,
+                 'created_at': now, 'updated_at': now} for i in range(count)])
+            connection.execute(insert(Transaction.__table__), [
+                {'qr_code': code, 'seller_id': seller_id, 'listing_id': first_id + i, 'created_at': now,
+                 'completed': False, 'status': 'pending'} for i, code in enumerate(codes)])
+    return iter(codes)
+
+def scenarios(subjects):
+    """(name, method, path, user id to authenticate as or None, 'confirm' if each request spends a QR code)."""
+    chatty, seller, admin = subjects['chatty'], subjects['seller'], subjects['admin']
+    return [
+        ('search_all', 'GET', '/api/listings/search', None, None),
+        ('search_text', 'GET', '/api/listings/search?q=desk', None, None),
+        ('search_category', 'GET', '/api/listings/search?category=electronics', None, None),
+        ('search_price_range', 'GET', '/api/listings/search?category=books&min_price=5&max_price=20', None, None),
+        ('search_seller', 'GET', f'/api/listings/search?seller_id={seller}&status=sold', None, None),
+        ('search_grid_fields', 'GET', '/api/listings/search?fields=id,title,price,status,image_url,image_variants',
+         None, None),
+        ('get_user_chats', 'GET', '/api/chats/', chatty, None),
+        ('get_messages', 'GET', f"/api/chats/{subjects['room']}/messages", subjects['room_member'], None),
+        ('transaction_history', 'GET', '/api/transactions/history', seller, None),
+        ('get_user', 'GET', f'/api/users/{seller}', chatty, None),
+        ('confirm_transaction', 'POST', '/api/transactions/confirm', subjects['buyer'], 'confirm'),
+        ('admin_get_users', 'GET', '/api/admin/users', admin, None),
+    ]
+
+def run_scenario(app, scenario, token, body, args):
+    from app import query_stats
+    name, method, path, _, _ = scenario
+    headers = {'Authorization': f'Bearer {token}'} if token else {}
+    lock = threading.Lock()
+
+    def call(client):
+        json_body = None
+        if body is not None:
+            with lock:
+                json_body = {'qr_code': next(body)}
+        started = time.perf_counter()
+        res = client.open(path, method=method, headers=headers, json=json_body)
+        elapsed = time.perf_counter() - started
+        if res.status_code >= 400:
+            raise RuntimeError(f'{name}: {method} {path} returned {res.status_code}: {res.get_data(as_text=True)[:200]}')
+        return elapsed, len(res.get_data())
+
+    client = app.test_client()
+    for _ in range(args.warmup):
+        call(client)
+
+    queries = []
+    for _ in range(3):
+        with query_stats.capture() as stats:
+            call(client)
+        queries.append(stats.count)
+
+    tracemalloc.start()
+    _, size = call(client)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    local = threading.local()
+
+    def timed(_):
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+        return call(local.client)[0]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        latencies = list(pool.map(timed, range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        'queries': min(queries),
+        'peak_kib': round(peak / 1024, 1),
+        'response_kib': round(size / 1024, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'rps': round(args.requests / elapsed, 1),
+    }
+
+# (metric, higher is worse, uses --tolerance); query counts must not grow at all
+CHECKS = [('queries', True, False), ('p50_ms', True, True), ('p95_ms', True, True),
+          ('rps', False, True), ('peak_kib', True, True)]
+
+def compare(baseline, current, tolerance):
+    """Print per-metric changes; returns the list of regressions."""
+    regressions = []
+    differing = [key for key in DATASET_OPTIONS if baseline['options'].get(key) != current['options'].get(key)]
+    if differing:
+        print(f"warning: baseline was run with different options ({', '.join(differing)})")
+    if baseline.get('machine') != current.get('machine'):
+        print('warning: baseline was recorded on a different machine')
+
+    print(f"\n{'scenario':<22} " + ' '.join(f'{metric:>18}' for metric, _, _ in CHECKS))
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            print(f'{name:<22} (new, no baseline)')
+            continue
+        cells = []
+        for metric, higher_is_worse, tolerant in CHECKS:
+            old, new = before[metric], result[metric]
+            change = (new - old) / old if old else 0.0
+            worse = change if higher_is_worse else -change
+            regressed = worse > tolerance if tolerant else new > old
+            if regressed:
+                regressions.append(f'{name}.{metric}: {old} -> {new}')
+            cells.append(f"{new:>9g} {change:>+6.0%}{'!' if regressed else ' '}")
+        print(f'{name:<22} ' + ' '.join(f'{cell:>18}' for cell in cells))
+    for name in baseline['results'].keys() - current['results'].keys():
+        print(f'{name:<22} (missing from this run)')
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--listings', type=int, default=5000)
+    parser.add_argument('--transactions', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--requests', type=int, default=100, help='timed requests per scenario')
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--cache', action='store_true', help='leave the read-through caches on')
+    parser.add_argument('--only', nargs='+', metavar='SCENARIO', help='run just these scenarios')
+    parser.add_argument('--save', metavar='PATH', help='write the results as a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH', help='compare against a saved baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed fractional slowdown before --compare fails (default 0.25)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        app = build_app(os.path.join(tmp, 'endpoints.db'), args)
+        print(f'seeded {args.users} users, {args.listings} listings, {args.transactions} transactions '
+              f'in {time.perf_counter() - started:.1f}s; {args.requests} requests x {args.concurrency} threads, '
+              f"cache {'on' if args.cache else 'off'}")
+
+        subjects = pick_subjects(app)
+        selected = [s for s in scenarios(subjects) if not args.only or s[0] in args.only]
+        tokens = tokens_for(app, [s[3] for s in selected if s[3] is not None])
+        results = {}
+        print(f"{'scenario':<22} {'queries':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8} "
+              f"{'peak KiB':>9} {'body KiB':>9}")
+        for scenario in selected:
+            body = None
+            if scenario[4] == 'confirm':
+                body = pending_qr_codes(app, subjects['seller'], args.warmup + 4 + args.requests)
+            r = results[scenario[0]] = run_scenario(app, scenario, tokens.get(scenario[3]), body, args)
+            print(f"{scenario[0]:<22} {r['queries']:>7} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} "
+                  f"{r['rps']:>8.1f} {r['peak_kib']:>9.1f} {r['response_kib']:>9.1f}")
+
+    current = {
+        'recorded_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count()},
+        'options': {key: getattr(args, key) for key in DATASET_OPTIONS} | {'requests': args.requests},
+        'results': results,
+    }
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'\nbaseline written to {args.save}')
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, current, args.tolerance)
+        if regressions:
+            print(f'\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:')
+            for line in regressions:
+                print(f'  {line}')
+            sys.exit(1)
+        print('\nno regressions')
+
+if __name__ == '__main__':
+    main()
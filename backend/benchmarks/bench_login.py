@@ -0,0 +1,103 @@
+"""Login throughput under concurrent load, inline hashing vs the bounded pool.
+
+    python -m benchmarks.bench_login --logins 200 --concurrency 16
+
+Each mode runs a burst of concurrent /api/login calls while a probe thread
+keeps hitting a cheap endpoint, and reports login and probe latency
+percentiles. The probe shows whether the rest of the API stays responsive
+while hashing is saturated.
+"""
+import os
+import time
+import argparse
+import tempfile
+import threading
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def build_app(db_path, users):
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    from app.main import create_app
+    from app import db
+    from app.extensions import limiter
+    from app.models.user_model import User
+
+    app, _ = create_app()
+    limiter.enabled = False
+    with app.app_context():
+        db.create_all()
+        if not User.query.first():
+            db.session.add_all([User(email=f'bench{i}@test.com', password='benchpass') for i in range(users)])
+            db.session.commit()
+    return app
+
+def run_mode(app, workers, logins, concurrency, users):
+    from app.services.password_service import password_hasher
+    password_hasher.configure(
+        app.config['PASSWORD_HASH_METHOD'], workers=workers,
+        max_pending=logins, queue_timeout=app.config['PASSWORD_HASH_QUEUE_TIMEOUT']
+    )
+
+    latencies, statuses, probe = [], [], []
+    stop = threading.Event()
+
+    def login(i):
+        client = app.test_client()
+        started = time.perf_counter()
+        res = client.post('/api/login', json={'email': f'bench{i % users}@test.com', 'password': 'benchpass'})
+        latencies.append(time.perf_counter() - started)
+        statuses.append(res.status_code)
+
+    def probe_loop():
+        client = app.test_client()
+        while not stop.is_set():
+            started = time.perf_counter()
+            client.get('/api/listings/search?q=none')
+            probe.append(time.perf_counter() - started)
+            time.sleep(0.01)
+
+    probe_thread = threading.Thread(target=probe_loop, daemon=True)
+    probe_thread.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(login, range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    probe_thread.join()
+
+    return {
+        'mode': 'inline' if workers == 0 else f'pool({workers})',
+        'throughput': logins / elapsed,
+        'p50': percentile(latencies, 50) * 1000,
+        'p99': percentile(latencies, 99) * 1000,
+        'mean': statistics.mean(latencies) * 1000,
+        'rejected': sum(1 for s in statuses if s == 503),
+        'probe_p99': percentile(probe, 99) * 1000,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, min(4, os.cpu_count() or 1)])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, 'bench.db'), args.users)
+        print(f"{args.logins} logins, {args.concurrency} concurrent clients, {os.cpu_count()} CPUs")
+        print(f"{'mode':<10} {'logins/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'mean ms':>8} {'503s':>5} {'probe p99 ms':>13}")
+        for workers in args.workers:
+            r = run_mode(app, workers, args.logins, args.concurrency, args.users)
+            print(f"{r['mode']:<10} {r['throughput']:>9.1f} {r['p50']:>8.1f} {r['p99']:>8.1f} "
+                  f"{r['mean']:>8.1f} {r['rejected']:>5} {r['probe_p99']:>13.1f}")
+
+if __name__ == '__main__':
+    main()
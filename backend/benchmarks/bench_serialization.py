@@ -0,0 +1,95 @@
+"""Cost of building a large search response: ORM objects + to_dict vs column projections.
+
+    python -m benchmarks.bench_serialization --listings 2000 --runs 20
+
+Seeds a fresh SQLite file with active listings, then times three ways of
+producing the /api/listings/search body for all of them inside a request
+context: the old path (ORM objects, Listing.to_dict, stdlib JSON), the
+projection with the stdlib provider, and the projection with orjson. The
+last line is a `fields=` request for the columns the marketplace grid
+shows. Reports median milliseconds per response and body size.
+"""
+import os
+import argparse
+import tempfile
+import statistics
+import time
+from datetime import datetime, timezone
+from flask import jsonify
+from flask.json.provider import DefaultJSONProvider
+
+def build_app(db_path, listings):
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    from app.main import create_app
+    from app import db
+    from app.models.user_model import User
+    from app.models.listing_model import Listing
+
+    app, _ = create_app()
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(email='bench@test.com', password='benchpass'))
+        db.session.commit()
+        now = datetime.now(timezone.utc)
+        db.session.add_all(Listing(
+            title=f'Listing {i}', description='Gently used, pick up near campus. ' * 3, price=10 + i % 90,
+            category='sports', image_url=f'http://localhost:5000/uploads/{i:032x}.jpg', seller_id=1,
+            created_at=now, updated_at=now,
+        ) for i in range(listings))
+        db.session.commit()
+    return app
+
+def timed(app, build, runs):
+    samples, size = [], 0
+    for _ in range(runs):
+        with app.test_request_context('/api/listings/search'):
+            started = time.perf_counter()
+            body = build().get_data()
+            samples.append(time.perf_counter() - started)
+            size = len(body)
+    return statistics.median(samples) * 1000, size
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--listings', type=int, default=2000)
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, 'serialization.db'), args.listings)
+        from app import db
+        from app.models.listing_model import Listing
+        from app.json_provider import OrjsonProvider, orjson
+        from app.serializers import listing_projection
+
+        def orm_to_dict():
+            listings = Listing.query.filter(Listing.status == 'active').order_by(Listing.created_at.desc()).all()
+            response = jsonify({"count": len(listings), "results": [l.to_dict() for l in listings]})
+            db.session.expunge_all()
+            return response
+
+        def projection(fields=None):
+            def build():
+                plan = listing_projection.plan(fields)
+                rows = Listing.query.filter(Listing.status == 'active').with_entities(*plan.columns) \
+                    .order_by(Listing.created_at.desc()).all()
+                return jsonify({"count": len(rows), "results": plan.many(rows)})
+            return build
+
+        grid = frozenset({'id', 'title', 'price', 'image_variants'})
+        cases = [('orm + to_dict, stdlib json', DefaultJSONProvider, orm_to_dict),
+                 ('projection, stdlib json', DefaultJSONProvider, projection())]
+        if orjson is not None:
+            cases += [('projection, orjson', OrjsonProvider, projection()),
+                      ('projection, orjson, fields=grid', OrjsonProvider, projection(grid))]
+
+        print(f"{args.listings} listings, median of {args.runs} responses")
+        print(f"{'path':<34} {'ms':>8} {'KiB':>8}")
+        with app.app_context():
+            for name, provider, build in cases:
+                app.json = provider(app)
+                ms, size = timed(app, build, args.runs)
+                print(f"{name:<34} {ms:>8.1f} {size / 1024:>8.1f}")
+
+if __name__ == '__main__':
+    main()
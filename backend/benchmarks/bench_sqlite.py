@@ -0,0 +1,108 @@
+"""Mixed chat read/write load on SQLite, stock engine settings vs the tuned profile.
+
+    python -m benchmarks.bench_sqlite --seconds 5 --writers 4 --readers 8
+
+Writers insert chat messages (one commit each) while readers page through
+the newest messages of the room, all through the Flask-SQLAlchemy session
+like the request handlers do. Each profile gets a fresh database file. The
+report shows throughput, latency and how many operations failed with
+"database is locked".
+"""
+import os
+import time
+import argparse
+import tempfile
+import threading
+from sqlalchemy.exc import OperationalError
+from benchmarks.bench_login import percentile
+
+def build_app(db_path, profile):
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ['DB_PROFILE'] = profile
+    from app.main import create_app
+    from app import db
+    from app.models.user_model import User
+    from app.models.chat_model import ChatRoom
+
+    app, _ = create_app()
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(email='bench@test.com', password='benchpass'))
+        db.session.add(ChatRoom())
+        db.session.commit()
+    return app
+
+def run_profile(profile, seconds, writers, readers, tmp):
+    app = build_app(os.path.join(tmp, f'{profile}.db'), profile)
+    from app import db
+    from app.models.chat_model import ChatMessage
+
+    results = {'write': [], 'read': [], 'locked': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def writer():
+        with app.app_context():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    db.session.add(ChatMessage(room_id=1, sender_id=1, content='benchmark message ' * 4))
+                    db.session.commit()
+                except OperationalError:
+                    db.session.rollback()
+                    with lock:
+                        results['locked'] += 1
+                    continue
+                results['write'].append(time.perf_counter() - started)
+
+    def reader():
+        with app.app_context():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    ChatMessage.query.filter_by(room_id=1).order_by(ChatMessage.id.desc()).limit(50).all()
+                    ChatMessage.query.filter_by(room_id=1).count()
+                    db.session.rollback()
+                except OperationalError:
+                    db.session.rollback()
+                    with lock:
+                        results['locked'] += 1
+                    continue
+                results['read'].append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=writer) for _ in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    with app.app_context():
+        db.engine.dispose()
+
+    return {
+        'profile': profile,
+        'writes/s': len(results['write']) / seconds,
+        'write p99': percentile(results['write'], 99) * 1000,
+        'reads/s': len(results['read']) / seconds,
+        'read p99': percentile(results['read'], 99) * 1000,
+        'locked': results['locked'],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--profiles', nargs='+', default=['default', 'tuned'])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{args.writers} writers, {args.readers} readers, {args.seconds:g}s per profile")
+        print(f"{'profile':<8} {'writes/s':>9} {'write p99 ms':>13} {'reads/s':>9} {'read p99 ms':>12} {'locked':>7}")
+        for profile in args.profiles:
+            r = run_profile(profile, args.seconds, args.writers, args.readers, tmp)
+            print(f"{r['profile']:<8} {r['writes/s']:>9.1f} {r['write p99']:>13.1f} "
+                  f"{r['reads/s']:>9.1f} {r['read p99']:>12.1f} {r['locked']:>7}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Cold-start cost: importing the app, building it, and serving the first requests.
+
+    python -m benchmarks.bench_startup --runs 5
+
+Each run is a fresh interpreter against a fresh SQLite file, so nothing is
+cached between runs except the OS page cache. Reports the median and worst
+of each phase, plus the heavy optional modules that ended up imported.
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+PROBE = r'''
+import sys, time, json
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+app, _ = app.main.create_app()
+created = time.perf_counter()
+from app import db
+with app.app_context():
+    db.create_all()
+client = app.test_client()
+ready = time.perf_counter()
+client.get('/healthz')
+first = time.perf_counter()
+client.get('/api/listings/search?q=bike')
+first_db = time.perf_counter()
+print(json.dumps({
+    'import': imported - started,
+    'create_app': created - imported,
+    'first_request': first - ready,
+    'first_db_request': first_db - first,
+    'total': first_db - started - (ready - created),
+    'loaded': sorted(m for m in ('PIL', 'qrcode', 'flask_migrate', 'alembic') if m in sys.modules),
+}))
+'''
+
+def run_once(tmp, index):
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, f'startup{index}.db')}")
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, '-c', PROBE], cwd=backend, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [run_once(tmp, i) for i in range(args.runs)]
+
+    print(f"{args.runs} cold starts, {os.cpu_count()} CPUs (total excludes test schema setup)")
+    print(f"{'phase':<17} {'median ms':>10} {'max ms':>8}")
+    for phase in ('import', 'create_app', 'first_request', 'first_db_request', 'total'):
+        samples = [r[phase] * 1000 for r in results]
+        print(f"{phase:<17} {statistics.median(samples):>10.1f} {max(samples):>8.1f}")
+    print(f"heavy modules loaded: {', '.join(results[0]['loaded']) or 'none'}")
+
+if __name__ == '__main__':
+    main()
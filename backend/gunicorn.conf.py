@@ -0,0 +1,71 @@
+"""gunicorn settings for `gunicorn -c gunicorn.conf.py wsgi:app`.
+
+Every setting can be overridden from the environment. Runs one worker by
+default: gunicorn hands requests to its workers without sticky sessions, so
+a Socket.IO long-polling handshake started on one worker can continue on
+another, and an emit only reaches the clients of the worker that made it.
+
+To scale out, run several single-worker instances behind a proxy that pins
+each client to one instance (nginx `ip_hash`), with SOCKETIO_MESSAGE_QUEUE
+(e.g. redis://localhost:6379/0) set on all of them so emits cross instances.
+SERVER_WORKERS > 1 is refused without a message queue, and even with one it
+is only safe for clients that connect with the websocket transport alone.
+"""
+import os
+import shutil
+
+_backend = os.path.dirname(os.path.abspath(__file__))
+
+worker_mode = os.getenv('SERVER_WORKER_CLASS', 'eventlet')  # 'eventlet' or 'gevent'
+worker_class = {
+    'eventlet': 'eventlet',
+    'gevent': 'geventwebsocket.gunicorn.workers.GeventWebSocketWorker',
+}[worker_mode]
+# Green workers multiplex connections; scale with more instances, see above
+workers = int(os.getenv('SERVER_WORKERS', 1))
+worker_connections = int(os.getenv('SERVER_WORKER_CONNECTIONS', 1000))
+bind = os.getenv('SERVER_BIND', f"0.0.0.0:{os.getenv('PORT', 5000)}")
+timeout = int(os.getenv('SERVER_TIMEOUT', 60))
+keepalive = int(os.getenv('SERVER_KEEPALIVE', 5))
+# Time in-flight requests get after SIGTERM, on top of SERVER_DRAIN_DELAY
+graceful_timeout = int(os.getenv('SERVER_GRACEFUL_TIMEOUT', 30)) + int(os.getenv('SERVER_DRAIN_DELAY', 5))
+accesslog = os.getenv('SERVER_ACCESS_LOG', '-')
+
+# Shared state between workers: the app reads these when it is created
+os.environ.setdefault('SOCKETIO_ASYNC_MODE', worker_mode)
+os.environ.setdefault('RATELIMIT_STORAGE_URI', f"sqlite:///{os.path.join(_backend, 'database', 'ratelimit.db')}")
+os.environ.setdefault('METRICS_DIR', os.path.join(_backend, 'database', 'metrics'))
+os.environ.setdefault('CACHE_URL', f"sqlite:///{os.path.join(_backend, 'database', 'cache.db')}")
+
+def on_starting(server):
+    if server.cfg.workers > 1 and not os.getenv('SOCKETIO_MESSAGE_QUEUE'):
+        raise RuntimeError(
+            f"{server.cfg.workers} workers need SOCKETIO_MESSAGE_QUEUE, or emits never reach clients "
+            "held by other workers; run single-worker instances behind a sticky proxy instead"
+        )
+    # Counter files of the previous deployment's workers would be summed in forever
+    shutil.rmtree(os.environ['METRICS_DIR'], ignore_errors=True)
+    # Cached rows may predate migrations or edits made while we were down
+    if os.environ['CACHE_URL'].startswith('sqlite:///'):
+        path = os.environ['CACHE_URL'][len('sqlite:///'):]
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+def post_worker_init(worker):
+    from app.server import install_drain_handler
+    from app.services.job_queue import job_queue
+    from app.services.outbox_service import outbox
+    from app.services.revocation_service import revocation_list
+    install_drain_handler(worker.wsgi, worker.wsgi.extensions['socketio'])
+    # Emits events left over from before a restart, and those committed by other processes
+    outbox.start(worker.wsgi)
+    # Loads revoked tokens before the first request, then syncs them in the background
+    revocation_list.start(worker.wsgi)
+    if worker.wsgi.config['JOB_WORKERS'] == 'thread':
+        job_queue.start(worker.wsgi)
+
+def worker_exit(server, worker):
+    from app.services.job_queue import job_queue
+    # Let running jobs finish rather than leave them to the lease timeout
+    job_queue.stop(timeout=int(os.getenv('SERVER_GRACEFUL_TIMEOUT', 30)))
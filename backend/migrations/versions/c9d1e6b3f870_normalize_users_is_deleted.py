@@ -0,0 +1,57 @@
+"""Make users.is_deleted non-null and index the admin user list and its stats
+
+Revision ID: c9d1e6b3f870
+Revises: e4a8f27c5b19
+Create Date: 2026-10-19 16:44:08.902157
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9d1e6b3f870'
+down_revision = 'e4a8f27c5b19'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Rows from before the soft-delete columns existed hold NULL
+    op.execute("UPDATE users SET is_deleted = 0 WHERE is_deleted IS NULL")
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.alter_column('is_deleted',
+               existing_type=sa.Boolean(),
+               nullable=False,
+               server_default=sa.false())
+        batch_op.create_index('ix_users_is_deleted_id', ['is_deleted', 'id'], unique=False)
+
+    # Expression indexes can't go through the batch: it rebuilds them by column name
+    op.create_index('ix_users_lower_email', 'users', ['is_deleted', sa.text('lower(email)')], unique=False)
+    op.create_index('ix_users_lower_name', 'users', ['is_deleted', sa.text('lower(name)')], unique=False)
+
+    # The admin list's per-user stats look listings and transactions up by user
+    with op.batch_alter_table('listings', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_listings_seller_id'), ['seller_id'], unique=False)
+
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_transactions_buyer_id'), ['buyer_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_transactions_seller_id'), ['seller_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_transactions_seller_id'))
+        batch_op.drop_index(batch_op.f('ix_transactions_buyer_id'))
+
+    with op.batch_alter_table('listings', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_listings_seller_id'))
+
+    op.drop_index('ix_users_lower_name', table_name='users')
+    op.drop_index('ix_users_lower_email', table_name='users')
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_is_deleted_id')
+        batch_op.alter_column('is_deleted',
+               existing_type=sa.Boolean(),
+               nullable=True,
+               server_default=None)
@@ -1,8 +1,8 @@
 import os
 import shutil
-import requests
 from app.main import create_app
 from app import db
+from app.services.seed_service import seed_database
 
 app, socketio = create_app()
 
@@ -37,13 +37,8 @@ with app.app_context():
 
     print("Database reset complete!")
 
-    # Send a POST request to the '/create-test-users' route
-    print("Creating test users...")
-    try:
-        response = requests.post('http://192.168.1.159:5000/create-test-users')  # Adjust the URL if necessary
-        if response.status_code == 201:
-            print("Test users created successfully!")
-        else:
-            print(f"Failed to create test users: {response.status_code} - {response.text}")
-    except Exception as e:
-        print(f"Error calling the create-test-users route: {e}")
+    # A small synthetic dataset; `flask seed --help` for production-sized ones
+    print("Seeding test data...")
+    counts = seed_database(users=50, listings=200, transactions=80)
+    print(f"Seeded {counts['users']} users and {counts['listings']} listings "
+          "(user1@seed.nearbuy.test is an admin; every password is seedpass123).")
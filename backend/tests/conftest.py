@@ -2,6 +2,8 @@ import pytest
 from app.main import create_app
 from app import db
 import warnings
+from contextlib import contextmanager
+from app import query_stats
 from sqlalchemy.exc import SAWarning
 
 @pytest.fixture
@@ -34,6 +36,19 @@ def auth_tokens(client):
     })
     return res.json
 
+@pytest.fixture
+def query_budget():
+    """with query_budget(3): client.get(...) fails if the block runs more than 3 statements."""
+    @contextmanager
+    def budget(max_queries):
+        with query_stats.capture() as stats:
+            yield stats
+        repeated = ''.join(f"\n  {n}x {s}" for s, n in stats.repeated(2))
+        assert stats.count <= max_queries, (
+            f"{stats.count} queries, budget is {max_queries}; repeated statements:{repeated or ' none'}"
+        )
+    return budget
+
 @pytest.fixture(autouse=True)
 def suppress_sqlalchemy_warnings():
     warnings.filterwarnings(
@@ -0,0 +1,163 @@
+from sqlalchemy import event
+from app import db
+
+def count_statements(engine):
+    statements = []
+    event.listen(engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    return statements
+
+def test_get_reads_go_to_read_engine(app, client):
+    replica = count_statements(db.engines['replica'])
+    primary = count_statements(db.engines[None])
+
+    res = client.get('/api/listings/search?q=bike')
+    assert res.status_code == 200
+    assert any('FROM listings' in s for s in replica)
+    assert not any('FROM listings' in s for s in primary)
+
+def test_reads_follow_own_writes(app, client):
+    replica = count_statements(db.engines['replica'])
+
+    res = client.post('/api/register', json={'email': 'rw@test.com', 'password': 'pass123'})
+    assert res.status_code == 201
+    assert 'read_primary' in res.headers.get('Set-Cookie', '')
+
+    # The client that just wrote reads from the primary until the window passes
+    client.get('/api/listings/search?q=bike')
+    assert not any('FROM listings' in s for s in replica)
+
+    res = app.test_client().get('/api/listings/search?q=bike',
+                                headers={'X-Read-Consistency': 'primary'})
+    assert res.status_code == 200
+    assert not any('FROM listings' in s for s in replica)
+
+def test_read_engine_rejects_writes(app):
+    with db.engines['replica'].connect() as conn:
+        try:
+            conn.exec_driver_sql("INSERT INTO users (email, password) VALUES ('x@y.z', 'x')")
+        except Exception as e:
+            assert 'readonly' in str(e)
+        else:
+            raise AssertionError('read engine accepted a write')
+
+def test_query_stats_headers_and_budget(app, client, auth_tokens, query_budget):
+    app.config['QUERY_STATS_HEADERS'] = True
+    headers = {'Authorization': f"Bearer {auth_tokens['access_token']}"}
+
+    # principal + bought + sold, plus room for the principal cache warming up
+    with query_budget(6):
+        res = client.get('/api/transactions/history', headers=headers)
+    assert res.status_code == 200
+    assert int(res.headers['X-DB-Query-Count']) <= 6
+    assert 'db;dur=' in res.headers['Server-Timing']
+
+def test_repeated_statement_is_reported(app, client, caplog):
+    from app.models.user_model import User
+    db.session.add_all([User(email=f'n{i}@test.com', password='pass123') for i in range(6)])
+    db.session.commit()
+
+    @app.route('/test/n-plus-one')
+    def n_plus_one():
+        for user_id in range(1, 7):
+            db.session.expire_all()
+            db.session.get(User, user_id)
+        return 'ok'
+
+    with caplog.at_level('WARNING', logger='app.query_stats'):
+        client.get('/test/n-plus-one')
+    assert 'Possible N+1' in caplog.text
+
+def test_slow_queries_are_logged_once_and_ranked(app, client, caplog):
+    from app.query_stats import slow_query_log, normalize_sql, redact_parameters
+    slow_query_log.configure(threshold=1e-9, interval=60)  # everything counts as slow
+    try:
+        with caplog.at_level('WARNING', logger='app.query_stats'):
+            client.get('/api/listings/search?q=bike')
+            client.get('/api/listings/search?q=car')
+        # The search itself, not the version stamp query that runs before it
+        search = [r for r in caplog.records if 'FROM listings' in r.getMessage() and 'LIKE' in r.getMessage()]
+        assert len(search) == 1  # the second run is aggregated, not logged again
+        assert "'<str:" in search[0].getMessage()  # the search term is redacted
+
+        top = slow_query_log.top()
+        listing_query = next(q for q in top if 'FROM listings' in q['sql'] and 'LIKE' in q['sql'])
+        assert listing_query['count'] == 2
+        assert any('listings' in step for step in listing_query['plan'])
+        assert top == sorted(top, key=lambda q: q['total_ms'], reverse=True)
+    finally:
+        slow_query_log.configure(app.config['QUERY_SLOW_THRESHOLD_MS'] / 1000, app.config['QUERY_SLOW_LOG_INTERVAL'])
+
+    assert normalize_sql("SELECT * FROM t WHERE id IN (?, ?, ?) AND name = 'x'  AND n > 3") == \
+        "SELECT * FROM t WHERE id IN (...) AND name = ? AND n > ?"
+    assert redact_parameters(('alice@example.com', 42, None)) == ['<str:17>', 42, None]
+
+def test_listing_and_profile_cache_follow_commits(app, client, auth_tokens):
+    from app.models.user_model import User
+    from app.models.listing_model import Listing, Transaction
+    headers = {'Authorization': f"Bearer {auth_tokens['access_token']}"}
+    buyer = User(email='cache-buyer@test.com', password='pass123')
+    listing = Listing(title='Cached Lamp', price=15, seller_id=1)
+    db.session.add_all([buyer, listing])
+    db.session.commit()
+
+    assert client.get(f'/api/listings/{listing.id}').json['title'] == 'Cached Lamp'
+    listing_id = listing.id
+    db.session.expire_all()  # the test's session outlives requests; don't let its identity map answer
+    replica, primary = count_statements(db.engines['replica']), count_statements(db.engines[None])
+    assert client.get(f'/api/listings/{listing_id}').json['title'] == 'Cached Lamp'
+    assert not any('FROM listings' in s for s in replica + primary)
+
+    res = client.put(f'/api/listings/{listing.id}', json={'title': 'Brass Lamp'}, headers=headers)
+    assert res.status_code == 200
+    assert client.get(f'/api/listings/{listing.id}').json['title'] == 'Brass Lamp'
+
+    assert client.get('/api/users/1', headers=headers).json['rating'] == 0
+    sale = Transaction(qr_code='nearbuy:cache', seller_id=1, buyer_id=buyer.id, listing_id=listing.id, completed=True)
+    db.session.add(sale)
+    db.session.commit()
+    sale.rating = 4
+    db.session.commit()
+    profile = client.get('/api/users/1', headers=headers).json
+    assert profile['rating'] == 4
+    assert profile['listings_count'] == 1
+
+def test_sqlite_cache_backend_is_shared(tmp_path):
+    from app.services.cache_service import SQLiteBackend, MISSING
+    path = str(tmp_path / 'cache.db')
+    one, two = SQLiteBackend(path, max_entries=2), SQLiteBackend(path, max_entries=2)
+
+    one.set('listing:1:v0', {'title': 'Lamp'}, ttl=60)
+    assert two.get('listing:1:v0') == {'title': 'Lamp'}
+    one.bump('listing:1')
+    assert two.version('listing:1') == 1
+
+    two.set('listing:2:v0', {}, ttl=30)
+    two.set('listing:3:v0', {}, ttl=90)
+    two.set('listing:4:v0', {}, ttl=-1)
+    two.trim()
+    assert two.get('listing:2:v0') is MISSING  # over max_entries and closest to expiry
+    assert two.get('listing:4:v0') is MISSING
+    assert two.get('listing:3:v0') == {}
+
+def test_seed_command_is_deterministic(app, client):
+    from app.models.listing_model import Listing, Transaction
+    runner = app.test_cli_runner()
+    args = ['seed', '--reset', '--users', '30', '--listings', '120', '--transactions', '60', '--seed', '7']
+
+    def snapshot():
+        return [(l.title, l.price, l.category, l.status, l.seller_id) for l in Listing.query.order_by(Listing.id)]
+
+    result = runner.invoke(args=args)
+    assert result.exit_code == 0, result.output
+    first = snapshot()
+    assert len(first) == 120
+    statuses = {t.status for t in Transaction.query}
+    assert statuses == {'pending', 'completed', 'disputed', 'refunded'}
+
+    db.session.remove()
+    assert runner.invoke(args=args + ['--batch-size', '7']).exit_code == 0
+    assert snapshot() == first
+
+    res = client.post('/api/login', json={'email': 'user2@seed.nearbuy.test', 'password': 'seedpass123'})
+    assert res.status_code == 200
@@ -0,0 +1,135 @@
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, update
+from app import db
+from app.models.job_model import Job
+from app.models.user_model import User
+from app.services.job_queue import job_queue, parse_queues
+
+calls = []
+
+@job_queue.task('test.record')
+def record(value):
+    calls.append(value)
+    db.session.add(User(email=f'job{value}@test.com', password='pass123'))
+
+@job_queue.task('test.flaky', max_attempts=2, backoff=0)
+def flaky():
+    raise RuntimeError('boom')
+
+@job_queue.task('test.stolen', max_attempts=1)
+def stolen():
+    # Another worker takes the lease over, as if this one had stalled past the timeout
+    with db.engine.begin() as connection:
+        connection.execute(update(Job.__table__).where(Job.name == 'test.stolen').values(locked_by='other-worker'))
+    db.session.add(User(email='stolen@test.com', password='pass123'))
+
+@job_queue.task('test.slow')
+def slow():
+    claimed_at = _locked_at()
+    time.sleep(job_queue.lease_timeout)
+    calls.append(_locked_at() > claimed_at)
+
+def _locked_at():
+    with db.engine.connect() as connection:
+        return connection.execute(select(Job.locked_at).where(Job.name == 'test.slow')).scalar()
+
+def test_job_is_enqueued_with_the_transaction(app):
+    calls.clear()
+    db.session.add(User(email='writer@test.com', password='pass123'))
+    job_queue.enqueue('test.record', {'value': 1})
+    db.session.rollback()
+    assert Job.query.count() == 0
+
+    db.session.add(User(email='writer@test.com', password='pass123'))
+    job_queue.enqueue('test.record', {'value': 2})
+    db.session.commit()
+
+    ran = job_queue.run_pending(['default'])
+    assert [(job.name, job.status, job.attempts) for job in ran] == [('test.record', 'succeeded', 1)]
+    assert calls == [2]
+    # The task's writes commit together with the job's completion
+    assert User.query.filter_by(email='job2@test.com').count() == 1
+    assert job_queue.run_pending(['default']) == []
+
+def test_failing_job_is_retried_then_failed(app):
+    job_queue.enqueue('test.flaky')
+    db.session.commit()
+
+    ran = job_queue.run_pending(['default'])
+    assert len(ran) == 2  # no backoff for this task, so the retry is due at once
+    job = ran[-1]
+    assert (job.status, job.attempts) == ('failed', 2)
+    assert 'RuntimeError: boom' in job.last_error
+
+    # Default backoff doubles per attempt, with jitter
+    assert 0.5 * 40 <= job_queue.backoff(3) <= 1.5 * 40
+    delayed = job_queue.enqueue('test.record', {'value': 3}, delay=60)
+    db.session.commit()
+    assert job_queue.run_pending(['default']) == []
+    assert delayed.status == 'queued'
+
+def test_queue_concurrency_and_expired_leases(app):
+    assert parse_queues('default:2, images, maintenance:1') == {'default': 2, 'images': 1, 'maintenance': 1}
+    running = job_queue.enqueue('test.record', {'value': 4})
+    job_queue.enqueue('test.record', {'value': 5})
+    db.session.commit()
+    running.status = 'running'
+    running.attempts = 1
+    running.locked_at = datetime.now(timezone.utc) - timedelta(seconds=job_queue.lease_timeout + 1)
+    db.session.commit()
+
+    limits = job_queue.concurrency
+    job_queue.concurrency = {'default': 1}
+    try:
+        assert job_queue.run_next('default') is None  # the queue's one slot is taken
+        assert job_queue.requeue_expired() == 1
+        assert running.status == 'queued'
+        assert {job.status for job in job_queue.run_pending(['default'])} == {'succeeded'}
+    finally:
+        job_queue.concurrency = limits
+
+def test_periodic_jobs_are_enqueued_once_per_interval(app):
+    now = datetime(2026, 10, 19, 12, 30, tzinfo=timezone.utc)
+    assert set(job_queue.schedule_periodic(now)) == set(job_queue.periodic_tasks)
+    assert job_queue.schedule_periodic(now + timedelta(minutes=10)) == []
+    assert 'jobs.prune' in job_queue.schedule_periodic(now + timedelta(hours=1))
+    assert Job.query.filter_by(name='jobs.prune').count() == 2
+    assert 'uploads.gc' not in job_queue.periodic_tasks  # deleting files is left to operators
+
+def test_admin_can_inspect_and_retry_jobs(app, client, auth_tokens):
+    headers = {'Authorization': f"Bearer {auth_tokens['access_token']}"}
+    job_queue.enqueue('test.flaky')
+    db.session.commit()
+    failed = job_queue.run_pending(['default'])[-1]
+    assert client.get('/api/admin/jobs', headers=headers).status_code == 403
+
+    db.session.get(User, auth_tokens['user_id']).is_admin = True
+    db.session.commit()
+    res = client.get('/api/admin/jobs?status=failed', headers=headers)
+    assert res.status_code == 200
+    assert res.json['queues']['default'] == {'failed': 1}
+    assert [job['id'] for job in res.json['jobs']] == [failed.id]
+
+    res = client.post(f'/api/admin/jobs/{failed.id}/retry', headers=headers)
+    assert res.status_code == 200
+    assert (res.json['status'], res.json['attempts']) == ('queued', 0)
+    assert client.post(f'/api/admin/jobs/{failed.id}/retry', headers=headers).status_code == 400
+
+def test_lease_is_renewed_and_checked_before_finishing(app):
+    job_queue.enqueue('test.stolen')
+    db.session.commit()
+    job = job_queue.run_pending(['default'])[-1]
+    # The other worker's claim stands and the task's writes are discarded
+    assert (job.status, job.locked_by) == ('running', 'other-worker')
+    assert User.query.filter_by(email='stolen@test.com').count() == 0
+
+    calls.clear()
+    lease_timeout, job_queue.lease_timeout = job_queue.lease_timeout, 0.3
+    try:
+        job_queue.enqueue('test.slow')
+        db.session.commit()
+        assert job_queue.run_next('default').status == 'succeeded'
+    finally:
+        job_queue.lease_timeout = lease_timeout
+    assert calls == [True]
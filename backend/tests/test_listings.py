@@ -212,4 +212,98 @@ def test_search_listings(client):
 
 def test_search_invalid_price(client):
     response = client.get('/api/listings/search?min_price=abc')
-    assert response.status_code == 400
\ No newline at end of file
+    assert response.status_code == 400
+
+def test_search_matches_to_dict(client):
+    response = client.get('/api/listings/search?q=bike')
+    with client.application.app_context():
+        expected = [l.to_dict() for l in Listing.query.filter(Listing.title.ilike('%bike%'), Listing.status == 'active')]
+    assert response.json['results'] == json.loads(json.dumps(expected))
+
+def test_search_sparse_fields(client):
+    response = client.get('/api/listings/search?q=bike&fields=id,title,image_variants')
+    assert response.status_code == 200
+    assert response.json['results'] == [{"id": 1, "title": "Test Bike", "image_variants": None}]
+
+    response = client.get('/api/listings/search?fields=id,password')
+    assert response.status_code == 400
+    assert 'password' in response.json['error']
+
+def test_search_conditional_get(client):
+    first = client.get('/api/listings/search')
+    etag = first.headers['ETag']
+    assert etag.startswith('W/')
+
+    unchanged = client.get('/api/listings/search', headers={'If-None-Match': etag})
+    assert unchanged.status_code == 304
+    assert unchanged.data == b''
+
+    # Filters are part of the tag
+    assert client.get('/api/listings/search?q=bike', headers={'If-None-Match': etag}).status_code == 200
+
+    with client.application.app_context():
+        db.session.get(Listing, 1).price = 90
+        db.session.commit()
+    changed = client.get('/api/listings/search', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert changed.json['results'][0]['price'] == 90
+
+def test_search_compressed(client):
+    import gzip
+    with client.application.app_context():
+        db.session.add_all(Listing(title=f"Bike {i}", price=10, seller_id=2) for i in range(20))
+        db.session.commit()
+
+    plain = client.get('/api/listings/search')
+    assert 'Content-Encoding' not in plain.headers
+    assert 'Accept-Encoding' in plain.headers['Vary']
+
+    response = client.get('/api/listings/search', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert len(response.data) < len(plain.data)
+    assert json.loads(gzip.decompress(response.data)) == plain.json
+
+    small = client.get('/api/listings/search?q=nothing', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers
+
+def test_search_cache_invalidated_by_category(client):
+    from sqlalchemy import event
+    statements = []
+    with client.application.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute',
+                         lambda conn, cursor, statement, *args: statements.append(statement))
+
+    def searches():
+        return sum('LIKE' in s for s in statements)
+
+    assert client.get('/api/listings/search?category=sports').json['count'] == 1
+    assert client.get('/api/listings/search?category=Sports').json['count'] == 1
+    assert searches() == 1  # same normalized parameters, served from cache
+
+    with client.application.app_context():
+        db.session.get(Listing, 2).price = 25  # a books listing
+        db.session.commit()
+    assert client.get('/api/listings/search?category=sports').json['count'] == 1
+    assert searches() == 1
+
+    with client.application.app_context():
+        db.session.get(Listing, 1).status = 'sold'
+        db.session.commit()
+    assert client.get('/api/listings/search?category=sports').json['count'] == 0
+    assert searches() == 2
+
+    # SQLite leaves non-ASCII letters alone, and the generation keys must agree with it
+    with client.application.app_context():
+        db.session.add(Listing(title='Radio', price=30, category='Électronique', seller_id=2))
+        db.session.commit()
+    search = {'category': 'ÉLECTRONIQUE'}
+    assert client.get('/api/listings/search', query_string=search).json['count'] == 1
+    assert client.get('/api/listings/search', query_string=search).json['count'] == 1
+    assert searches() == 3
+    with client.application.app_context():
+        db.session.query(Listing).filter_by(title='Radio').one().status = 'sold'
+        db.session.commit()
+    assert client.get('/api/listings/search', query_string=search).json['count'] == 0
+    assert searches() == 4
@@ -0,0 +1,53 @@
+import os
+from app.metrics import registry, upload_bytes_total
+
+def test_metrics_endpoint_reports_route_latency(client):
+    client.get('/api/listings/search?q=bike')
+    client.get('/api/listings/search?q=car')
+
+    res = client.get('/metrics')
+    assert res.status_code == 200
+    body = res.get_data(as_text=True)
+    assert '# TYPE http_request_duration_seconds histogram' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/listings/search",le="+Inf"}' in body
+    assert 'http_requests_total{method="GET",route="/api/listings/search",status="200"}' in body
+    assert 'http_request_db_seconds_count{route="/api/listings/search"}' in body
+
+def test_metrics_are_shared_between_processes(app, tmp_path):
+    registry.configure(str(tmp_path))
+    try:
+        upload_bytes_total.inc(100, kind='image')
+        pid = os.fork()
+        if pid == 0:
+            # The child must get its own file rather than write into the parent's
+            upload_bytes_total.inc(23, kind='image')
+            os._exit(0)
+        os.waitpid(pid, 0)
+
+        assert len(list(tmp_path.iterdir())) == 2
+        assert 'upload_bytes_total{kind="image"} 123' in registry.render()
+    finally:
+        registry.configure(app.config['METRICS_DIR'])
+
+def test_metrics_token(app):
+    # The view reads the token when it is registered, so build an app with it set
+    from app.main import create_app
+    os.environ['METRICS_TOKEN'] = 'secret'
+    try:
+        protected, _ = create_app()
+    finally:
+        del os.environ['METRICS_TOKEN']
+    assert protected.test_client().get('/metrics').status_code == 401
+    res = protected.test_client().get('/metrics', headers={'Authorization': 'Bearer secret'})
+    assert res.status_code == 200
+
+def test_readiness_fails_while_draining(client):
+    from app.server import draining
+    assert client.get('/healthz').status_code == 200
+    assert client.get('/readyz').status_code == 200
+    draining.set()
+    try:
+        assert client.get('/readyz').status_code == 503
+        assert client.get('/healthz').status_code == 200
+    finally:
+        draining.clear()
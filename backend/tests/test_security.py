@@ -1,3 +1,12 @@
+import time
+import pytest
+from app import db
+from app.models.user_model import User
+from app.models.listing_model import Listing, Transaction
+from app.services.password_service import PasswordHasher, PasswordHasherBusy, password_hasher
+from app.services.principal_service import principal_cache
+from app.services.revocation_service import RevocationList, revocation_list
+
 def test_invalid_login(client):
     res = client.post('/api/login', json={
         'email': 'wrong@email.com',
@@ -17,4 +26,200 @@ def test_admin_access_control(client, auth_tokens):
         '/api/admin/users/1',
         headers={'Authorization': f"Bearer {auth_tokens['access_token']}"}
     )
-    assert res.status_code == 403  # Regular user can't access admin endpoint
\ No newline at end of file
+    assert res.status_code == 403  # Regular user can't access admin endpoint
+
+def test_login_rehashes_outdated_password(app, client):
+    password_hasher.configure('pbkdf2:sha256:1000', workers=1, max_pending=4, queue_timeout=5)
+    client.post('/api/register', json={'email': 'old@hash.com', 'password': 'pass123'})
+    assert User.query.filter_by(email='old@hash.com').first().password.startswith('pbkdf2:sha256:1000$')
+
+    password_hasher.configure('scrypt', workers=1, max_pending=4, queue_timeout=5)
+    res = client.post('/api/login', json={'email': 'old@hash.com', 'password': 'pass123'})
+    assert res.status_code == 200
+    db.session.expire_all()
+    assert User.query.filter_by(email='old@hash.com').first().password.startswith('scrypt:')
+
+    # The new hash still verifies
+    res = client.post('/api/login', json={'email': 'old@hash.com', 'password': 'pass123'})
+    assert res.status_code == 200
+    password_hasher.init_app(app)
+
+def test_login_returns_503_when_hashing_pool_is_saturated(app, client, auth_tokens):
+    password_hasher.configure('scrypt', workers=1, max_pending=0, queue_timeout=0.01)
+    password_hasher._slots.acquire()  # simulate a hash already in flight
+    try:
+        res = client.post('/api/login', json={'email': 'test@user.com', 'password': 'pass123'})
+        assert res.status_code == 503
+        assert res.headers['Retry-After'] == '1'
+    finally:
+        password_hasher._slots.release()
+        password_hasher.init_app(app)
+
+def test_password_hasher_bounds_waiting_callers():
+    hasher = PasswordHasher('pbkdf2:sha256:1000', workers=1, max_pending=1, queue_timeout=0.05)
+    assert hasher.verify(hasher.hash('pass123'), 'pass123')
+
+    hasher._slots.acquire()  # a hash in flight
+    started = time.monotonic()
+    with pytest.raises(PasswordHasherBusy):
+        hasher.hash('pass123')
+    assert time.monotonic() - started >= 0.05  # waited the whole timeout for the slot
+
+    hasher._waiting = 1  # another caller already holds the one pending place
+    started = time.monotonic()
+    with pytest.raises(PasswordHasherBusy):
+        hasher.hash('pass123')
+    assert time.monotonic() - started < 0.05
+
+def test_admin_check_uses_cached_principal(client, auth_tokens):
+    headers = {'Authorization': f"Bearer {auth_tokens['access_token']}"}
+    user_id = auth_tokens['user_id']
+
+    res = client.get('/api/admin/users', headers=headers)
+    assert res.status_code == 403
+    assert principal_cache.get(user_id) == (user_id, False, False)
+
+    # Promoting the user invalidates the cached flags
+    user = db.session.get(User, user_id)
+    user.is_admin = True
+    db.session.commit()
+    assert principal_cache.get(user_id) is None
+
+    res = client.get('/api/admin/users', headers=headers)
+    assert res.status_code == 200
+    assert principal_cache.get(user_id).is_admin
+
+def test_admin_user_list_pages_searches_and_counts(client, auth_tokens):
+    headers = {'Authorization': f"Bearer {auth_tokens['access_token']}"}
+    admin = db.session.get(User, auth_tokens['user_id'])
+    admin.is_admin = True
+    seller = User(email='Seller@Shop.com', password='pass123', name='Sam')
+    buyer = User(email='buyer@test.com', password='pass123', name='Shopper')
+    gone = User(email='gone@shop.com', password='pass123', is_deleted=True)
+    db.session.add_all([seller, buyer, gone])
+    db.session.flush()
+    listing = Listing(title='Lamp', price=10, seller_id=seller.id)
+    db.session.add_all([listing, Listing(title='Desk', price=50, seller_id=seller.id)])
+    db.session.flush()
+    db.session.add_all([
+        Transaction(buyer_id=buyer.id, seller_id=seller.id, listing_id=listing.id, status='completed'),
+        Transaction(buyer_id=buyer.id, seller_id=seller.id, listing_id=listing.id, status='disputed'),
+    ])
+    db.session.commit()
+
+    page = client.get('/api/admin/users?limit=2', headers=headers).json
+    assert [u['id'] for u in page['users']] == [admin.id, seller.id]
+    page = client.get(f"/api/admin/users?limit=2&cursor={page['next_cursor']}", headers=headers).json
+    assert [u['id'] for u in page['users']] == [buyer.id]  # deleted users are left out
+    assert page['next_cursor'] is None
+
+    # Case-insensitive prefix of either the email or the name
+    res = client.get('/api/admin/users?q=sh&stats=1', headers=headers).json
+    assert {u['id']: u['stats'] for u in res['users']} == {
+        buyer.id: {'listings': 0, 'sales': 0, 'disputes': 1},
+    }
+    res = client.get('/api/admin/users?q=SELL&stats=1', headers=headers).json
+    assert res['users'][0]['stats'] == {'listings': 2, 'sales': 1, 'disputes': 1}
+    assert 'stats' not in client.get('/api/admin/users?q=sell', headers=headers).json['users'][0]
+
+    # Only the ASCII letters of mixed input are folded, as SQLite folds the indexed column
+    emile = User(email='emile@test.com', password='pass123', name='Émile')
+    db.session.add(emile)
+    db.session.commit()
+    res = client.get('/api/admin/users', query_string={'q': 'ÉMILE'}, headers=headers).json
+    assert [u['id'] for u in res['users']] == [emile.id]
+
+def test_deleted_principal_is_rejected(client, auth_tokens):
+    headers = {'Authorization': f"Bearer {auth_tokens['access_token']}"}
+    user = db.session.get(User, auth_tokens['user_id'])
+    user.is_admin = True
+    db.session.commit()
+    assert client.get('/api/admin/users', headers=headers).status_code == 200
+
+    # Cached until the soft delete commits, then gone
+    user.is_deleted = True
+    db.session.flush()
+    assert principal_cache.get(user.id) is not None
+    db.session.commit()
+    assert principal_cache.get(user.id) is None
+
+    # The token itself was never revoked here, but it no longer carries any rights
+    assert client.get('/api/admin/users', headers=headers).status_code == 403
+    assert client.put(f'/api/users/{user.id}', json={'name': 'Ghost'}, headers=headers).status_code == 404
+
+def test_logout_revokes_access_and_refresh_tokens(client, auth_tokens):
+    headers = {'Authorization': f"Bearer {auth_tokens['access_token']}"}
+    assert client.get('/api/auth/me', headers=headers).status_code == 200
+
+    res = client.post('/api/auth/logout', json={'refresh_token': auth_tokens['refresh_token']}, headers=headers)
+    assert res.status_code == 200
+
+    assert client.get('/api/auth/me', headers=headers).status_code == 401
+    res = client.post('/api/refresh', headers={'Authorization': f"Bearer {auth_tokens['refresh_token']}"})
+    assert res.status_code == 401
+
+def test_deleted_user_tokens_are_revoked(client, auth_tokens):
+    client.post('/api/register', json={'email': 'admin@user.com', 'password': 'pass123', 'is_admin': True})
+    admin = client.post('/api/login', json={'email': 'admin@user.com', 'password': 'pass123'}).json
+    user_headers = {'Authorization': f"Bearer {auth_tokens['access_token']}"}
+
+    res = client.delete(f"/api/admin/users/{auth_tokens['user_id']}",
+                        headers={'Authorization': f"Bearer {admin['access_token']}"})
+    assert res.status_code == 200
+    assert client.get('/api/auth/me', headers=user_headers).status_code == 401
+
+def test_revocations_reach_other_workers(app):
+    other_worker = RevocationList()
+    other_worker.sync(app)
+    payload = {'jti': 'abc123', 'sub': '42', 'iat': 0, 'exp': 4102444800}
+    assert not other_worker.is_revoked(payload)
+
+    revocation_list.revoke_token(payload)
+    db.session.commit()
+    assert not other_worker.is_revoked(payload)  # checks never query the table themselves
+    other_worker.sync(app)
+    assert other_worker.is_revoked(payload)
+    assert not other_worker.is_revoked({**payload, 'jti': 'other'})
+
+def test_sqlite_rate_limit_shared_between_storages(tmp_path):
+    from limits import parse
+    from limits.strategies import SlidingWindowCounterRateLimiter
+    from app.ratelimit import SQLiteStorage
+
+    uri = f"sqlite:///{tmp_path}/ratelimit.db"
+    # Two storages on one file behave like two worker processes
+    first = SlidingWindowCounterRateLimiter(SQLiteStorage(uri))
+    second = SlidingWindowCounterRateLimiter(SQLiteStorage(uri))
+    limit = parse("3 per minute")
+    assert first.hit(limit, 'user:1')
+    assert second.hit(limit, 'user:1')
+    assert first.hit(limit, 'user:1')
+    assert not second.hit(limit, 'user:1')
+    assert second.hit(limit, 'user:2')
+    assert first.get_window_stats(limit, 'user:1').remaining == 0
+
+def test_rate_limit_key_uses_jwt_subject(app, auth_tokens):
+    from flask_jwt_extended import decode_token
+    from app.ratelimit import rate_limit_key
+
+    user_id = decode_token(auth_tokens['access_token'])['sub']
+    headers = {'Authorization': f"Bearer {auth_tokens['access_token']}"}
+    with app.test_request_context('/api/listings', headers=headers, environ_base={'REMOTE_ADDR': '10.0.0.1'}):
+        assert rate_limit_key() == f"user:{user_id}"
+    with app.test_request_context('/api/listings', headers={'Authorization': 'Bearer junk'},
+                                  environ_base={'REMOTE_ADDR': '10.0.0.1'}):
+        assert rate_limit_key() == 'ip:10.0.0.1'
+
+def test_sqlite_rate_limit_purges_expired_counters(tmp_path, monkeypatch):
+    from limits import parse
+    from limits.strategies import SlidingWindowCounterRateLimiter
+    from app.ratelimit import SQLiteStorage
+
+    storage = SQLiteStorage(f"sqlite:///{tmp_path}/ratelimit.db")
+    monkeypatch.setattr(SQLiteStorage, 'PURGE_EVERY', 3)
+    limiter = SlidingWindowCounterRateLimiter(storage)
+    storage._connect().execute("INSERT INTO counters VALUES ('old/window', 5, 0)")
+    for user in range(3):
+        assert limiter.hit(parse("3 per minute"), f'user:{user}')
+    keys = [key for (key,) in storage._connect().execute('SELECT key FROM counters')]
+    assert len(keys) == 3 and 'old/window' not in keys
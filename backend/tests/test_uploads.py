@@ -0,0 +1,264 @@
+import os
+import time
+import base64
+import hashlib
+from io import BytesIO
+from PIL import Image
+from app import db
+from app.models.user_model import User
+from app.models.listing_model import Listing
+from app.models.upload_model import UploadObject, UploadSession
+from app.services.storage_service import sha256_from_url
+from app.services.upload_gc import collect_orphaned_uploads
+from app.services.image_service import generate_variants, variant_urls, variant_filename
+
+def make_jpeg(width=1200, height=800, orientation=None):
+    img = Image.new('RGB', (width, height), color='red')
+    buffer = BytesIO()
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    img.save(buffer, format='JPEG', exif=exif)
+    return buffer.getvalue()
+
+def test_variant_urls():
+    urls = variant_urls('http://host:5000/uploads/listing_1.jpg')
+    assert urls['thumb'] == 'http://host:5000/uploads/listing_1_thumb.webp'
+    assert urls['medium'] == 'http://host:5000/uploads/listing_1_medium.webp'
+    assert variant_urls(None) is None
+    assert variant_urls('https://via.placeholder.com/300') is None
+
+def test_generate_variants_rotates_and_strips_exif(tmp_path):
+    source = tmp_path / 'photo.jpg'
+    # Orientation 6 means the camera was rotated 90 degrees clockwise
+    source.write_bytes(make_jpeg(orientation=6))
+
+    written = generate_variants(str(source))
+    assert len(written) == 2
+
+    with Image.open(tmp_path / variant_filename('photo.jpg', 'thumb')) as thumb:
+        assert thumb.format == 'WEBP'
+        assert max(thumb.size) == 320
+        assert thumb.size[1] > thumb.size[0]  # portrait after rotation
+        assert 0x0112 not in thumb.getexif()
+
+    # Existing derivatives are not regenerated
+    assert generate_variants(str(source)) == []
+
+def test_variant_served_from_original_until_generated(app, client, tmp_path):
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    (tmp_path / 'fallback_test.jpg').write_bytes(make_jpeg(64, 64))
+
+    res = client.get('/uploads/fallback_test_thumb.webp')
+    assert res.status_code == 200
+    assert res.mimetype == 'image/jpeg'
+    res.close()
+
+def test_duplicate_upload_is_stored_once(app, client, auth_tokens, tmp_path):
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    app.config['IMAGE_VARIANTS_SYNC'] = True
+    headers = {'Authorization': f"Bearer {auth_tokens['access_token']}"}
+    payload = {
+        'image': 'data:image/jpeg;base64,' + base64.b64encode(make_jpeg(64, 64)).decode(),
+        'filename': '../../escape.jpeg'
+    }
+
+    first = client.post('/api/upload', json=payload, headers=headers)
+    second = client.post('/api/upload', json=payload, headers=headers)
+    assert first.status_code == 200
+    assert first.json['url'] == second.json['url']
+    assert first.json['deduplicated'] is False
+    assert second.json['deduplicated'] is True
+
+    digest = sha256_from_url(first.json['url'])
+    assert db.session.get(UploadObject, digest).ref_count == 2
+    originals = [p for p in tmp_path.rglob('*.jpeg')]
+    assert [p.name for p in originals] == [f"{digest}.jpeg"]
+    assert (originals[0].parent / f"{digest}_thumb.webp").exists()
+
+def test_concurrent_first_uploads_of_same_content(app, tmp_path, monkeypatch):
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    from app.services.storage_service import store_bytes
+    first, created = store_bytes(b'same bytes', 'jpg')
+    db.session.commit()
+    assert created
+
+    # The second upload looked the object up before the first one committed
+    get, calls = db.session.get, []
+    def stale_get(*args, **kwargs):
+        calls.append(args)
+        return None if len(calls) == 1 else get(*args, **kwargs)
+    monkeypatch.setattr(db.session, 'get', stale_get)
+    second, _ = store_bytes(b'same bytes', 'jpg')
+    db.session.commit()
+    assert second.sha256 == first.sha256
+    assert second.ref_count == 2
+
+def test_content_addressed_upload_caching(app, client, tmp_path):
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    digest = 'ab' * 32
+    shard = tmp_path / 'ab' / 'ab'
+    shard.mkdir(parents=True)
+    (shard / f"{digest}.jpg").write_bytes(make_jpeg(64, 64))
+    url = f"/uploads/ab/ab/{digest}.jpg"
+
+    res = client.get(url)
+    assert res.status_code == 200
+    assert res.cache_control.immutable
+    assert res.cache_control.max_age == 365 * 24 * 3600
+    etag = res.headers['ETag']
+    res.close()
+
+    res = client.get(url, headers={'If-None-Match': etag})
+    assert res.status_code == 304
+
+    res = client.get(url, headers={'Range': 'bytes=0-9'})
+    assert res.status_code == 206
+    assert len(res.data) == 10
+    res.close()
+
+def test_accel_redirect_mode(app, client, tmp_path):
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    app.config['UPLOAD_SENDFILE_MODE'] = 'x-accel'
+    (tmp_path / 'legacy.jpg').write_bytes(make_jpeg(64, 64))
+
+    res = client.get('/uploads/legacy.jpg')
+    assert res.status_code == 200
+    assert res.headers['X-Accel-Redirect'] == '/protected-uploads/legacy.jpg'
+    assert res.data == b''
+    assert not res.cache_control.immutable
+
+    assert client.get('/uploads/missing.jpg').status_code == 404
+
+def test_resumable_chunked_upload(app, client, auth_tokens, tmp_path):
+    app.config['UPLOAD_FOLDER'] = str(tmp_path / 'uploads')
+    app.config['UPLOAD_SESSION_FOLDER'] = str(tmp_path / 'sessions')
+    app.config['IMAGE_VARIANTS_SYNC'] = True
+    headers = {'Authorization': f"Bearer {auth_tokens['access_token']}"}
+    data = make_jpeg(400, 400) + b'\0' * 40000  # padding keeps it a valid JPEG
+    chunk_size = 16 * 1024
+
+    res = client.post('/api/uploads/sessions', json={
+        'extension': 'jpg', 'total_size': len(data), 'chunk_size': chunk_size
+    }, headers=headers)
+    assert res.status_code == 201
+    session_id = res.json['session_id']
+    total_chunks = res.json['total_chunks']
+    assert total_chunks == -(-len(data) // chunk_size)
+    chunks = [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+
+    # The connection "drops" after the first chunk
+    res = client.put(f'/api/uploads/sessions/{session_id}/chunks/0', data=chunks[0],
+                     headers={**headers, 'Content-Type': 'application/octet-stream'})
+    assert res.status_code == 200
+
+    res = client.post(f'/api/uploads/sessions/{session_id}/finalize', headers=headers)
+    assert res.status_code == 409
+
+    # Resume from whatever the server says is missing
+    res = client.get(f'/api/uploads/sessions/{session_id}', headers=headers)
+    assert res.json['received_chunks'] == [0]
+    for index in range(res.json['next_chunk'], total_chunks):
+        res = client.put(f'/api/uploads/sessions/{session_id}/chunks/{index}',
+                         json={'data': base64.b64encode(chunks[index]).decode()}, headers=headers)
+        assert res.status_code == 200
+    assert res.json['next_chunk'] is None
+
+    # A finalize retried while the first one is still storing the file backs off
+    upload_session = db.session.get(UploadSession, session_id)
+    upload_session.status = 'finalizing'
+    db.session.commit()
+    res = client.post(f'/api/uploads/sessions/{session_id}/finalize', headers=headers)
+    assert res.status_code == 409
+    assert UploadObject.query.count() == 0
+    upload_session.status = 'open'
+    db.session.commit()
+
+    res = client.post(f'/api/uploads/sessions/{session_id}/finalize', headers=headers)
+    assert res.status_code == 200
+    digest = sha256_from_url(res.json['url'])
+    assert digest == hashlib.sha256(data).hexdigest()
+    assert not (tmp_path / 'sessions' / session_id).exists()
+
+    # A retried finalize gets the same answer
+    again = client.post(f'/api/uploads/sessions/{session_id}/finalize', headers=headers)
+    assert again.json['url'] == res.json['url']
+
+def test_chunk_size_is_validated(client, auth_tokens):
+    headers = {'Authorization': f"Bearer {auth_tokens['access_token']}"}
+    res = client.post('/api/uploads/sessions', json={
+        'extension': 'jpg', 'total_size': 100000, 'chunk_size': 32 * 1024
+    }, headers=headers)
+    session_id = res.json['session_id']
+    res = client.put(f'/api/uploads/sessions/{session_id}/chunks/0', data=b'short',
+                     headers={**headers, 'Content-Type': 'application/octet-stream'})
+    assert res.status_code == 400
+    assert res.json['expected'] == 32 * 1024
+
+def test_orphaned_upload_gc_is_incremental(app, tmp_path):
+    app.config['UPLOAD_FOLDER'] = str(tmp_path / 'uploads')
+    app.config['UPLOAD_GC_STATE_FILE'] = str(tmp_path / 'gc_state.json')
+    app.config['UPLOAD_QUARANTINE_FOLDER'] = str(tmp_path / 'quarantine')
+    seller = User(email='gc@test.com', password='pass123', avatar='/uploads/avatar.png')
+    db.session.add(seller)
+    db.session.commit()
+    db.session.add(Listing(title='Kept', price=1, seller_id=seller.id,
+                           image_url='http://host:5000/uploads/kept.jpg'))
+    db.session.commit()
+
+    uploads = tmp_path / 'uploads'
+    uploads.mkdir()
+    names = ['avatar.png', 'kept.jpg', 'kept_thumb.webp', 'orphan.jpg', 'orphan_thumb.webp', 'fresh.jpg']
+    old = time.time() - 3 * 24 * 3600
+    for name in names:
+        (uploads / name).write_bytes(b'x')
+        if name != 'fresh.jpg':
+            os.utime(uploads / name, (old, old))
+
+    first = collect_orphaned_uploads(max_files=3)
+    assert first['scanned'] == 3
+    assert not first['finished']
+
+    second = collect_orphaned_uploads()
+    assert second['resumed_from'] is not None
+    assert second['finished']
+    assert first['scanned'] + second['scanned'] == len(names)
+
+    remaining = sorted(p.name for p in uploads.iterdir())
+    assert remaining == ['avatar.png', 'fresh.jpg', 'kept.jpg', 'kept_thumb.webp']
+
+def test_upload_gc_rechecks_references_before_deleting(app, tmp_path, monkeypatch):
+    app.config['UPLOAD_FOLDER'] = str(tmp_path / 'uploads')
+    app.config['UPLOAD_GC_STATE_FILE'] = str(tmp_path / 'gc_state.json')
+    app.config['UPLOAD_QUARANTINE_FOLDER'] = str(tmp_path / 'quarantine')
+    from app.services import upload_gc, storage_service
+    # Nothing is referenced when the walk starts
+    monkeypatch.setattr(upload_gc, 'referenced_upload_paths', lambda batch_size: set())
+
+    revived, _ = storage_service.store_bytes(b'revived', 'jpg')
+    db.session.commit()
+    seller = User(email='late@test.com', password='pass123')
+    db.session.add(seller)
+    db.session.commit()
+    db.session.add(Listing(title='Late', price=1, seller_id=seller.id, image_url='/uploads/late.jpg'))
+    db.session.commit()
+
+    uploads = tmp_path / 'uploads'
+    for name in ['late.jpg', 'late_thumb.webp', 'orphan.jpg']:
+        (uploads / name).write_bytes(b'x')
+    old = time.time() - 3 * 24 * 3600
+    for path in [*uploads.iterdir(), uploads / revived.relative_path]:
+        os.utime(path, (old, old))
+
+    # A dedup hit revives the object and restarts its grace period
+    storage_service.store_bytes(b'revived', 'jpg')
+    db.session.commit()
+    assert os.stat(uploads / revived.relative_path).st_mtime > old
+
+    os.utime(uploads / revived.relative_path, (old, old))
+    stats = collect_orphaned_uploads()
+    assert stats['removed'] == 1
+    assert not (uploads / 'orphan.jpg').exists()
+    assert (uploads / 'late.jpg').exists() and (uploads / 'late_thumb.webp').exists()
+    assert (uploads / revived.relative_path).exists()
+    assert db.session.get(UploadObject, revived.sha256).ref_count == 2
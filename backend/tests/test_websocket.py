@@ -35,6 +35,14 @@ def socketio_client(app):
     yield client
     client.disconnect()
 
+def received_events(client, name, attempts=10):
+    for _ in range(attempts):
+        time.sleep(0.1)
+        events = [e for e in client.get_received() if e['name'] == name]
+        if events:
+            return events
+    return []
+
 def test_basic_connection(socketio_client):
     assert socketio_client.is_connected()
 
@@ -59,4 +67,51 @@ def test_message_exchange(socketio_client):
     # Verify response
     assert len(received) == 1
     assert received[0]['name'] == 'new_message'
-    assert received[0]['args'][0]['content'] == 'Hello test'
\ No newline at end of file
+    assert received[0]['args'][0]['content'] == 'Hello test'
+
+def test_rest_message_and_read_receipt_reach_socket_clients(app, socketio_client):
+    app, socketio = app
+    from flask_jwt_extended import create_access_token
+    from app.models.listing_model import Listing, Transaction
+    from app.models.chat_model import ChatRoom, ChatMessage
+    from app.models.outbox_model import OutboxEvent
+
+    with app.app_context():
+        buyer = User(email="buyer@test.com", password=generate_password_hash("testpass"))
+        listing = Listing(title="Desk", price=30, seller_id=1)
+        db.session.add_all([buyer, listing])
+        db.session.commit()
+        transaction = Transaction(qr_code="nearbuy:ws", seller_id=1, buyer_id=buyer.id, listing_id=listing.id)
+        db.session.add(transaction)
+        db.session.commit()
+        room = ChatRoom(transaction_id=transaction.id, listing_id=listing.id)
+        db.session.add(room)
+        db.session.commit()
+        assert room.id == 1  # the room the socket client joined
+        seller_token, buyer_token = create_access_token(identity='1'), create_access_token(identity=str(buyer.id))
+
+        # Nothing is published by a change that rolls back
+        db.session.add(ChatMessage(room_id=1, sender_id=1, content='never sent'))
+        db.session.flush()
+        db.session.rollback()
+        assert OutboxEvent.query.count() == 0
+
+    client = app.test_client()
+    res = client.post('/api/chats/1/messages', json={'content': 'Still available?'},
+                      headers={'Authorization': f'Bearer {buyer_token}'})
+    assert res.status_code == 201
+    messages = received_events(socketio_client, 'new_message')
+    assert [m['args'][0]['content'] for m in messages] == ['Still available?']
+    assert messages[0]['args'][0]['id'] == res.json['message_id']
+
+    res = client.post('/api/chats/1/messages/read', headers={'Authorization': f'Bearer {seller_token}'})
+    assert res.json['marked_read'] == 1
+    receipts = received_events(socketio_client, 'messages_read')
+    assert receipts[0]['args'][0] == {'room_id': 1, 'reader_id': 1, 'count': 1}
+
+    with app.app_context():
+        for _ in range(10):  # emitted rows are deleted right after the batch is sent
+            if OutboxEvent.query.count() == 0:
+                break
+            time.sleep(0.1)
+        assert OutboxEvent.query.count() == 0
@@ -0,0 +1,20 @@
+"""Production entry point.
+
+    gunicorn -c gunicorn.conf.py wsgi:app     # worker pool, see gunicorn.conf.py
+    python wsgi.py                            # one process, no reloader or debugger
+
+The schema is not created here; run `flask db upgrade` as a deploy step.
+"""
+import os
+from app.main import app, socketio
+from app.server import install_drain_handler
+
+if __name__ == '__main__':
+    install_drain_handler(app, socketio)
+    socketio.run(
+        app,
+        host=os.getenv('HOST', '0.0.0.0'),
+        port=int(os.getenv('PORT', 5000)),
+        # The threading mode only has Werkzeug's server; eventlet/gevent don't need this
+        allow_unsafe_werkzeug=socketio.async_mode == 'threading'
+    )
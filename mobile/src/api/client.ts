@@ -1,4 +1,4 @@
-import axios from 'axios';
+import axios, { InternalAxiosRequestConfig } from 'axios';
 import AsyncStorage from '@react-native-async-storage/async-storage';
 
 // Replace with your Flask server's local IP (run `ipconfig` on Windows)
@@ -7,6 +7,26 @@ const BASE_URL = 'http://192.168.1.159:5000/api'; //home 192.168.1.159 uni 10.66
 const client = axios.create({
   baseURL: BASE_URL,
   timeout: 5000, // 10 seconds timeout
+  // 304 means "reuse what you have"; the interceptor below fills in the body
+  validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
+});
+
+// Conditional GETs: remember each list's ETag and body, replay the body on 304
+const MAX_CACHED_RESPONSES = 50;
+const etagCache = new Map<string, { etag: string; data: unknown }>();
+const cacheKey = (config: InternalAxiosRequestConfig) =>
+  `${config.headers.Authorization ?? ''} ${client.getUri(config)}`;
+
+// Registered before the auth interceptor because axios runs request
+// interceptors last-first, so the Authorization header is already set here
+client.interceptors.request.use((config) => {
+  if ((config.method ?? 'get') === 'get') {
+    const cached = etagCache.get(cacheKey(config));
+    if (cached) {
+      config.headers['If-None-Match'] = cached.etag;
+    }
+  }
+  return config;
 });
 
 // Add JWT auth interceptor
@@ -19,7 +39,27 @@ client.interceptors.request.use(async (config) => {
 
 // Add response interceptor for error handling
 client.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    if ((response.config.method ?? 'get') !== 'get') {
+      return response;
+    }
+    const key = cacheKey(response.config);
+    if (response.status === 304) {
+      const cached = etagCache.get(key);
+      if (cached) {
+        return { ...response, status: 200, data: cached.data };
+      }
+    }
+    const etag = response.headers.etag;
+    if (etag) {
+      etagCache.delete(key);
+      etagCache.set(key, { etag, data: response.data });
+      if (etagCache.size > MAX_CACHED_RESPONSES) {
+        etagCache.delete(etagCache.keys().next().value as string);
+      }
+    }
+    return response;
+  },
   (error) => {
     if (error.response?.status === 401) {
       // Handle token expiration (will implement later)
@@ -0,0 +1,80 @@
+import * as FileSystem from 'expo-file-system';
+import { isAxiosError } from 'axios';
+import client from '@/api/client';
+
+const CHUNK_SIZE = 256 * 1024;
+const MAX_ATTEMPTS = 5;
+
+export interface UploadResult {
+  url: string;
+  variants: { thumb: string; medium: string } | null;
+}
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
+// Network errors, timeouts and server errors may pass on a later attempt, as
+// may a 409 while another request is finalizing the same session; any other
+// response (a bad request, an expired session) will fail the same way again.
+function isRetryable(error: unknown): boolean {
+  if (!isAxiosError(error)) {
+    return false;
+  }
+  const status = error.response?.status;
+  return status === undefined || status >= 500 || status === 409;
+}
+
+// Retry one request with exponential backoff; each chunk is small enough
+// to fit in the client's default timeout even on a weak connection.
+async function withRetry<T>(request: () => Promise<T>): Promise<T> {
+  for (let attempt = 1; ; attempt++) {
+    try {
+      return await request();
+    } catch (error) {
+      if (attempt >= MAX_ATTEMPTS || !isRetryable(error)) {
+        throw error;
+      }
+      await sleep(500 * 2 ** (attempt - 1));
+    }
+  }
+}
+
+// Upload a local image through a resumable session: open it, send the
+// chunks the server is still missing, then finalize. Passing a previous
+// sessionId resumes that upload instead of starting over.
+export async function uploadImageResumable(
+  uri: string,
+  sessionId?: string,
+  onProgress?: (fraction: number) => void
+): Promise<UploadResult> {
+  const info = await FileSystem.getInfoAsync(uri);
+  if (!info.exists) {
+    throw new Error('File not found');
+  }
+  const extension = uri.split('.').pop()?.toLowerCase() || 'jpg';
+
+  let session = sessionId
+    ? (await withRetry(() => client.get(`/uploads/sessions/${sessionId}`))).data
+    : (await withRetry(() => client.post('/uploads/sessions', {
+        extension,
+        total_size: info.size,
+        chunk_size: CHUNK_SIZE,
+      }))).data;
+
+  while (session.status === 'open' && session.next_chunk !== null) {
+    const index: number = session.next_chunk;
+    const data = await FileSystem.readAsStringAsync(uri, {
+      encoding: FileSystem.EncodingType.Base64,
+      position: index * session.chunk_size,
+      length: session.chunk_size,
+    });
+    session = (await withRetry(() =>
+      client.put(`/uploads/sessions/${session.session_id}/chunks/${index}`, { data })
+    )).data;
+    onProgress?.(session.received_chunks.length / session.total_chunks);
+  }
+
+  const result = await withRetry(() =>
+    client.post(`/uploads/sessions/${session.session_id}/finalize`)
+  );
+  return result.data;
+}
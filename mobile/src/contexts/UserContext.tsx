@@ -79,6 +79,8 @@ export const UserProvider: React.FC<{ children: React.ReactNode }> = ({ children
   };
 
   const logout = async () => {
+    // Revoke the token server-side; still log out locally if that fails
+    await client.post('/auth/logout').catch(() => {});
     await AsyncStorage.removeItem('access_token');
     setUser(null);
     delete client.defaults.headers.common['Authorization'];
@@ -1,11 +1,12 @@
 // src/screens/Admin/UserManagementScreen.tsx
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import {
   View,
   Text,
   StyleSheet,
   FlatList,
   TouchableOpacity,
+  TextInput,
   ActivityIndicator,
   Alert
 } from 'react-native';
@@ -23,8 +24,16 @@ interface User {
   email: string;
   name: string | null;
   is_admin: boolean;
+  stats?: {
+    listings: number;
+    sales: number;
+    disputes: number;
+  };
 }
 
+// Wait this long after the last keystroke before searching
+const SEARCH_DELAY_MS = 300;
+
 const styles = StyleSheet.create({
   container: {
     flex: 1,
@@ -60,6 +69,36 @@ const styles = StyleSheet.create({
     fontSize: 14,
     color: '#666',
   },
+  stats: {
+    fontSize: 12,
+    color: '#999',
+    marginTop: 2,
+  },
+  searchContainer: {
+    flexDirection: 'row',
+    alignItems: 'center',
+    backgroundColor: '#f9f9f9',
+    borderRadius: 10,
+    paddingHorizontal: 15,
+    marginBottom: 15,
+    borderWidth: 1,
+    borderColor: '#ddd',
+  },
+  searchInput: {
+    flex: 1,
+    height: 44,
+    fontSize: 16,
+    color: '#333',
+    marginLeft: 8,
+  },
+  footer: {
+    paddingVertical: 15,
+  },
+  emptyText: {
+    textAlign: 'center',
+    color: '#666',
+    marginTop: 20,
+  },
   adminBadge: {
     backgroundColor: '#007AFF',
     paddingHorizontal: 8,
@@ -86,18 +125,39 @@ const styles = StyleSheet.create({
 export default function UserManagementScreen() {
   const [users, setUsers] = useState<User[]>([]);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [searchQuery, setSearchQuery] = useState('');
+  const [nextCursor, setNextCursor] = useState<number | null>(null);
   const { user } = useUser();
   const navigation = useNavigation<AdminScreenProp>();
+  // Responses for an older query are dropped if the search changed meanwhile
+  const latestQuery = useRef('');
 
   useEffect(() => {
-    fetchUsers();
-  }, []);
+    const timer = setTimeout(() => fetchUsers(searchQuery), SEARCH_DELAY_MS);
+    return () => clearTimeout(timer);
+  }, [searchQuery]);
 
-  const fetchUsers = async () => {
+  const fetchPage = (query: string, cursor: number | null) => {
+    // The server pages by user id and matches q as a prefix of email or name
+    const params: Record<string, string | number> = { stats: 1 };
+    if (query.trim()) {
+      params.q = query.trim();
+    }
+    if (cursor) {
+      params.cursor = cursor;
+    }
+    return client.get('/admin/users', { params });
+  };
+
+  const fetchUsers = async (query: string = searchQuery) => {
+    latestQuery.current = query;
     try {
       setLoading(true);
-      const response = await client.get('/admin/users');
+      const response = await fetchPage(query, null);
+      if (latestQuery.current !== query) return;
       setUsers(response.data.users);
+      setNextCursor(response.data.next_cursor);
     } catch (error) {
       console.error('API Error:', error); 
       Alert.alert('Error', 'Failed to load users');
@@ -105,6 +165,22 @@ export default function UserManagementScreen() {
       setLoading(false);
     }
   };
+
+  const loadMore = async () => {
+    if (loading || loadingMore || !nextCursor) return;
+    const query = latestQuery.current;
+    try {
+      setLoadingMore(true);
+      const response = await fetchPage(query, nextCursor);
+      if (latestQuery.current !== query) return;
+      setUsers((current) => [...current, ...response.data.users]);
+      setNextCursor(response.data.next_cursor);
+    } catch (error) {
+      console.error('Failed to load more users:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
   const handleDeleteUser = async (userId: number) => {
     if (user?.id === userId) {
       Alert.alert('Error', 'You cannot delete yourself');
@@ -125,7 +201,8 @@ export default function UserManagementScreen() {
           onPress: async () => {
             try {
               await client.delete(`/admin/users/${userId}`);
-              fetchUsers(); // Refresh the list
+              // Drop it locally rather than refetching, which would lose the pages loaded so far
+              setUsers((current) => current.filter((u) => u.id !== userId));
               Alert.alert('Success', 'User deleted successfully');
             } catch (error) {
               console.error('Failed to delete user:', error);
@@ -137,14 +214,6 @@ export default function UserManagementScreen() {
     );
   };
 
-  if (loading) {
-    return (
-      <View style={styles.loadingContainer}>
-        <ActivityIndicator size="large" color="#007AFF" />
-      </View>
-    );
-  }
-
   return (
     <View style={styles.container}>
       <View style={styles.header}>
@@ -152,35 +221,66 @@ export default function UserManagementScreen() {
         <Text style={styles.title}>User Management</Text>
       </View>
 
-      <FlatList
-        data={users}
-        keyExtractor={(item) => item.id.toString()}
-        renderItem={({ item }) => (
-          <View style={styles.userItem}>
-            <View style={styles.userInfo}>
-              <Text style={styles.email}>
-                {item.email}
-                {item.is_admin && (
-                  <View style={styles.adminBadge}>
-                    <Text style={styles.adminText}>Admin</Text>
-                  </View>
+      <View style={styles.searchContainer}>
+        <MaterialIcons name="search" size={20} color="#666" />
+        <TextInput
+          style={styles.searchInput}
+          placeholder="Search by email or name..."
+          placeholderTextColor="#999"
+          value={searchQuery}
+          onChangeText={setSearchQuery}
+          autoCapitalize="none"
+          autoCorrect={false}
+          returnKeyType="search"
+        />
+      </View>
+
+      {loading && users.length === 0 ? (
+        <View style={styles.loadingContainer}>
+          <ActivityIndicator size="large" color="#007AFF" />
+        </View>
+      ) : (
+        <FlatList
+          data={users}
+          keyExtractor={(item) => item.id.toString()}
+          onEndReached={loadMore}
+          onEndReachedThreshold={0.5}
+          ListFooterComponent={loadingMore ? (
+            <ActivityIndicator style={styles.footer} color="#007AFF" />
+          ) : null}
+          ListEmptyComponent={<Text style={styles.emptyText}>No users found</Text>}
+          renderItem={({ item }) => (
+            <View style={styles.userItem}>
+              <View style={styles.userInfo}>
+                <Text style={styles.email}>
+                  {item.email}
+                  {item.is_admin && (
+                    <View style={styles.adminBadge}>
+                      <Text style={styles.adminText}>Admin</Text>
+                    </View>
+                  )}
+                </Text>
+                <Text style={styles.role}>
+                  {item.name || 'No name provided'}
+                </Text>
+                {item.stats && (
+                  <Text style={styles.stats}>
+                    {item.stats.listings} listings · {item.stats.sales} sales · {item.stats.disputes} disputes
+                  </Text>
                 )}
-              </Text>
-              <Text style={styles.role}>
-                {item.name || 'No name provided'}
-              </Text>
+              </View>
+              {!item.is_admin && (
+                <TouchableOpacity
+                  style={styles.deleteButton}
+                  onPress={() => handleDeleteUser(item.id)}
+                >
+                  <MaterialIcons name="delete" size={20} color="white" />
+                </TouchableOpacity>
+              )}
             </View>
-            {!item.is_admin && (
-              <TouchableOpacity
-                style={styles.deleteButton}
-                onPress={() => handleDeleteUser(item.id)}
-              >
-                <MaterialIcons name="delete" size={20} color="white" />
-              </TouchableOpacity>
-            )}
-          </View>
-        )}
-      />
+          )}
+        />
+      )}
     </View>
   );
 }
\ No newline at end of file
@@ -222,11 +222,20 @@ export default function ChatScreen() {
     socket.emit('join', { room_id: roomId });
     
     const handleNewMessage = (msg: any) => {
-      setMessages(prev => [...prev, {
-        ...msg,
-        uniqueKey: `${msg.id}-${new Date(msg.timestamp).getTime()}`,
-        is_read: msg.sender_id === user.id // Messages from current user are always "read"
-      }]);
+      setMessages(prev => {
+        // Events are delivered at least once, and our own messages echo back
+        if (prev.some(m => m.id === msg.id)) return prev;
+        const received = {
+          ...msg,
+          uniqueKey: `${msg.id}-${new Date(msg.timestamp).getTime()}`,
+          is_read: msg.sender_id === user.id // Messages from current user are always "read"
+        };
+        const pending = msg.sender_id === user.id
+          ? prev.findIndex(m => m.pending && m.content === msg.content)
+          : -1;
+        if (pending === -1) return [...prev, received];
+        return prev.map((m, i) => (i === pending ? { ...received, is_read: m.is_read } : m));
+      });
     };
 
     socket.on('new_message', handleNewMessage);
@@ -293,27 +302,24 @@ export default function ChatScreen() {
         sender_id: user.id,
         sent_at: new Date().toISOString(),
         uniqueKey: tempKey,
-        is_read: false
+        is_read: false,
+        pending: true
       };
 
       setMessages(prev => [...prev, newMessage]);
       setMessage('');
 
-      socket.emit('send_message', {
-        room_id: roomId,
-        user_id: user.id,
-        content: message
-      });
-
+      // Sent over REST only; the server broadcasts it to the room once stored
       const response = await client.post(`/chats/${roomId}/messages`, {
-        content: message,
+        content: newMessage.content,
       });
 
       setMessages(prev => prev.map(msg => 
         msg.uniqueKey === tempKey ? { 
           ...msg, 
-          id: response.data.id,
-          uniqueKey: `${response.data.id}-${new Date(msg.sent_at).getTime()}`
+          id: response.data.message_id,
+          pending: false,
+          uniqueKey: `${response.data.message_id}-${new Date(msg.sent_at).getTime()}`
         } : msg
       ));
 
@@ -15,9 +15,9 @@ import {
 import { useNavigation } from '@react-navigation/native';
 import { RootStackParamList } from '@/types/navigation';
 import { NativeStackNavigationProp } from '@react-navigation/native-stack';
-import * as FileSystem from 'expo-file-system';
 import * as ImagePicker from 'expo-image-picker';
 import client from '@/api/client';
+import { uploadImageResumable } from '@/api/uploads';
 import { isAxiosError } from 'axios';
 import { MaterialIcons } from '@expo/vector-icons';
 
@@ -184,23 +184,14 @@ export default function CreateListingScreen() {
     setIsLoading(true);
 
     try {
-      const fileInfo = await FileSystem.getInfoAsync(image);
-      const fileContent = await FileSystem.readAsStringAsync(image, {
-        encoding: FileSystem.EncodingType.Base64,
-      });
-      const fileExt = image.split('.').pop()?.toLowerCase() || 'jpg';
-  
-      const uploadResponse = await client.post('/upload', {
-        image: `data:image/${fileExt};base64,${fileContent}`,
-        filename: `listing_${Date.now()}.${fileExt}`
-      });
+      const upload = await uploadImageResumable(image);
   
       const response = await client.post('/listings', {
         title: title.trim(),
         description: description.trim(),
         price: priceNumber,
         category: category.trim(),
-        image_url: uploadResponse.data.url
+        image_url: upload.url
       }, {
         headers: {
           'Content-Type': 'application/json'
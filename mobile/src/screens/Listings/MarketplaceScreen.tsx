@@ -30,6 +30,7 @@ interface Listing {
   price: number;
   category: string;
   image_url: string;
+  image_variants?: { thumb: string; medium: string } | null;
   seller_id: number;
   status: string;
   created_at: string;
@@ -179,7 +180,11 @@ export default function MarketplaceScreen({ route }: MarketplaceScreenProps) {
 
   const fetchListings = async () => {
     try {
-      const params: Record<string, string> = { status: 'active' };
+      // Only what the grid renders; the details screen fetches the full listing
+      const params: Record<string, string> = {
+        status: 'active',
+        fields: 'id,title,price,status,image_url,image_variants',
+      };
       
       if (searchQuery) {
         params.q = searchQuery;
@@ -238,7 +243,7 @@ export default function MarketplaceScreen({ route }: MarketplaceScreenProps) {
       onPress={() => handleListingPress(item)}
     >
       <Image
-        source={{ uri: item.image_url || 'https://via.placeholder.com/300' }}
+        source={{ uri: item.image_variants?.thumb || item.image_url || 'https://via.placeholder.com/300' }}
         style={styles.itemImage}
       />
       <View style={styles.itemDetails}>
@@ -6,6 +6,7 @@ export interface Listing {
     price: number;
     category: string;
     image_url: string;
+    image_variants?: { thumb: string; medium: string } | null;
     seller_id: number;
     status: string;
     created_at: string;
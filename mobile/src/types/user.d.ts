@@ -3,6 +3,7 @@ export interface User {
   email: string;
   name: string | null;   // Matches SQLAlchemy's nullable String
   avatar: string | null; // Matches SQLAlchemy's nullable String
+  avatar_variants?: { thumb: string; medium: string } | null;
   bio?: string;
   location?: string;
   phone?: string;